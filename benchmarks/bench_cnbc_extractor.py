@@ -0,0 +1,125 @@
+# benchmarks/bench_cnbc_extractor.py
+"""
+CPU time and peak memory of extracting AI news from a CNBC page:
+the previous BeautifulSoup + regex + json.loads path vs services.cnbc_extractor.
+
+    python benchmarks/bench_cnbc_extractor.py [saved_page.html ...]
+
+Without arguments a synthetic page of CNBC's shape (~1.5 MB, __s_data in one script) is used.
+Save a real page with `curl -A Mozilla/5.0 https://www.cnbc.com/ai-artificial-intelligence/ > cnbc.html`.
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from services.cnbc_extractor import iter_news  # noqa: E402
+
+RUNS = 20
+MAX_ITEMS = 8
+
+
+def extract_soup(content, max_items=MAX_ITEMS):
+    """Previous services.fetcher.fetch_ai_news after the HTTP request"""
+    soup = BeautifulSoup(content, "html.parser")
+    script = soup.find("script", string=re.compile(r'window\.__s_data'))
+    if not script:
+        return []
+    m = re.search(r'window\.__s_data\s*=\s*({.*?});\s*window\.__c_data', script.string, re.DOTALL)
+    if not m:
+        return []
+    data = json.loads(m.group(1))
+    results = []
+    for layout in data["page"]["page"]["layout"]:
+        for col in layout.get("columns", []):
+            for mod in col.get("modules", []):
+                if mod.get("data", {}).get("assets"):
+                    for a in mod["data"]["assets"]:
+                        results.append({
+                            "title": a.get("title") or a.get("headline"),
+                            "link": a.get("url"),
+                            "desc": a.get("description", ""),
+                            "img": a.get("promoImage", {}).get("url") if a.get("promoImage") else "",
+                            "date": a.get("datePublished") or a.get("dateLastPublished") or a.get("dateLastPublishedFormattedWithoutTime"),
+                        })
+    seen = set()
+    news_list = []
+    for n in results:
+        if n["link"] not in seen:
+            news_list.append(n)
+            seen.add(n["link"])
+        if len(news_list) >= max_items:
+            break
+    return news_list
+
+
+def extract_stream(content, max_items=MAX_ITEMS):
+    return list(iter_news(content, max_items))
+
+
+def synthetic_page(seed=7):
+    """HTML page of roughly CNBC's size: markup, then the data script, then more markup"""
+    rng = random.Random(seed)
+    words = "ai model chip nvidia openai data cloud robot agent compute startup funding".split()
+
+    def sentence(n):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize()
+
+    def asset(idx):
+        return {
+            "id": 100000 + idx, "type": "cnbcnewsstory", "title": sentence(8),
+            "headline": sentence(10), "url": f"https://www.cnbc.com/2026/10/{idx % 28 + 1:02d}/story-{idx}.html",
+            "description": sentence(40), "datePublished": "2026-10-16T12:00:00+0000",
+            "promoImage": {"url": f"https://image.cnbcfm.com/api/v1/image/{idx}.jpg", "width": 1200, "height": 630},
+            "section": {"title": "Artificial Intelligence", "tagName": "ai"}, "authors": [{"name": sentence(2)}],
+        }
+
+    layout = [{"columns": [{"modules": [{"name": f"module{m}", "data": {"assets": [asset(c * 1000 + m * 20 + a) for a in range(20)]}}
+                                        for m in range(6)]} for c in range(3)]} for _ in range(3)]
+    s_data = {"page": {"page": {"layout": layout}}, "meta": {"blob": [sentence(30) for _ in range(800)]}}
+    markup = "".join(f'<div class="Card-{i}"><a href="/x/{i}">{sentence(12)}</a><p>{sentence(30)}</p></div>'
+                     for i in range(1500))
+    html = (f"<html><head><title>AI</title><script>window.__config={{}};</script></head><body>{markup}"
+            f"<script>window.__s_data = {json.dumps(s_data)}; window.__c_data = {{}};</script>{markup}</body></html>")
+    return html.encode("utf-8")
+
+
+def _measure(fn, content):
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.process_time()
+    for _ in range(RUNS):
+        result = fn(content)
+    cpu_ms = (time.process_time() - started) / RUNS * 1000
+    return cpu_ms, peak / 1024 / 1024, result
+
+
+def main(paths):
+    pages = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages["synthetic"] = synthetic_page()
+
+    for name, content in pages.items():
+        print(f"{name} ({len(content) / 1024 / 1024:.2f} MB):")
+        soup_ms, soup_mb, soup_items = _measure(extract_soup, content)
+        stream_ms, stream_mb, stream_items = _measure(extract_stream, content)
+        print(f"  {'soup + regex':<16}{soup_ms:9.2f} ms CPU {soup_mb:8.2f} MB peak")
+        print(f"  {'raw_decode':<16}{stream_ms:9.2f} ms CPU {stream_mb:8.2f} MB peak")
+        print(f"  speedup x{soup_ms / stream_ms:.1f}, same items: {soup_items == stream_items} ({len(stream_items)})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,129 @@
+# benchmarks/bench_gold_parser.py
+"""
+Per-parse time and peak memory of the 24h.com.vn gold table parsers:
+the previous full-page BeautifulSoup parse vs each crawler.gold_parsers backend.
+
+    python benchmarks/bench_gold_parser.py [saved_page.html ...]
+
+Peak memory is what tracemalloc sees: Python allocations only, the C parsers' own buffers are not counted.
+Without arguments a synthetic page of 24h.com.vn's shape (~850 KB, table near the middle) is used.
+Save a real page with `curl -A Mozilla/5.0 https://www.24h.com.vn/gia-vang-hom-nay-c425.html > gold.html`.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from crawler.gold_parsers import available_backends, parse_gold_table  # noqa: E402
+
+RUNS = 20
+
+
+def parse_full_page(content):
+    """Previous crawler_gold.parse_24h_gold"""
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('div', {'class': 'cate-24h-gold-pri-table'})
+    if not table:
+        return None, []
+    rows = table.find('table', {'class': 'gia-vang-search-data-table'})
+    if not rows:
+        return None, []
+    data, buy_trend = [], None
+    for row in rows.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) < 3:
+            continue
+        gold_type = cols[0].text.strip()
+        buy_price_elem = cols[1].find('span', {'class': 'fixW'})
+        if not buy_price_elem:
+            continue
+        buy_price = buy_price_elem.text.strip()
+        buy_change_span = cols[1].find('span', {'class': ['colorGreen', 'colorRed']})
+        if buy_change_span:
+            buy_symbol = "▲" if 'colorGreen' in buy_change_span.get('class', []) else "▼"
+            if buy_trend is None:
+                buy_trend = 'increase' if buy_symbol == "▲" else 'decrease'
+            buy_price_full = f"{buy_price} {buy_symbol}{buy_change_span.text.strip()}"
+        else:
+            buy_price_full = buy_price
+        sell_price_elem = cols[2].find('span', {'class': 'fixW'})
+        if not sell_price_elem:
+            continue
+        sell_price = sell_price_elem.text.strip()
+        sell_change_span = cols[2].find('span', {'class': ['colorGreen', 'colorRed']})
+        if sell_change_span:
+            sell_symbol = "▲" if 'colorGreen' in sell_change_span.get('class', []) else "▼"
+            sell_price_full = f"{sell_price} {sell_symbol}{sell_change_span.text.strip()}"
+        else:
+            sell_price_full = sell_price
+        data.append([gold_type, buy_price_full, sell_price_full])
+    return buy_trend, data
+
+
+def synthetic_page(seed=3):
+    rng = random.Random(seed)
+    words = "giá vàng hôm nay tăng giảm thị trường thế giới trong nước nhẫn miếng sjc doji pnj".split()
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    def cell(price):
+        change = rng.choice(['<span class="colorGreen">500</span>', '<span class="colorRed">300</span>', ''])
+        return f'<td><span class="fixW">{price:,}</span>{change}</td>'
+
+    rows = "".join(f'<tr><td><h2>{name}</h2></td>{cell(rng.randrange(80000, 160000))}'
+                   f'{cell(rng.randrange(80000, 160000))}<td>{text(3)}</td></tr>'
+                   for name in ["SJC", "DOJI HN", "DOJI SG", "PNJ HN", "PNJ SG", "Nhẫn 9999", "BTMC", "Phú Quý"])
+    block = (f'<div class="cate-24h-gold-pri-table"><h2>{text(6)}</h2>'
+             f'<table class="gia-vang-search-data-table"><tr><th>Loại</th><th>Mua</th><th>Bán</th></tr>{rows}</table>'
+             f'<p>{text(20)}</p></div>')
+    markup = "".join(f'<div class="box-news-{i}"><a href="/tin-{i}.html"><img src="/i/{i}.jpg" alt="{text(5)}">'
+                     f'<span>{text(12)}</span></a><p>{text(25)}</p></div>' for i in range(1200))
+    html = (f'<html><head><title>Giá vàng</title><script>var cfg = {{}};</script></head><body>'
+            f'{markup}{block}{markup}</body></html>')
+    return html.encode('utf-8')
+
+
+def _measure(fn, content):
+    fn(content)  # warm up: backend imports are not part of a parse
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(RUNS):
+        result = fn(content)
+    return (time.perf_counter() - started) / RUNS * 1000, peak / 1024 / 1024, result
+
+
+def main(paths):
+    pages = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages['synthetic'] = synthetic_page()
+
+    parsers = {'full page bs4': parse_full_page}
+    for backend in available_backends():
+        parsers[f'scoped {backend}'] = lambda content, backend=backend: parse_gold_table(content, backend)
+
+    for name, content in pages.items():
+        print(f"{name} ({len(content) / 1024:.0f} KB):")
+        baseline_ms, expected = None, None
+        for label, parser in parsers.items():
+            elapsed_ms, peak_mb, result = _measure(parser, content)
+            if baseline_ms is None:
+                baseline_ms, expected = elapsed_ms, result
+            print(f"  {label:<18}{elapsed_ms:9.3f} ms/parse {peak_mb:8.2f} MB peak"
+                  f"  x{baseline_ms / elapsed_ms:<7.1f}{'' if result == expected else '  ❌ different result'}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
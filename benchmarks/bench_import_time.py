@@ -0,0 +1,101 @@
+# benchmarks/bench_import_time.py
+"""
+Import cost of each main.py command, measured with `python -X importtime` in a fresh
+interpreter, checked against benchmarks/import_budget.json.
+
+    python benchmarks/bench_import_time.py [command ...]
+
+Exits 1 when a command goes over its budget (CI can run it as a gate).
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT, "benchmarks", "import_budget.json")
+RUNS = 5
+
+# Modules each command imports before doing any work (see the run_* functions in main.py)
+COMMAND_MODULES = {
+    "help": ["main"],
+    "db": ["main", "utils.bus_db_manager"],
+    "ai": ["main", "crawler.crawler_ai_news"],
+    "gold": ["main", "crawler.crawler_gold"],
+    "bus": ["main", "crawler.stable_bus_crawler"],
+    "events": ["main", "services.event_checker_service"],
+    "kms": ["main", "services.notion_kms_service"],
+    "all": ["main", "services.service_registry"],
+    "chatbot": ["main", "telegram_chatbot"],
+}
+
+
+def _import_profile(modules):
+    """(total ms, module count) of importing modules, interpreter startup excluded"""
+    code = "; ".join(f"import {module}" for module in modules) if modules else "pass"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+
+    total_us, names = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        names.add(name.strip())
+        # Only top-level entries, nested ones are already part of their parent's cumulative time
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, names
+
+
+def _best_of(modules):
+    best_ms, names = None, set()
+    for _ in range(RUNS):
+        elapsed_ms, names = _import_profile(modules)
+        best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+    return best_ms, names
+
+
+def measure(modules, baseline):
+    """Best-of-RUNS ms and number of modules imported on top of a bare interpreter"""
+    baseline_ms, baseline_names = baseline
+    elapsed_ms, names = _best_of(modules)
+    return max(elapsed_ms - baseline_ms, 0.0), len(names - baseline_names)
+
+
+def main(commands):
+    with open(BUDGET_FILE, "r", encoding="utf-8") as f:
+        budget = json.load(f)
+
+    baseline = _best_of([])
+    over_budget = []
+    print(f"{'command':<10}{'ms':>9}{'budget':>9}{'modules':>10}{'budget':>9}")
+    for command in commands or COMMAND_MODULES:
+        limits = budget.get(command, {})
+        try:
+            elapsed_ms, module_count = measure(COMMAND_MODULES[command], baseline)
+        except ImportError as e:
+            print(f"{command:<10}  skipped ({e})")
+            continue
+
+        max_ms, max_modules = limits.get("max_ms"), limits.get("max_modules")
+        over = ((max_ms is not None and elapsed_ms > max_ms)
+                or (max_modules is not None and module_count > max_modules))
+        print(f"{command:<10}{elapsed_ms:>9.1f}{str(max_ms):>9}{module_count:>10}{str(max_modules):>9}"
+              f"{'  ❌ over budget' if over else ''}")
+        if over:
+            over_budget.append(command)
+
+    if over_budget:
+        print(f"❌ Over import budget: {', '.join(over_budget)}")
+        return 1
+    print("✅ All commands within import budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
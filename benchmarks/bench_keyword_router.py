@@ -0,0 +1,123 @@
+# benchmarks/bench_keyword_router.py
+"""
+Classify 100k chat messages with the old substring scans and the compiled KeywordRouter.
+Two workloads: repeated commands (typical chat traffic) and 100k distinct messages.
+
+    python benchmarks/bench_keyword_router.py [count]
+"""
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.keyword_router import KeywordRouter  # noqa: E402
+
+COMMANDS = {
+    'bus': ['bus', 'xe', 'xe buýt', 'bus time', 'bus price', 'giá xe'],
+    'gold': ['gold', 'vàng', 'giá vàng', 'vang', 'gia vang'],
+    'ai': ['ai', 'ai news', 'tin ai', 'news', 'tin tức', 'tech news'],
+    'kms': ['kms', 'knowledge', 'notion', 'note', 'search', 'notes'],
+    'events': ['events', 'event', 'sự kiện', 'su kien', 'イベント', 'event checker'],
+    'help': ['help', 'trợ giúp', 'commands', 'menu', '/start', '/help'],
+    'status': ['status', 'tình trạng', 'ping', 'alive'],
+    'all': ['all', 'tất cả', 'all bots', 'run all', 'chạy tất cả'],
+}
+
+SAMPLES = [
+    "bus", "giá xe hôm nay thế nào", "Giá Vàng", "gia vang sjc", "tin ai mới nhất",
+    "tại sao bot không trả lời", "kms search python asyncio", "sự kiện cuối tuần",
+    "イベントを教えて", "status?", "chạy tất cả đi", "hello there", "/start",
+    "Cho mình hỏi giá vàng với giá xe buýt đi Tokyo tối nay nhé, cảm ơn nhiều",
+    "tai sao khong chay", "small detail", "email me later",
+]
+
+
+def classify_substring(text):
+    """Previous TelegramChatBot.classify_message"""
+    text_lower = text.lower().strip()
+    for category, keywords in COMMANDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                return category
+    return 'help'
+
+
+@dataclass
+class ServiceConfig:
+    """Same shape as services.service_registry.ServiceConfig (importing it loads every service)"""
+    name: str
+    description: str
+    keywords: List[str]
+    emoji: str
+    category: str
+    enabled: bool = True
+    requires_env: List[str] = None
+
+
+class _FakeService:
+    def __init__(self, category, keywords):
+        self.category = category
+        self.keywords = keywords
+
+    def get_config(self):
+        return ServiceConfig(name=self.category, description="", keywords=list(self.keywords),
+                             emoji="", category=self.category)
+
+
+SERVICES = [_FakeService(category, keywords) for category, keywords in COMMANDS.items()]
+
+
+def classify_registry(text):
+    """Previous ServiceRegistry.get_service_by_keyword (get_config() per service per message)"""
+    text_lower = text.lower().strip()
+    for service in SERVICES:
+        config = service.get_config()
+        if not config.enabled:
+            continue
+        for keyword in config.keywords:
+            if keyword.lower() in text_lower:
+                return config.name
+    return 'help'
+
+
+def _time(label, fn, messages):
+    started = time.perf_counter()
+    results = [fn(text) for text in messages]
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<18}{elapsed:7.3f} s  ({len(messages) / elapsed:>10,.0f} msg/s)")
+    return results
+
+
+def main(count=100_000):
+    rng = random.Random(42)
+    workloads = {
+        "repeated commands": [rng.choice(SAMPLES) for _ in range(count)],
+        "distinct messages": [f"{rng.choice(SAMPLES)} {idx}" for idx in range(count)],
+    }
+
+    started = time.perf_counter()
+    router = KeywordRouter()
+    for category, keywords in COMMANDS.items():
+        router.add_many(keywords, category)
+    router.build()
+    print(f"router build: {(time.perf_counter() - started) * 1000:.2f} ms ({len(router)} keywords)")
+
+    for name, messages in workloads.items():
+        print(f"{name} ({count}):")
+        _time("substring scan", classify_substring, messages)
+        _time("registry scan", classify_registry, messages)
+        _time("keyword router", lambda text: router.match(text, default='help'), messages)
+
+    print("samples classified differently (word boundaries / diacritics):")
+    for text in SAMPLES:
+        old, new = classify_substring(text), router.match(text, default='help')
+        if old != new:
+            print(f"  {text!r}: {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
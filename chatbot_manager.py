@@ -1,11 +1,12 @@
 # chatbot_manager.py
-import os
 import sys
 import time
 import signal
 import threading
 from datetime import datetime
 
+from config import get_settings
+
 
 class ChatbotManager:
     def __init__(self):
@@ -55,25 +56,26 @@ class ChatbotManager:
         print(f"""
 📊 Chatbot Status: {status}
 ⏰ Current time: {current_time}
-🤖 Bot token: {'✅ Set' if os.getenv('BOT_TOKEN') else '❌ Missing'}
-💬 Chat ID: {'✅ Set' if os.getenv('CHAT_ID') else '❌ Missing'}
+🤖 Bot token: {'✅ Set' if get_settings().bot_token else '❌ Missing'}
+💬 Chat ID: {'✅ Set' if get_settings().chat_id else '❌ Missing'}
 """)
 
     def test_connection(self):
         """Test Telegram connection"""
         try:
-            import requests
+            from services.telegram_client import get_telegram_client
 
-            bot_token = os.getenv('BOT_TOKEN')
-            chat_id = os.getenv('CHAT_ID')
+            bot_token = get_settings().bot_token
+            chat_id = get_settings().chat_id
 
             if not bot_token or not chat_id:
                 print("❌ Missing BOT_TOKEN or CHAT_ID")
                 return
 
+            client = get_telegram_client(bot_token)
+
             # Test bot info
-            url = f"https://api.telegram.org/bot{bot_token}/getMe"
-            response = requests.get(url, timeout=10)
+            response = client.get_me(timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -88,13 +90,7 @@ class ChatbotManager:
                 print(f"❌ HTTP error: {response.status_code}")
 
             # Test sending message
-            test_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            test_data = {
-                'chat_id': chat_id,
-                'text': '🧪 Connection test successful!'
-            }
-
-            test_response = requests.post(test_url, data=test_data, timeout=10)
+            test_response = client.send_message(chat_id, '🧪 Connection test successful!', timeout=10)
             if test_response.status_code == 200:
                 print("✅ Message sending successful!")
             else:
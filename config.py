@@ -1,36 +1,165 @@
 import os
-from dotenv import load_dotenv
+import threading
+from dataclasses import dataclass
 
 # Load .env
 ENV_PATH = "/secrets/.env"
 
-# Kiểm tra nếu file tồn tại, thì load từ file đó, nếu không thì dùng load_dotenv() mặc định
-if os.path.exists(ENV_PATH):
-    load_dotenv(dotenv_path=ENV_PATH)
-else:
-    load_dotenv()
-
-# Lấy các biến môi trường
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-CHAT_ID = os.getenv("CHAT_ID")
-USER_TAG = os.getenv("USER_TAG", "")
-
-# Các hằng số / đường dẫn cố định
-TELEGRAM_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage" if BOT_TOKEN else None
-URL = "https://www.24h.com.vn/gia-vang-hom-nay-c425.html"
-TIMEOUT = 15
-
-# Safe logging - only show if variables are set, not their values
-print("Environment variables status:")
-print(f"BOT_TOKEN: {'✅ Set' if BOT_TOKEN else '❌ Missing'}")
-print(f"CHAT_ID: {'✅ Set' if CHAT_ID else '❌ Missing'}")
-print(f"USER_TAG: {'✅ Set' if USER_TAG else '❌ Missing'}")
-
-# Check if running in GitHub Actions
-if os.getenv('GITHUB_ACTIONS') == 'true':
-    print("🐙 Running in GitHub Actions environment")
-    if not BOT_TOKEN or not CHAT_ID:
-        print("❌ Required secrets not found in GitHub Actions!")
-        print("Make sure to set BOT_TOKEN and CHAT_ID in repository secrets.")
-else:
-    print("🏠 Running in local environment")
\ No newline at end of file
+_settings = None
+_settings_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Process-wide configuration, read once from the environment (.env loaded first)"""
+    bot_token: str = None
+    chat_id: str = None
+    user_tag: str = ""
+    github_actions: bool = False
+    # Các hằng số / đường dẫn cố định
+    url: str = "https://www.24h.com.vn/gia-vang-hom-nay-c425.html"
+    timeout: int = 15
+    # Chatbot
+    poll_timeout: int = 50
+    service_timeout: int = 300
+    bot_mode: str = "polling"
+    # Chat command executor: worker threads, per-lane limits and queue size
+    chatbot_max_workers: int = 5
+    chatbot_browser_jobs: int = 1
+    chatbot_http_jobs: int = 3
+    chatbot_max_queue: int = 10
+    # Webhook mode
+    port: int = 8080
+    webhook_url: str = None
+    webhook_secret: str = None
+    # Services
+    service_manifest_file: str = ""
+    ai_news_sources: str = ""
+    ai_news_summaries: bool = True
+    gold_parser: str = ""
+    # Local state files
+    outbox_db: str = "telegram_outbox.db"
+    dedup_db: str = "telegram_dedup.db"
+    dedup_window_hours: float = 12
+    offset_file: str = "telegram_offset.json"
+    service_cache_db: str = "service_cache.db"
+    article_db: str = "ai_articles.db"
+    gold_db: str = "gold_prices.db"
+    source_health_file: str = "source_health.json"
+    # Crawling politeness: requests per second and burst per host
+    crawl_host_rate: float = 1.0
+    crawl_host_burst: int = 3
+    crawl_host_rates: str = ""
+    # On-disk HTTP response cache (0 MB disables it), per-host TTL overrides
+    http_cache_db: str = "http_cache.db"
+    http_cache_max_mb: int = 50
+    http_cache_ttls: str = ""
+
+    @property
+    def telegram_url(self):
+        return f"https://api.telegram.org/bot{self.bot_token}/sendMessage" if self.bot_token else None
+
+
+def load_env():
+    """Load .env into os.environ (variables already set in the environment win)"""
+    from dotenv import load_dotenv
+
+    # Kiểm tra nếu file tồn tại, thì load từ file đó, nếu không thì dùng load_dotenv() mặc định
+    if os.path.exists(ENV_PATH):
+        load_dotenv(dotenv_path=ENV_PATH)
+    else:
+        load_dotenv()
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def get_settings() -> Settings:
+    """Load .env and build the Settings on first call; later calls return the same object"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                load_env()
+                settings = Settings(
+                    bot_token=os.getenv("BOT_TOKEN"),
+                    chat_id=os.getenv("CHAT_ID"),
+                    user_tag=os.getenv("USER_TAG", ""),
+                    github_actions=os.getenv('GITHUB_ACTIONS') == 'true',
+                    poll_timeout=_env_int('TELEGRAM_POLL_TIMEOUT', 50),
+                    service_timeout=_env_int('SERVICE_TIMEOUT', 300),
+                    bot_mode=os.getenv("BOT_MODE", "polling").strip().lower(),
+                    chatbot_max_workers=_env_int('CHATBOT_MAX_WORKERS', 5),
+                    chatbot_browser_jobs=_env_int('CHATBOT_BROWSER_JOBS', 1),
+                    chatbot_http_jobs=_env_int('CHATBOT_HTTP_JOBS', 3),
+                    chatbot_max_queue=_env_int('CHATBOT_MAX_QUEUE', 10),
+                    port=_env_int('PORT', 8080),
+                    webhook_url=os.getenv("WEBHOOK_URL"),
+                    webhook_secret=os.getenv("WEBHOOK_SECRET"),
+                    service_manifest_file=os.getenv("SERVICE_MANIFEST_FILE", ""),
+                    ai_news_sources=os.getenv("AI_NEWS_SOURCES", "").strip(),
+                    ai_news_summaries=os.getenv("AI_NEWS_SUMMARIES", "1").strip().lower() not in ("0", "false", "no"),
+                    gold_parser=os.getenv("GOLD_PARSER", "").strip().lower(),
+                    outbox_db=os.getenv("TELEGRAM_OUTBOX_DB", "telegram_outbox.db"),
+                    dedup_db=os.getenv("TELEGRAM_DEDUP_DB", "telegram_dedup.db"),
+                    dedup_window_hours=_env_float('TELEGRAM_DEDUP_WINDOW_HOURS', 12),
+                    offset_file=os.getenv("TELEGRAM_OFFSET_FILE", "telegram_offset.json"),
+                    service_cache_db=os.getenv("SERVICE_CACHE_DB", "service_cache.db"),
+                    article_db=os.getenv("AI_ARTICLE_DB", "ai_articles.db"),
+                    gold_db=os.getenv("GOLD_HISTORY_DB", "gold_prices.db"),
+                    source_health_file=os.getenv("SOURCE_HEALTH_FILE", "source_health.json"),
+                    crawl_host_rate=_env_float('CRAWL_HOST_RATE', 1.0),
+                    crawl_host_burst=_env_int('CRAWL_HOST_BURST', 3),
+                    crawl_host_rates=os.getenv("CRAWL_HOST_RATES", ""),
+                    http_cache_db=os.getenv("HTTP_CACHE_DB", "http_cache.db"),
+                    http_cache_max_mb=_env_int('HTTP_CACHE_MAX_MB', 50),
+                    http_cache_ttls=os.getenv("HTTP_CACHE_TTLS", ""),
+                )
+                report_environment(settings)
+                _settings = settings
+    return _settings
+
+
+def report_environment(settings):
+    # Safe logging - only show if variables are set, not their values
+    print("Environment variables status:")
+    print(f"BOT_TOKEN: {'✅ Set' if settings.bot_token else '❌ Missing'}")
+    print(f"CHAT_ID: {'✅ Set' if settings.chat_id else '❌ Missing'}")
+    print(f"USER_TAG: {'✅ Set' if settings.user_tag else '❌ Missing'}")
+
+    # Check if running in GitHub Actions
+    if settings.github_actions:
+        print("🐙 Running in GitHub Actions environment")
+        if not settings.bot_token or not settings.chat_id:
+            print("❌ Required secrets not found in GitHub Actions!")
+            print("Make sure to set BOT_TOKEN and CHAT_ID in repository secrets.")
+    else:
+        print("🏠 Running in local environment")
+
+
+_LEGACY_NAMES = {
+    'BOT_TOKEN': 'bot_token',
+    'CHAT_ID': 'chat_id',
+    'USER_TAG': 'user_tag',
+    'TIMEOUT': 'timeout',
+    'URL': 'url',
+    'TELEGRAM_URL': 'telegram_url',
+}
+
+
+def __getattr__(name):
+    # `from config import BOT_TOKEN` still works, it just loads the settings on first use
+    if name in _LEGACY_NAMES:
+        return getattr(get_settings(), _LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,20 +1,60 @@
 # crawler_ai_news.py
-from services.fetcher import fetch_ai_news
+from services.news_aggregator import fetch_all_news
 from services.formatter import format_ai_news
-from services.telegram_bot import send_to_telegram
-from config import USER_TAG
+from services.telegram_bot import send_to_telegram, message_batch, report_progress
+from services.result_cache import fetch_and_cache
+from services.article_store import get_article_store
+from services.news_enricher import enrich_news
+from config import get_settings
+
+
+def send_ai_news(news_items, max_items=5):
+    """Send fetched news (list + tag line go out as a single message). Returns True if there was news"""
+    with message_batch():
+        if news_items:
+            message = format_ai_news(news_items, max_items)
+            send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True)
+            user_tag = get_settings().user_tag
+            tag_str = f" {user_tag}" if user_tag else ""
+            send_to_telegram(f"🔔 Update tin AI mới nha{tag_str} 🤖", parse_mode=None)
+            return True
+        else:
+            print("Không lấy được tin tức AI mới.")
+            send_to_telegram("Bot AI News bị lỗi: Không lấy được tin tức AI mới.", parse_mode=None)
+            return False
+
+
+def fetch_and_store_news(max_items=8):
+    """Fetch every news source and record the stories in the article store. Returns the fetched items"""
+    news_items = fetch_all_news(max_items)
+    if news_items:
+        added = get_article_store().add_many(news_items)
+        print(f"📰 {added} bài mới / {len(news_items)} bài đã lấy")
+    return news_items
+
 
 def run_ai_bot():
     print("Starting AI news bot...")
-    news_items = fetch_ai_news(8)
-    if news_items:
-        message = format_ai_news(news_items)
-        send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True)
-        tag_str = f" {USER_TAG}" if USER_TAG else ""
-        send_to_telegram(f"🔔 Update tin AI mới nha{tag_str} 🤖", parse_mode=None)
-    else:
-        print("Không lấy được tin tức AI mới.")
-        send_to_telegram("Bot AI News bị lỗi: Không lấy được tin tức AI mới.", parse_mode=None)
+    # Stored for chat commands answered from the result cache
+    news_items = fetch_and_cache("ai_news", lambda: fetch_and_store_news(8)) or []
+    if not news_items:
+        send_ai_news([])
+        return
+
+    # Only articles no earlier run has delivered
+    store = get_article_store()
+    skipped = store.skip_stale()
+    if skipped:
+        print(f"Bỏ qua {skipped} tin cũ chưa gửi.")
+    new_items = store.unsent(limit=8)
+    if not new_items:
+        print("Không có tin AI mới kể từ lần gửi trước.")
+        return
+
+    report_progress(f"🤖 Có {len(new_items)} tin mới, đang tóm tắt...")
+    enrich_news(new_items)
+    if send_ai_news(new_items, max_items=len(new_items)):
+        store.mark_sent([n["link"] for n in new_items])
     print("AI news bot finished.")
 
 if __name__ == "__main__":
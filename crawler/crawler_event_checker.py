@@ -1,9 +1,8 @@
 # crawler/event_checker_crawler.py
-import time
-import random
 import re
 from datetime import datetime, timedelta, timezone
 from utils.day_converter import convert_day_to_vietnamese
+from services.host_throttle import wait_for_host
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -13,6 +12,9 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 
 # Base URL for Event Checker
 BASE_URL = "https://event-checker.info/"
+# Heading of the section parse_events_from_source reads first
+WEEKLY_EVENTS_XPATH = "//*[contains(text(), '今週のイベント')]"
+EVENTS_RENDER_TIMEOUT = 15
 
 
 def setup_chrome_driver():
@@ -68,10 +70,8 @@ def fetch_events(max_events=10):
         return []
 
     try:
-        # Add random delay
-        time.sleep(random.uniform(1, 3))
-
         print(f"Loading page: {BASE_URL}")
+        wait_for_host(BASE_URL)
         driver.get(BASE_URL)
 
         # Wait for page to load
@@ -79,10 +79,15 @@ def fetch_events(max_events=10):
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
 
-        print("✅ Page loaded successfully")
+        # The weekly list may be rendered client-side: wait for the heading the parser looks for
+        try:
+            WebDriverWait(driver, EVENTS_RENDER_TIMEOUT).until(
+                EC.presence_of_element_located((By.XPATH, WEEKLY_EVENTS_XPATH))
+            )
+        except TimeoutException:
+            print("⚠️ 今週のイベント section not rendered, parsing what the page has")
 
-        # Additional wait for dynamic content
-        time.sleep(5)
+        print("✅ Page loaded successfully")
 
         # Get page source and parse
         page_source = driver.page_source
@@ -1,20 +1,17 @@
 # crawler/crawler_gold_clean.py
 import requests
-from bs4 import BeautifulSoup
+import sqlite3
 from datetime import datetime, timedelta, timezone
-import os
-import time
 import random
-from dotenv import load_dotenv
 from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
+from services.http_client import create_crawl_adapter
+from services.telegram_bot import send_to_telegram as _send_to_telegram, message_batch
+from services.result_cache import get_result_cache
+from crawler.gold_parsers import parse_gold_table
+from services.gold_history import get_gold_store
+from config import get_settings
 
 # Configuration
-load_dotenv()
-
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-CHAT_ID = os.getenv('CHAT_ID')
-TELEGRAM_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
 TIMEOUT = 30
 
 
@@ -50,22 +47,42 @@ def create_session():
         raise_on_status=False
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = create_crawl_adapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
     return session
 
 
+def fetch_gold_snapshot():
+    """
+    (source_label, buy_trend, rows) from the path that fits the environment, shared by every
+    entry point (cron, registry service, chat). On GitHub Actions runner IPs get blocked often,
+    so 24h races the backup sources (with source health); elsewhere 24h is fetched directly.
+    """
+    if get_settings().github_actions:
+        from crawler.github_action_fetcher import race_gold_sources
+        source, buy_trend, data = race_gold_sources()
+        if data:
+            buy_trend = record_gold_prices(buy_trend, data)
+        return source, buy_trend, data
+    buy_trend, data = fetch_24h_gold_prices()
+    return "24h.com.vn", buy_trend, data
+
+
 def fetch_gold_prices():
+    """(buy_trend, rows) from fetch_gold_snapshot"""
+    _, buy_trend, data = fetch_gold_snapshot()
+    return buy_trend, data
+
+
+def fetch_24h_gold_prices():
     """Fetch gold prices from 24h.com.vn"""
     url = "https://www.24h.com.vn/gia-vang-hom-nay-c425.html"
     session = create_session()
 
     try:
         print("Trying 24h.com.vn...")
-        time.sleep(random.uniform(1, 2))
-
         response = session.get(url, timeout=TIMEOUT)
 
         if response.status_code == 200:
@@ -74,7 +91,7 @@ def fetch_gold_prices():
 
             if data:
                 print("✅ Successfully parsed data from 24h.com.vn")
-                return buy_trend, data
+                return record_gold_prices(buy_trend, data), data
             else:
                 print("❌ No data found")
                 return None, []
@@ -94,71 +111,8 @@ def fetch_gold_prices():
 
 
 def parse_24h_gold(content):
-    """Parse gold prices from 24h.com.vn"""
-    soup = BeautifulSoup(content, 'html.parser')
-
-    table = soup.find('div', {'class': 'cate-24h-gold-pri-table'})
-    if not table:
-        print("❌ Could not find gold price table")
-        return None, []
-
-    rows = table.find('table', {'class': 'gia-vang-search-data-table'})
-    if not rows:
-        print("❌ Could not find price data table")
-        return None, []
-
-    data = []
-    buy_trend = None
-
-    for row in rows.find_all('tr'):
-        cols = row.find_all('td')
-        if len(cols) >= 3:
-            try:
-                # Get gold type
-                gold_type = cols[0].text.strip()
-
-                # Extract buy price and trend
-                buy_price_elem = cols[1].find('span', {'class': 'fixW'})
-                if not buy_price_elem:
-                    continue
-
-                buy_price = buy_price_elem.text.strip()
-                buy_change_span = cols[1].find('span', {'class': ['colorGreen', 'colorRed']})
-
-                if buy_change_span:
-                    buy_change = buy_change_span.text.strip()
-                    buy_symbol = "▲" if 'colorGreen' in buy_change_span.get('class', []) else "▼"
-
-                    # Set overall trend from first row
-                    if buy_trend is None:
-                        buy_trend = 'increase' if buy_symbol == "▲" else 'decrease'
-
-                    buy_price_full = f"{buy_price} {buy_symbol}{buy_change}"
-                else:
-                    buy_price_full = buy_price
-
-                # Extract sell price and trend
-                sell_price_elem = cols[2].find('span', {'class': 'fixW'})
-                if not sell_price_elem:
-                    continue
-
-                sell_price = sell_price_elem.text.strip()
-                sell_change_span = cols[2].find('span', {'class': ['colorGreen', 'colorRed']})
-
-                if sell_change_span:
-                    sell_change = sell_change_span.text.strip()
-                    sell_symbol = "▲" if 'colorGreen' in sell_change_span.get('class', []) else "▼"
-                    sell_price_full = f"{sell_price} {sell_symbol}{sell_change}"
-                else:
-                    sell_price_full = sell_price
-
-                data.append([gold_type, buy_price_full, sell_price_full])
-
-            except Exception as e:
-                print(f"Error parsing row: {e}")
-                continue
-
-    return buy_trend, data
+    """Parse gold prices from 24h.com.vn (only the price table block, see crawler.gold_parsers)"""
+    return parse_gold_table(content)
 
 
 def convert_day_to_vietnamese(day):
@@ -174,7 +128,7 @@ def convert_day_to_vietnamese(day):
     }.get(day, day)
 
 
-def format_as_code_block(data):
+def format_as_code_block(data, source="24h.com.vn"):
     """Format gold data as code block"""
     print("Formatting data as code block...")
     now = datetime.now(timezone.utc) + timedelta(hours=7)
@@ -187,7 +141,7 @@ def format_as_code_block(data):
 
     table = [
         f"{current_time} {current_day} {current_date}: Giá vàng! 📊",
-        "Nguồn: 24h.com.vn",
+        f"Nguồn: {source}",
         "",
         line,
         f"| {header[0]:<4} | {header[1]:<12} | {header[2]:<12} |",
@@ -203,59 +157,60 @@ def format_as_code_block(data):
     return "```" + "\n".join(table) + "\n```"
 
 
-def send_to_telegram(message, parse_mode="MarkdownV2"):
-    """Send message to Telegram"""
-    print("Sending message to Telegram...")
+def record_gold_prices(buy_trend, data):
+    """Add a fetch to the price history. Returns the trend vs the previous fetch, else the page's own"""
     try:
-        session = create_session()
-        response = session.post(
-            TELEGRAM_URL,
-            data={
-                'chat_id': CHAT_ID,
-                'text': message,
-                'parse_mode': parse_mode
-            },
-            timeout=TIMEOUT
-        )
+        store = get_gold_store()
+        store.record(data)
+        return store.detect_trend() or buy_trend
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not record gold prices: {e}")
+        return buy_trend
 
-        if response.status_code == 200:
-            print("Message sent successfully.")
-        else:
-            print(f"Error sending message: {response.status_code}, {response.text}")
 
-    except requests.RequestException as e:
-        print(f"Error sending message to Telegram: {e}")
+def cache_gold_prices(buy_trend, data, source="24h.com.vn"):
+    """Store a fresh fetch for chat commands answered from the result cache"""
+    if data:
+        get_result_cache().put("gold_price", {'buy_trend': buy_trend, 'rows': data, 'source': source})
+
+
+def send_to_telegram(message, parse_mode="MarkdownV2"):
+    """Send message to Telegram via the shared rate-limited dispatcher"""
+    return _send_to_telegram(message, parse_mode=parse_mode)
 
 
 def main():
     """Main function"""
+    get_settings()
     print("Starting gold price bot...")
 
-    try:
-        buy_trend, data = fetch_gold_prices()
+    with message_batch():
+        try:
+            source, buy_trend, data = fetch_gold_snapshot()
+            cache_gold_prices(buy_trend, data, source)
 
-        if data:
-            # Send formatted table
-            send_to_telegram(format_as_code_block(data))
+            if data:
+                # Send formatted table
+                send_to_telegram(format_as_code_block(data, source))
 
-            # Send trend message
-            user_tag = os.getenv('USER_TAG', '')
+                # Send trend message
+                user_tag = get_settings().user_tag
 
-            if buy_trend == 'increase':
-                send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
-            elif buy_trend == 'decrease':
-                send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
+                if buy_trend == 'increase':
+                    send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
+                elif buy_trend == 'decrease':
+                    send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
+                else:
+                    send_to_telegram(f"📊 Giá vàng cập nhật từ {source}", parse_mode=None)
             else:
-                send_to_telegram("📊 Giá vàng cập nhật từ 24h.com.vn", parse_mode=None)
-        else:
-            error_msg = "❌ Không thể lấy giá vàng từ 24h.com.vn"
-            send_to_telegram(error_msg, parse_mode=None)
-            print(error_msg)
+                error_msg = "❌ Không thể lấy giá vàng từ 24h.com.vn"
+                send_to_telegram(error_msg, parse_mode=None)
+                print(error_msg)
 
-    except Exception as e:
-        error_msg = f"❌ Lỗi hệ thống gold bot: {str(e)}"
-        send_to_telegram(error_msg, parse_mode=None)
-        print(f"Gold bot error: {e}")
+        except Exception as e:
+            error_msg = f"❌ Lỗi hệ thống gold bot: {str(e)}"
+            send_to_telegram(error_msg, parse_mode=None)
+            print(f"Gold bot error: {e}")
 
     print("Gold price bot finished.")
 
@@ -1,14 +1,15 @@
 # crawler/github_actions_fetcher.py
 # Enhanced fetcher for GitHub Actions environment
 
+import re
 import requests
 import time
-import random
 from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
+from services.host_throttle import wait_for_host
+from services.http_client import create_crawl_adapter
 
 
-def create_github_actions_session():
+def create_github_actions_session(total_retries=5):
     """Create session optimized for GitHub Actions"""
     session = requests.Session()
 
@@ -31,13 +32,13 @@ def create_github_actions_session():
 
     # Retry strategy
     retry_strategy = Retry(
-        total=5,
+        total=total_retries,
         status_forcelist=[429, 500, 502, 503, 504, 520, 522, 524],
         backoff_factor=2,
         raise_on_status=False
     )
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = create_crawl_adapter(max_retries=retry_strategy)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
@@ -52,12 +53,7 @@ def fetch_with_fallback(url, timeout=30, max_attempts=3):
         try:
             print(f"Attempt {attempt + 1}/{max_attempts} for {url}")
 
-            # Random delay to avoid rate limiting
-            if attempt > 0:
-                delay = random.uniform(2, 5)
-                print(f"Waiting {delay:.1f} seconds...")
-                time.sleep(delay)
-
+            # Spacing between attempts comes from the session's per-host throttle
             response = session.get(url, timeout=timeout)
 
             if response.status_code == 200:
@@ -80,39 +76,103 @@ def fetch_with_fallback(url, timeout=30, max_attempts=3):
 
 
 # Enhanced gold price fetcher
-def fetch_gold_prices_github_actions():
-    """Enhanced gold price fetcher for GitHub Actions"""
-    print("Fetching gold prices (GitHub Actions mode)...")
-
-    url = "https://www.24h.com.vn/gia-vang-hom-nay-c425.html"
-
-    # Try primary URL
-    response = fetch_with_fallback(url, timeout=30, max_attempts=3)
-
-    if not response:
-        # Try alternative gold price sources
-        alternative_sources = [
-            "https://cafef.vn/gia-vang.chn",
-            "https://vietcombank.com.vn/exchange-rate",
-            # Add more backup sources
-        ]
-
-        for alt_url in alternative_sources:
-            print(f"Trying alternative source: {alt_url}")
-            response = fetch_with_fallback(alt_url, timeout=20, max_attempts=2)
-            if response:
-                print(f"✅ Using alternative source: {alt_url}")
-                break
-
-    if not response:
-        return "Không thể kết nối đến các trang web giá vàng.", []
-
-    # Continue with normal parsing...
+GOLD_SOURCE_TIMEOUT = 20
+
+
+class GoldSource:
+    """A gold price page and the parser for it; parse(content) -> (buy_trend, rows)"""
+
+    def __init__(self, name, label, url, parse):
+        self.name = name
+        self.label = label
+        self.url = url
+        self.parse = parse
+
+
+# Gold product names (brands, purities, "vàng"/"nhẫn"); rows of stock or exchange rate tables don't match
+GOLD_PRODUCT_RE = re.compile(
+    r'vàng|nhẫn|nữ trang|trang sức|\bSJC\b|\bPNJ\b|\bDOJI\b|\bBTMC\b|Bảo Tín|Phú Quý|Mi Hồng'
+    r'|\b9999\b|\b999\.9\b|\b24K\b|\b18K\b',
+    re.IGNORECASE
+)
+
+
+def parse_generic_price_table(content):
+    """
+    Rows of any table whose first cell names a gold product and next two cells are prices
+    (no trend). Used for pages without a dedicated parser, so anything else is skipped.
+    """
     from bs4 import BeautifulSoup
-    soup = BeautifulSoup(response.content, 'html.parser')
+    from services.gold_history import parse_price
 
-    # ... rest of gold parsing logic
-    return None, []  # Placeholder
+    soup = BeautifulSoup(content, 'html.parser')
+    data = []
+    for row in soup.find_all('tr'):
+        cols = [col.get_text(" ", strip=True) for col in row.find_all('td')]
+        if len(cols) < 3 or not GOLD_PRODUCT_RE.search(cols[0]):
+            continue
+        buy, sell = parse_price(cols[1]), parse_price(cols[2])
+        # Skip quantity / date columns, gold prices are in the thousands or more
+        if buy and sell and buy >= 1000 and sell >= 1000:
+            data.append([cols[0], cols[1], cols[2]])
+    return None, data
+
+
+def _parse_24h(content):
+    from crawler.gold_parsers import parse_gold_table
+    return parse_gold_table(content)
+
+
+GOLD_SOURCES = [
+    GoldSource("24h", "24h.com.vn", "https://www.24h.com.vn/gia-vang-hom-nay-c425.html", _parse_24h),
+    GoldSource("cafef", "cafef.vn", "https://cafef.vn/gia-vang.chn", parse_generic_price_table),
+]
+
+
+def _fetch_gold_source(source, cancelled, session):
+    """One racing attempt: download (giving up once another source has won) and parse"""
+    from services.hedged_fetch import RaceCancelled
+
+    response = session.get(source.url, timeout=(5, GOLD_SOURCE_TIMEOUT), stream=True)
+    try:
+        if response.status_code != 200:
+            print(f"❌ HTTP {response.status_code} from {source.label}")
+            return None
+        chunks = []
+        for chunk in response.iter_content(64 * 1024):
+            if cancelled.is_set():
+                raise RaceCancelled()
+            chunks.append(chunk)
+    finally:
+        response.close()
+
+    buy_trend, data = source.parse(b"".join(chunks))
+    return (buy_trend, data) if data else None
+
+
+def race_gold_sources(sources=None):
+    """
+    Fetch gold prices from whichever source answers first with a parsable table:
+    the historically fastest healthy source starts first, backups follow after a hedge delay.
+    Returns (source_label, buy_trend, rows), rows are empty when every source failed.
+    """
+    from services.hedged_fetch import get_source_health, race
+
+    sources = {source.name: source for source in (sources or GOLD_SOURCES)}
+    health = get_source_health()
+    session = create_github_actions_session(total_retries=1)
+
+    order = health.rank(list(sources))
+    print(f"Racing gold sources: {', '.join(order)}")
+    name, result = race(order, lambda n, cancelled: _fetch_gold_source(sources[n], cancelled, session),
+                        health=health)
+    if not result:
+        return None, None, []
+
+    source = sources[name]
+    print(f"✅ Using {source.label}")
+    buy_trend, data = result
+    return source.label, buy_trend, data
 
 
 # Enhanced bus price fetcher
@@ -147,6 +207,7 @@ def fetch_bus_prices_github_actions():
         url = "https://www.bushikaku.net/search/niigata_tokyo/nagaoka_shinjuku/202506/time_division_type-night/"
 
         print(f"Loading bus website: {url}")
+        wait_for_host(url)
         driver.get(url)
 
         # Wait longer for page load
@@ -0,0 +1,198 @@
+# crawler/gold_parsers.py
+"""
+Parsers for the 24h.com.vn gold price table. Only the `cate-24h-gold-pri-table` block is
+parsed: it is cut out of the raw page bytes first, so the rest of the page (~95% of it)
+is never tokenized. The fastest installed backend is used: selectolax, then lxml, then
+BeautifulSoup (always available). GOLD_PARSER=selectolax|lxml|bs4 forces one.
+"""
+
+from bs4 import BeautifulSoup
+
+GOLD_BLOCK_CLASS = 'cate-24h-gold-pri-table'
+GOLD_TABLE_CLASS = 'gia-vang-search-data-table'
+BACKEND_ORDER = ('selectolax', 'lxml', 'bs4')
+
+
+def slice_gold_block(content):
+    """Bytes of the gold block up to the end of its price table, None if the page has no such block"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    marker = content.find(GOLD_BLOCK_CLASS.encode())
+    if marker < 0:
+        return None
+    start = content.rfind(b'<div', 0, marker)
+    table = content.find(GOLD_TABLE_CLASS.encode(), marker)
+    end = content.find(b'</table>', table) if table >= 0 else -1
+    if start < 0 or end < 0:
+        return None
+    return content[start:end + len(b'</table>')]
+
+
+def build_row(gold_type, buy, sell):
+    """
+    One table row from its cells, each cell as (price, change, is_increase) or None.
+    Returns ([type, buy, sell], buy_symbol) or None when a price is missing.
+    """
+    if not buy or not sell:
+        return None
+
+    def full(cell):
+        price, change, increase = cell
+        if change is None:
+            return price, None
+        symbol = "▲" if increase else "▼"
+        return f"{price} {symbol}{change}", symbol
+
+    buy_full, buy_symbol = full(buy)
+    sell_full, _ = full(sell)
+    return [gold_type, buy_full, sell_full], buy_symbol
+
+
+def rows_to_result(rows):
+    """(buy_trend, data); the trend comes from the first row that shows a buy change"""
+    data, buy_trend = [], None
+    for row in rows:
+        if row is None:
+            continue
+        values, buy_symbol = row
+        if buy_trend is None and buy_symbol:
+            buy_trend = 'increase' if buy_symbol == "▲" else 'decrease'
+        data.append(values)
+    return buy_trend, data
+
+
+# --- BeautifulSoup ---------------------------------------------------------
+
+def _bs4_cell(td):
+    price = td.find('span', {'class': 'fixW'})
+    if not price:
+        return None
+    change = td.find('span', {'class': ['colorGreen', 'colorRed']})
+    if not change:
+        return price.text.strip(), None, False
+    return price.text.strip(), change.text.strip(), 'colorGreen' in change.get('class', [])
+
+
+def parse_bs4(fragment):
+    soup = BeautifulSoup(fragment, 'html.parser')
+    table = soup.find('table', {'class': GOLD_TABLE_CLASS})
+    if not table:
+        return None
+    rows = []
+    for tr in table.find_all('tr'):
+        cols = tr.find_all('td')
+        if len(cols) >= 3:
+            rows.append(build_row(cols[0].text.strip(), _bs4_cell(cols[1]), _bs4_cell(cols[2])))
+    return rows_to_result(rows)
+
+
+# --- lxml ------------------------------------------------------------------
+
+_XPATH_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+
+def _lxml_cell(td):
+    price = td.xpath(f".//span[{_XPATH_CLASS.format('fixW')}]")
+    if not price:
+        return None
+    change = td.xpath(f".//span[{_XPATH_CLASS.format('colorGreen')} or {_XPATH_CLASS.format('colorRed')}]")
+    if not change:
+        return price[0].text_content().strip(), None, False
+    return (price[0].text_content().strip(), change[0].text_content().strip(),
+            'colorGreen' in change[0].get('class', '').split())
+
+
+def parse_lxml(fragment):
+    import lxml.html
+
+    root = lxml.html.fromstring(fragment)
+    tables = root.xpath(f"//table[{_XPATH_CLASS.format(GOLD_TABLE_CLASS)}]")
+    if not tables:
+        return None
+    rows = []
+    for tr in tables[0].iter('tr'):
+        cols = tr.xpath('./td')
+        if len(cols) >= 3:
+            rows.append(build_row(cols[0].text_content().strip(), _lxml_cell(cols[1]), _lxml_cell(cols[2])))
+    return rows_to_result(rows)
+
+
+# --- selectolax ------------------------------------------------------------
+
+def _selectolax_cell(td):
+    price = td.css_first('span.fixW')
+    if price is None:
+        return None
+    change = td.css_first('span.colorGreen, span.colorRed')
+    if change is None:
+        return price.text(strip=True), None, False
+    return (price.text(strip=True), change.text(strip=True),
+            'colorGreen' in (change.attributes.get('class') or '').split())
+
+
+def parse_selectolax(fragment):
+    from selectolax.lexbor import LexborHTMLParser
+
+    table = LexborHTMLParser(fragment).css_first(f'table.{GOLD_TABLE_CLASS}')
+    if table is None:
+        return None
+    rows = []
+    for tr in table.css('tr'):
+        cols = tr.css('td')
+        if len(cols) >= 3:
+            rows.append(build_row(cols[0].text(strip=True), _selectolax_cell(cols[1]), _selectolax_cell(cols[2])))
+    return rows_to_result(rows)
+
+
+BACKENDS = {
+    'selectolax': ('selectolax.lexbor', parse_selectolax),
+    'lxml': ('lxml.html', parse_lxml),
+    'bs4': ('bs4', parse_bs4),
+}
+
+_backend = None
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    names = []
+    for name in BACKEND_ORDER:
+        try:
+            __import__(BACKENDS[name][0])
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def get_backend():
+    """Name of the backend parse_gold_table uses (GOLD_PARSER or the fastest installed one)"""
+    global _backend
+    if _backend is None:
+        installed = available_backends()
+        from config import get_settings
+        wanted = get_settings().gold_parser
+        if wanted and wanted not in installed:
+            print(f"⚠️ GOLD_PARSER={wanted} is not installed, using {installed[0]}")
+        _backend = wanted if wanted in installed else installed[0]
+    return _backend
+
+
+def parse_gold_table(content, backend=None):
+    """
+    (buy_trend, rows) from a 24h.com.vn page; rows are [type, buy, sell] strings.
+    (None, []) when the price table is missing.
+    """
+    fragment = slice_gold_block(content)
+    if fragment is None:
+        # Markup around the block changed: search the whole page instead
+        print("⚠️ Could not find gold price table in raw page, parsing the full page")
+        fragment = content
+    if isinstance(fragment, bytes):
+        # 24h.com.vn is UTF-8; lxml would guess latin-1 for a fragment without <meta charset>
+        fragment = fragment.decode('utf-8', 'replace')
+    result = BACKENDS[backend or get_backend()][1](fragment)
+    if result is None:
+        print("❌ Could not find price data table")
+        return None, []
+    return result
@@ -11,7 +11,11 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from services.telegram_bot import send_to_telegram
+from services.telegram_bot import send_to_telegram, queue_to_telegram, message_batch, report_progress
+from services.telegram_dispatcher import PRIORITY_ALERT, PRIORITY_DIGEST
+from services.result_cache import fetch_and_cache, take_cached_field
+from services.host_throttle import wait_for_host
+from config import get_settings
 
 
 class StableBusPriceTracker:
@@ -158,7 +162,7 @@ class StableBusPriceTracker:
         print("🔄 Trying fallback method with requests...")
 
         try:
-            import requests
+            from services.http_client import get_http_session
             from bs4 import BeautifulSoup
 
             headers = {
@@ -172,7 +176,7 @@ class StableBusPriceTracker:
             url = os.getenv("TARGET_URL",
                             "https://www.bushikaku.net/search/niigata_tokyo/nagaoka_shinjuku/202506/time_division_type-night/")
 
-            response = requests.get(url, headers=headers, timeout=30)
+            response = get_http_session().get(url, headers=headers, timeout=30)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -209,6 +213,7 @@ class StableBusPriceTracker:
 
         try:
             print(f"📄 Loading: {url}")
+            wait_for_host(url)
             driver.get(url)
 
             # Wait for page to load
@@ -220,6 +225,7 @@ class StableBusPriceTracker:
             time.sleep(10)
 
             print(f"📋 Page title: {driver.title}")
+            report_progress("🚌 Đã tải trang, đang đọc bảng giá...")
 
             # Try multiple extraction strategies
             prices_data = {}
@@ -251,6 +257,10 @@ class StableBusPriceTracker:
                                                     print(f"Found: {date_str} -> ¥{price}")
                                             except ValueError:
                                                 continue
+
+                    # Show partial results in the chat as soon as a calendar table is parsed
+                    if prices_data:
+                        report_progress(self.format_partial_prices(prices_data))
             except Exception as e:
                 print(f"Strategy 1 error: {e}")
 
@@ -290,6 +300,12 @@ class StableBusPriceTracker:
             print(f"❌ Unexpected error: {e}")
             return {}
 
+    def format_partial_prices(self, prices_data):
+        """Short progress text with the prices found so far"""
+        cheapest_date, cheapest_price = min(prices_data.items(), key=lambda x: x[1])
+        return (f"🚌 Đang đọc bảng giá... đã tìm thấy {len(prices_data)} ngày\n"
+                f"💰 Rẻ nhất đến giờ: ¥{cheapest_price:,} ({cheapest_date})")
+
     def save_to_database(self, prices_data):
         """Save prices to database and detect changes"""
         if not prices_data:
@@ -383,33 +399,53 @@ class StableBusPriceTracker:
         else:
             message = f"🚍 Không tìm thấy giá bus ({current_time})"
 
-        send_to_telegram(message, parse_mode=None)
+        # Summary and alerts are merged into as few messages as possible;
+        # alerts keep the higher priority lane so the merged message jumps the queue
+        with message_batch():
+            queue_to_telegram(message, parse_mode=None, priority=PRIORITY_DIGEST)
 
-        # Send price change alerts
-        if changes_detected:
-            for change in changes_detected:
-                date_obj = datetime.strptime(change['date'], "%Y-%m-%d")
-                formatted_date = date_obj.strftime("%d/%m/%Y")
+            # Send price change alerts
+            if changes_detected:
+                for change in changes_detected:
+                    date_obj = datetime.strptime(change['date'], "%Y-%m-%d")
+                    formatted_date = date_obj.strftime("%d/%m/%Y")
 
-                if change['change_amount'] < 0:
-                    emoji = "📉"
-                    trend = "giảm"
-                else:
-                    emoji = "📈"
-                    trend = "tăng"
+                    if change['change_amount'] < 0:
+                        emoji = "📉"
+                        trend = "giảm"
+                    else:
+                        emoji = "📈"
+                        trend = "tăng"
 
-                change_msg = f"{emoji} Giá bus {trend}!\n\n"
-                change_msg += f"📅 Ngày: {formatted_date}\n"
-                change_msg += f"💴 Giá cũ: ¥{change['old_price']:,}\n"
-                change_msg += f"💰 Giá mới: ¥{change['new_price']:,}\n"
-                change_msg += f"📊 Thay đổi: {change['change_amount']:+,} ({change['change_percentage']:+.1f}%)"
+                    change_msg = f"{emoji} Giá bus {trend}!\n\n"
+                    change_msg += f"📅 Ngày: {formatted_date}\n"
+                    change_msg += f"💴 Giá cũ: ¥{change['old_price']:,}\n"
+                    change_msg += f"💰 Giá mới: ¥{change['new_price']:,}\n"
+                    change_msg += f"📊 Thay đổi: {change['change_amount']:+,} ({change['change_percentage']:+.1f}%)"
 
-                send_to_telegram(change_msg, parse_mode=None)
+                    queue_to_telegram(change_msg, parse_mode=None, priority=PRIORITY_ALERT)
 
     def run(self):
         """Main execution function with fallback support"""
         print("=== Starting Stable Bus Price Tracker ===")
 
+        # Stored for chat commands answered from the result cache
+        result = fetch_and_cache("bus_price", self.fetch)
+        return self.publish(result)
+
+    def fetch(self):
+        """
+        Fetch stage: crawl, store the prices and detect changes against the database.
+        Returns {'prices': {date: min_price}, 'changes': [...]}, {} when nothing was found.
+        Runs once per crawl, so cached results never write old prices again.
+        """
+        prices_data = self.fetch_prices()
+        if not prices_data:
+            return {}
+        return {'prices': prices_data, 'changes': self.save_to_database(prices_data)}
+
+    def fetch_prices(self):
+        """Crawl {date: min_price} via Selenium, or the fallback fetch"""
         prices_data = {}
 
         # Try Selenium first
@@ -428,15 +464,24 @@ class StableBusPriceTracker:
         # If Selenium failed, try fallback
         if not prices_data:
             print("🔄 Selenium failed, trying fallback method...")
+            report_progress("🔄 Selenium lỗi, đang thử cách dự phòng...")
             prices_data = self.fallback_price_fetch()
 
-        # Process results
+        return prices_data
+
+    def publish(self, result):
+        """
+        Render stage: send the prices (no database writes). The changes fetch() detected are
+        taken out of the cached result, so their alerts go out once even when the same
+        cached result is rendered again for later chat commands.
+        """
+        prices_data = (result or {}).get('prices', {})
         if prices_data:
             print(f"✅ Found {len(prices_data)} price entries")
 
             lowest_week_price = self.get_lowest_price_this_week(prices_data)
-            changes_detected = self.save_to_database(prices_data)
-            self.send_price_update(prices_data, changes_detected, lowest_week_price)
+            changes = take_cached_field("bus_price", "changes") or []
+            self.send_price_update(prices_data, changes, lowest_week_price)
 
             print("✅ Bus price tracking completed successfully")
             return True
@@ -448,6 +493,7 @@ class StableBusPriceTracker:
 
 def main():
     """Main function"""
+    get_settings()
     tracker = StableBusPriceTracker()
     return tracker.run()
 
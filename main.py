@@ -1,12 +1,20 @@
 # main.py - Updated for GitHub Actions with KMS Support
 import sys
-import os
 from datetime import datetime
 
-# Import all bot modules
-from crawler.crawler_ai_news import run_ai_bot
-from crawler.crawler_bus_price import BusPriceTracker
-from crawler.crawler_gold import fetch_gold_prices, format_as_code_block, send_to_telegram
+from config import get_settings
+
+# Bot modules (and the Telegram sender) are imported inside the functions that use them,
+# so a single command does not pay for Selenium / Notion / requests imports it never uses
+
+# Commands that send to Telegram: pending outbox messages are delivered first, the queue is flushed on exit
+SENDING_COMMANDS = ("ai", "gold", "bus", "kms", "events", "all", "schedule")
+
+
+def run_ai_bot():
+    """Run AI news bot"""
+    from crawler.crawler_ai_news import run_ai_bot as run_ai_news_bot
+    run_ai_news_bot()
 
 
 def run_gold_bot():
@@ -24,52 +32,55 @@ def run_gold_bot():
             print("Enhanced gold crawler not found, using standard version...")
 
     # Standard version
-    try:
-        from crawler.crawler_gold import fetch_gold_prices, format_as_code_block, send_to_telegram
+    from services.telegram_bot import message_batch
+    with message_batch():
+        try:
+            from crawler.crawler_gold import fetch_gold_prices, format_as_code_block, send_to_telegram, cache_gold_prices
 
-        # Handle the return values properly
-        result = fetch_gold_prices()
+            # Handle the return values properly
+            result = fetch_gold_prices()
 
-        # Check if result has 2 or 3 values
-        if len(result) == 3:
-            buy_trend, data, source_name = result
-            print(f"✅ Data retrieved from source: {source_name}")
-        else:
-            buy_trend, data = result
-            source_name = None
+            # Check if result has 2 or 3 values
+            if len(result) == 3:
+                buy_trend, data, source_name = result
+                print(f"✅ Data retrieved from source: {source_name}")
+            else:
+                buy_trend, data = result
+                source_name = None
+            cache_gold_prices(buy_trend, data)
 
-        if data:
-            # Try to use the enhanced format function first
-            try:
-                if source_name:
-                    send_to_telegram(format_as_code_block(data, source_name))
-                else:
+            if data:
+                # Try to use the enhanced format function first
+                try:
+                    if source_name:
+                        send_to_telegram(format_as_code_block(data, source_name))
+                    else:
+                        send_to_telegram(format_as_code_block(data))
+                except TypeError:
+                    # Fallback: format_as_code_block only accepts 1 argument
                     send_to_telegram(format_as_code_block(data))
-            except TypeError:
-                # Fallback: format_as_code_block only accepts 1 argument
-                send_to_telegram(format_as_code_block(data))
-                if source_name:
-                    send_to_telegram(f"📊 Nguồn: {source_name}", parse_mode=None)
-
-            user_tag = os.getenv('USER_TAG', '')
-            if buy_trend == 'increase':
-                send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
-            elif buy_trend == 'decrease':
-                send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
+                    if source_name:
+                        send_to_telegram(f"📊 Nguồn: {source_name}", parse_mode=None)
+
+                user_tag = get_settings().user_tag
+                if buy_trend == 'increase':
+                    send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
+                elif buy_trend == 'decrease':
+                    send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
+                else:
+                    send_to_telegram(f"📊 Giá vàng cập nhật thành công!", parse_mode=None)
             else:
-                send_to_telegram(f"📊 Giá vàng cập nhật thành công!", parse_mode=None)
-        else:
-            print("No gold data retrieved")
-            send_to_telegram("❌ Không thể lấy giá vàng hôm nay", parse_mode=None)
+                print("No gold data retrieved")
+                send_to_telegram("❌ Không thể lấy giá vàng hôm nay", parse_mode=None)
 
-    except Exception as e:
-        print(f"Gold bot error: {e}")
-        # Send error notification
-        try:
-            from services.telegram_bot import send_to_telegram
-            send_to_telegram(f"❌ Lỗi gold bot: {str(e)[:100]}...", parse_mode=None)
-        except:
-            pass
+        except Exception as e:
+            print(f"Gold bot error: {e}")
+            # Send error notification
+            try:
+                from services.telegram_bot import send_to_telegram
+                send_to_telegram(f"❌ Lỗi gold bot: {str(e)[:100]}...", parse_mode=None)
+            except:
+                pass
 
     print("Gold price bot finished.")
 
@@ -149,9 +160,35 @@ def run_event_bot():
 
     print("Event Checker bot finished.")
 
+# Services run by the "all" paths (names from the service registry)
+ALL_SERVICES = ["ai_news", "gold_price", "bus_price", "notion_kms", "event_checker"]
+
+
+def run_all_bots(service_names=None):
+    """Run services concurrently (browser ones one at a time), each with a SERVICE_TIMEOUT deadline"""
+    from services.service_registry import registry
+    results = registry.execute_many(service_names or ALL_SERVICES, timeout=get_settings().service_timeout)
+    return all(result.success for result in results.values())
+
+
 def is_github_actions():
     """Check if running in GitHub Actions"""
-    return os.getenv('GITHUB_ACTIONS') == 'true'
+    return get_settings().github_actions
+
+
+def drain_outbox():
+    """Deliver messages left pending by a previous run before doing new work"""
+    from services.telegram_bot import drain_outbox as drain
+    try:
+        drain()
+    except Exception as e:
+        print(f"⚠️ Could not drain Telegram outbox: {e}")
+
+
+def flush_telegram(timeout=60):
+    """Deliver everything still queued before the process exits"""
+    from services.telegram_bot import flush_telegram as flush
+    return flush(timeout)
 
 
 def is_interactive():
@@ -227,6 +264,9 @@ def main():
     # Check if running with command line arguments
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
+        sends = command in SENDING_COMMANDS
+        if sends:
+            drain_outbox()
 
         try:
             if command == "ai":
@@ -241,20 +281,19 @@ def main():
                 run_event_bot()
             elif command == "all":
                 print("=== Running all bots ===")
-                run_ai_bot()
-                run_gold_bot()
-                run_bus_bot()
-                run_kms_bot()
-                run_event_bot()
+                run_all_bots()
             elif command == "schedule":
                 start_bus_scheduler()
             elif command == "db":
                 view_bus_database()
             elif command == "chatbot":
-                # Start interactive chatbot
+                # Start interactive chatbot (polling by default, --webhook or BOT_MODE=webhook to receive pushes)
                 from telegram_chatbot import TelegramChatBot
                 bot = TelegramChatBot()
-                bot.start_polling()
+                if "--webhook" in sys.argv[2:] or get_settings().bot_mode == 'webhook':
+                    bot.start_webhook()
+                else:
+                    bot.start_polling()
             else:
                 print("Available commands:")
                 print("  python main.py ai        # Run AI news bot")
@@ -266,41 +305,32 @@ def main():
                 print("  python main.py schedule  # Start bus price scheduler")
                 print("  python main.py db        # View bus database")
                 print("  python main.py chatbot   # Start interactive chatbot")
+                print("  python main.py chatbot --webhook  # Chatbot via webhook on $PORT (default 8080)")
 
         except Exception as e:
             print(f"❌ Error running {command}: {e}")
             # Don't exit with error code in GitHub Actions to avoid failing the workflow
             if not is_github_actions():
+                if sends:
+                    flush_telegram(60)
                 sys.exit(1)
+
+        # Deliver everything still queued before the process exits
+        if sends:
+            flush_telegram(60)
         return
 
+    drain_outbox()
+
     # If not interactive (Docker or GitHub Actions), run all bots by default
     if not is_interactive():
         print("🤖 Running in non-interactive mode - executing all bots")
         try:
-            run_ai_bot()
-            print("✅ AI News Bot completed")
+            run_all_bots(["ai_news", "gold_price", "bus_price", "notion_kms"])
         except Exception as e:
-            print(f"❌ AI News Bot failed: {e}")
-
-        try:
-            run_gold_bot()
-            print("✅ Gold Price Bot completed")
-        except Exception as e:
-            print(f"❌ Gold Price Bot failed: {e}")
-
-        try:
-            run_bus_bot()
-            print("✅ Bus Price Bot completed")
-        except Exception as e:
-            print(f"❌ Bus Price Bot failed: {e}")
-
-        try:
-            run_kms_bot()
-            print("✅ KMS Bot completed")
-        except Exception as e:
-            print(f"❌ KMS Bot failed: {e}")
+            print(f"❌ Running bots failed: {e}")
 
+        flush_telegram(60)
         print("=== Execution completed ===")
         return
 
@@ -328,28 +358,9 @@ def main():
             elif choice == "6":
                 print("\n=== Running All Bots ===")
                 try:
-                    run_ai_bot()
-                    print("✅ AI News Bot completed")
-                except Exception as e:
-                    print(f"❌ AI News Bot failed: {e}")
-
-                try:
-                    run_gold_bot()
-                    print("✅ Gold Price Bot completed")
-                except Exception as e:
-                    print(f"❌ Gold Price Bot failed: {e}")
-
-                try:
-                    run_bus_bot()
-                    print("✅ Bus Price Bot completed")
-                except Exception as e:
-                    print(f"❌ Bus Price Bot failed: {e}")
-
-                try:
-                    run_kms_bot()
-                    print("✅ KMS Bot completed")
+                    run_all_bots(["ai_news", "gold_price", "bus_price", "notion_kms"])
                 except Exception as e:
-                    print(f"❌ KMS Bot failed: {e}")
+                    print(f"❌ Running bots failed: {e}")
 
                 print("=== All bots execution completed ===")
 
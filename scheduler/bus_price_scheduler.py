@@ -10,7 +10,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from crawler.crawler_bus_price import BusPriceTracker
-from services.telegram_bot import send_to_telegram
+from services.telegram_bot import send_to_telegram, start_outbox_drainer
+from services.job_executor import get_job_executor
+from services.service_registry import get_registry
+from config import get_settings
 
 # Setup logging
 logging.basicConfig(
@@ -31,6 +34,24 @@ class BusPriceScheduler:
         self.max_errors = 5
 
     def run_price_check(self):
+        """
+        Queue a price check on the shared executor, placed by the bus_price resource hints
+        (browser lane, one Chrome at a time). The schedule loop is never blocked by a crawl.
+        """
+        config = get_registry().configs.get("bus_price")
+        lane = config.lane if config else "browser"
+        executor = get_job_executor()
+
+        # An idempotent check already queued or running makes this one redundant
+        if (config is None or config.idempotent) and executor.is_active("bus_price"):
+            logging.info("Price check already queued or running, skipping this slot")
+            return None
+
+        if config:
+            logging.info(f"Queuing price check on the {lane} lane (~{config.expected_duration:.0f}s)")
+        return executor.submit("bus_price", self.check_prices, lane)
+
+    def check_prices(self):
         """Run price check with error handling"""
         try:
             logging.info("Starting scheduled price check...")
@@ -92,6 +113,9 @@ class BusPriceScheduler:
         """Main scheduler loop"""
         logging.info("Starting Bus Price Scheduler...")
 
+        # Retry messages that could not be delivered earlier
+        start_outbox_drainer()
+
         # Send startup notification
         startup_msg = "🚀 Bus price scheduler started!\n\nWill check prices 3 times daily and notify of changes."
         send_to_telegram(startup_msg, parse_mode=None)
@@ -122,11 +146,12 @@ def run_once():
     """Run price check once (for testing)"""
     logging.info("Running single price check...")
     scheduler = BusPriceScheduler()
-    scheduler.run_price_check()
+    scheduler.check_prices()
 
 
 def main():
     """Main function with command line options"""
+    get_settings()
     if len(sys.argv) > 1:
         if sys.argv[1] == "once":
             run_once()
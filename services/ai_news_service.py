@@ -6,13 +6,23 @@ class AINewsService(BaseService):
     def get_config(self) -> ServiceConfig:
         return ServiceConfig(
             name="ai_news",
-            description="Latest AI news from CNBC",
+            description="Latest AI news from CNBC and AI news feeds",
             keywords=["ai", "ai news", "tin ai", "news", "tin tức", "tech news", "cnbc"],
             emoji="🤖",
             category="news",
-            requires_env=["BOT_TOKEN", "CHAT_ID"]
+            requires_env=["BOT_TOKEN", "CHAT_ID"],
+            expected_duration=8,
+            cache_ttl=1800
         )
 
+    def fetch(self):
+        from crawler.crawler_ai_news import fetch_and_store_news
+        return fetch_and_store_news(8)
+
+    def render(self, data) -> bool:
+        from crawler.crawler_ai_news import send_ai_news
+        return send_ai_news(data)
+
     def execute(self) -> bool:
         try:
             from crawler.crawler_ai_news import run_ai_bot
@@ -0,0 +1,175 @@
+# services/article_store.py
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+ARTICLE_DB_FILE = "ai_articles.db"
+# Unsent articles older than this are no longer news: they are skipped instead of delivered
+UNSENT_MAX_AGE = 2 * 86400
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = ("utm_", "__source", "mc_", "fbclid", "gclid")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def canonical_url(url):
+    """Same article -> same key: lowercase host, no fragment, no tracking params, no trailing slash"""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(_TRACKING_PARAMS)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class ArticleStore:
+    """Every AI news article ever fetched, keyed by canonical URL, with first-seen and sent times"""
+
+    def __init__(self, db_file=ARTICLE_DB_FILE):
+        self.db_file = db_file
+        self.init_database()
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                description TEXT,
+                image TEXT,
+                published TEXT,
+                source TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                sent_at REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles (first_seen)')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_summaries (
+                url TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _to_news(row):
+        url, title, description, image, published, summary = row
+        news = {"title": title, "link": url, "desc": description, "img": image, "date": published}
+        if summary:
+            news["summary"] = summary
+        return news
+
+    def add_many(self, news_items, source="cnbc"):
+        """Record fetched items (already known URLs are left untouched). Returns the number of new articles"""
+        now = time.time()
+        rows = [(canonical_url(n["link"]), n.get("title"), n.get("desc", ""), n.get("img", ""),
+                 n.get("date"), n.get("source", source), now)
+                for n in news_items if n.get("link")]
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        before = conn.total_changes
+        cursor.executemany('''
+            INSERT OR IGNORE INTO articles (url, title, description, image, published, source, first_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        added = conn.total_changes - before
+        conn.commit()
+        conn.close()
+        return added
+
+    def skip_stale(self, max_age=UNSENT_MAX_AGE):
+        """Mark unsent articles first seen more than max_age seconds ago as sent. Returns how many"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE articles SET sent_at = ? WHERE sent_at IS NULL AND first_seen < ?",
+                       (now, now - max_age))
+        skipped = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return skipped
+
+    def unsent(self, limit=8):
+        """Newest articles not delivered yet (page order within one fetch)"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.url, a.title, a.description, a.image, a.published, s.summary
+            FROM articles a LEFT JOIN article_summaries s ON s.url = a.url
+            WHERE a.sent_at IS NULL ORDER BY a.first_seen DESC, a.rowid LIMIT ?
+        ''', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._to_news(row) for row in rows]
+
+    def mark_sent(self, urls):
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.executemany("UPDATE articles SET sent_at = ? WHERE url = ?",
+                           [(time.time(), canonical_url(url)) for url in urls])
+        conn.commit()
+        conn.close()
+
+    def latest(self, limit=5):
+        """Most recently seen articles, sent or not (answers chat queries without a fetch)"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.url, a.title, a.description, a.image, a.published, s.summary
+            FROM articles a LEFT JOIN article_summaries s ON s.url = a.url
+            ORDER BY a.first_seen DESC, a.rowid LIMIT ?
+        ''', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._to_news(row) for row in rows]
+
+    def get_summaries(self, urls):
+        """{url: summary} for the given urls that were already summarized"""
+        keys = {canonical_url(url): url for url in urls}
+        if not keys:
+            return {}
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(keys))
+        cursor.execute(f"SELECT url, summary FROM article_summaries WHERE url IN ({placeholders})", list(keys))
+        rows = cursor.fetchall()
+        conn.close()
+        return {keys[url]: summary for url, summary in rows}
+
+    def put_summary(self, url, summary):
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO article_summaries (url, summary, created_at) VALUES (?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET summary = excluded.summary, created_at = excluded.created_at
+        ''', (canonical_url(url), summary, time.time()))
+        conn.commit()
+        conn.close()
+
+    def count(self):
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM articles")
+        total = cursor.fetchone()[0]
+        conn.close()
+        return total
+
+
+def get_article_store():
+    """Shared ArticleStore (SQLite file is created on first use)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from config import get_settings
+                _store = ArticleStore(get_settings().article_db)
+    return _store
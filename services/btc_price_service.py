@@ -1,5 +1,5 @@
 # services/btc_price_service.py - Example BTC Service
-import requests
+from services.http_client import get_http_session
 from services.service_registry import BaseService, ServiceConfig
 from services.telegram_bot import send_to_telegram
 
@@ -12,13 +12,14 @@ class BTCPriceService(BaseService):
             keywords=["btc", "bitcoin", "crypto", "cryptocurrency", "giá bitcoin"],
             emoji="₿",
             category="finance",
-            requires_env=["BOT_TOKEN", "CHAT_ID"]
+            requires_env=["BOT_TOKEN", "CHAT_ID"],
+            expected_duration=1
         )
 
     def execute(self) -> bool:
         try:
             # Fetch BTC price from CoinGecko API
-            response = requests.get(
+            response = get_http_session().get(
                 "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd,vnd&include_24hr_change=true",
                 timeout=10
             )
@@ -120,7 +121,7 @@ class NotionService(BaseService):
 
 
 # services/weather_service.py - Example Weather Service
-import requests
+from services.http_client import get_http_session
 from services.service_registry import BaseService, ServiceConfig
 from services.telegram_bot import send_to_telegram
 
@@ -143,7 +144,7 @@ class WeatherService(BaseService):
             api_key = os.getenv('OPENWEATHER_API_KEY')
             city = "Nagaoka,JP"
 
-            response = requests.get(
+            response = get_http_session().get(
                 f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric",
                 timeout=10
             )
@@ -175,7 +176,7 @@ class WeatherService(BaseService):
 
 
 # services/github_service.py - Example GitHub Integration
-import requests
+from services.http_client import get_http_session
 from services.service_registry import BaseService, ServiceConfig
 from services.telegram_bot import send_to_telegram
 
@@ -204,7 +205,7 @@ class GitHubService(BaseService):
             }
 
             # Get recent commits
-            response = requests.get(
+            response = get_http_session().get(
                 f'https://api.github.com/repos/{repo}/commits',
                 headers=headers,
                 params={'per_page': 3},
@@ -10,9 +10,27 @@ class BusPriceService(BaseService):
             keywords=["bus", "xe", "xe buýt", "bus time", "bus price", "giá xe", "nagaoka", "shinjuku"],
             emoji="🚌",
             category="transport",
-            requires_env=["BOT_TOKEN", "CHAT_ID", "TARGET_URL"]
+            requires_env=["BOT_TOKEN", "CHAT_ID", "TARGET_URL"],
+            needs_browser=True,
+            expected_duration=90,
+            memory_class="high",
+            cache_ttl=3600
         )
 
+    def _tracker(self):
+        try:
+            from crawler.stable_bus_crawler import StableBusPriceTracker
+            return StableBusPriceTracker()
+        except ImportError:
+            from crawler.crawler_bus_price import BusPriceTracker
+            return BusPriceTracker()
+
+    def fetch(self):
+        return self._tracker().fetch()
+
+    def render(self, data) -> bool:
+        return self._tracker().publish(data)
+
     def execute(self) -> bool:
         try:
             # Try stable version first
@@ -0,0 +1,80 @@
+# services/cnbc_extractor.py
+import json
+
+S_DATA_MARKER = b"window.__s_data"
+SCRIPT_END = b"</script>"
+
+_decoder = json.JSONDecoder()
+
+
+def extract_s_data(content):
+    """
+    Decode the window.__s_data object straight from the raw page bytes (no HTML parse).
+    Only the bytes from the opening brace to the end of its <script> are decoded to text;
+    raw_decode stops at the end of the object, so whatever follows it is never read.
+    Returns the dict, or None when the page has no embedded data.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    marker = content.find(S_DATA_MARKER)
+    if marker < 0:
+        return None
+    start = content.find(b"{", marker + len(S_DATA_MARKER))
+    if start < 0:
+        return None
+
+    end = content.find(SCRIPT_END, start)
+    try:
+        return _decoder.raw_decode(content[start:end if end >= 0 else None].decode("utf-8", "replace"))[0]
+    except json.JSONDecodeError:
+        if end < 0:
+            return None
+        # A literal "</script>" inside a JSON string cut the slice short, decode up to the end of the page
+        try:
+            return _decoder.raw_decode(content[start:].decode("utf-8", "replace"))[0]
+        except json.JSONDecodeError:
+            return None
+
+
+def iter_assets(data):
+    """Assets of every module in page.page.layout[].columns[].modules[], in page order"""
+    try:
+        layouts = data["page"]["page"]["layout"]
+    except (KeyError, TypeError):
+        return
+    for layout in layouts or []:
+        for col in layout.get("columns") or []:
+            for mod in col.get("modules") or []:
+                yield from (mod.get("data") or {}).get("assets") or []
+
+
+def asset_to_news(asset):
+    """CNBC asset -> news dict used by format_ai_news"""
+    promo = asset.get("promoImage")
+    return {
+        "title": asset.get("title") or asset.get("headline"),
+        "link": asset.get("url"),
+        "desc": asset.get("description", ""),
+        "img": promo.get("url") if promo else "",
+        "date": (asset.get("datePublished") or asset.get("dateLastPublished")
+                 or asset.get("dateLastPublishedFormattedWithoutTime")),
+    }
+
+
+def iter_news(content, max_items=10):
+    """News items from a CNBC page, unique by link; stops walking once max_items are found"""
+    data = extract_s_data(content)
+    if data is None:
+        return
+    seen = set()
+    for asset in iter_assets(data):
+        if not isinstance(asset, dict):
+            continue
+        news = asset_to_news(asset)
+        if news["link"] in seen:
+            continue
+        seen.add(news["link"])
+        yield news
+        if len(seen) >= max_items:
+            return
@@ -0,0 +1,115 @@
+# services/dedup_cache.py
+import hashlib
+import re
+import sqlite3
+import time
+
+DEDUP_DB_FILE = "telegram_dedup.db"
+DEFAULT_WINDOW_HOURS = 12
+
+# Volatile parts of a header line: times, full dates and Vietnamese day names
+_TIMESTAMP_RE = re.compile(
+    r'\d{1,2}:\d{2}(?::\d{2})?'
+    r'|\d{1,2}/\d{1,2}/\d{4}'
+    r'|Thứ (?:Hai|Ba|Tư|Năm|Sáu|Bảy)|Chủ Nhật'
+)
+
+
+def normalize_message(text):
+    """
+    Normalize message for hashing: drop the timestamp from the header line
+    (first non-empty line) and collapse whitespace. Body lines are kept as is
+    because dates there (e.g. bus alert dates) are real content.
+    """
+    lines = text.strip().split("\n")
+    for idx, line in enumerate(lines):
+        if line.strip():
+            lines[idx] = _TIMESTAMP_RE.sub("", line)
+            break
+    return "\n".join(" ".join(line.split()) for line in lines).strip()
+
+
+def content_hash(chat_id, text):
+    normalized = normalize_message(text)
+    return hashlib.sha256(f"{chat_id}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+class DedupCache:
+    """SQLite record of delivered messages, keyed by chat + normalized content hash"""
+
+    def __init__(self, db_file=DEDUP_DB_FILE, window_hours=DEFAULT_WINDOW_HOURS):
+        self.db_file = db_file
+        # 0 disables dedup
+        self.window_hours = window_hours
+        self.init_database()
+
+    @property
+    def enabled(self):
+        return self.window_hours > 0
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS delivered_messages (
+                content_hash TEXT PRIMARY KEY,
+                chat_id TEXT NOT NULL,
+                delivered_at REAL NOT NULL,
+                skipped_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def is_duplicate(self, chat_id, text):
+        """True if identical content was delivered to this chat inside the window"""
+        if not self.enabled:
+            return False
+
+        cutoff = time.time() - self.window_hours * 3600
+        key = content_hash(chat_id, text)
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT delivered_at FROM delivered_messages WHERE content_hash = ? AND delivered_at >= ?",
+            (key, cutoff)
+        )
+        duplicate = cursor.fetchone() is not None
+        if duplicate:
+            cursor.execute(
+                "UPDATE delivered_messages SET skipped_count = skipped_count + 1 WHERE content_hash = ?",
+                (key,)
+            )
+            conn.commit()
+        conn.close()
+        return duplicate
+
+    def record(self, chat_id, text):
+        """Remember that content was delivered now"""
+        if not self.enabled:
+            return
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO delivered_messages (content_hash, chat_id, delivered_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(content_hash) DO UPDATE SET delivered_at = excluded.delivered_at, skipped_count = 0
+        ''', (content_hash(chat_id, text), str(chat_id), time.time()))
+        conn.commit()
+        conn.close()
+
+    def purge_expired(self):
+        """Delete records older than the window"""
+        cutoff = time.time() - self.window_hours * 3600
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM delivered_messages WHERE delivered_at < ?", (cutoff,))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
@@ -1,6 +1,6 @@
 # services/event_checker_service.py
 from services.service_registry import BaseService, ServiceConfig
-from services.telegram_bot import send_to_telegram
+from services.telegram_bot import send_to_telegram, message_batch
 from datetime import datetime, timedelta, timezone
 from utils.day_converter import convert_day_to_vietnamese
 
@@ -13,7 +13,10 @@ class EventCheckerService(BaseService):
             keywords=["event", "events", "イベント", "event checker", "sự kiện", "su kien"],
             emoji="🎪",
             category="events",
-            requires_env=["BOT_TOKEN", "CHAT_ID"]
+            requires_env=["BOT_TOKEN", "CHAT_ID"],
+            needs_browser=True,
+            expected_duration=40,
+            memory_class="high"
         )
 
     def execute(self) -> bool:
@@ -24,14 +27,15 @@ class EventCheckerService(BaseService):
             events = fetch_events(max_events=8)
 
             if events:
-                message = format_events(events)
-                send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True)
-
-                # Send notification with user tag
-                import os
-                user_tag = os.getenv('USER_TAG', '')
-                tag_str = f" {user_tag}" if user_tag else ""
-                send_to_telegram(f"🎪 Cập nhật sự kiện mới nha{tag_str} ✨", parse_mode=None)
+                with message_batch():
+                    message = format_events(events)
+                    send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True)
+
+                    # Send notification with user tag
+                    from config import get_settings
+                    user_tag = get_settings().user_tag
+                    tag_str = f" {user_tag}" if user_tag else ""
+                    send_to_telegram(f"🎪 Cập nhật sự kiện mới nha{tag_str} ✨", parse_mode=None)
 
                 print("✅ Event Checker service completed successfully")
                 return True
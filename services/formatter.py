@@ -12,7 +12,7 @@ def format_ai_news(news_items, max_items=5):
     current_date = now.strftime("%d/%m/%Y")
 
     message_lines = [
-        f"{current_time} {current_day} {current_date}: Tin tức AI mới nhất từ CNBC 🤖",
+        f"{current_time} {current_day} {current_date}: Tin tức AI mới nhất 🤖",
         ""
     ]
 
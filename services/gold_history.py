@@ -0,0 +1,163 @@
+# services/gold_history.py
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+GOLD_DB_FILE = "gold_prices.db"
+# Two fetches inside the same minute are the same snapshot
+SNAPSHOT_RESOLUTION = 60
+
+_PRICE_RE = re.compile(r'^\s*([\d.,]+)')
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def parse_price(text):
+    """Display string ("7,500 ▲50", "148.500") -> integer price, None if there is no number"""
+    m = _PRICE_RE.match(text or "")
+    if not m:
+        return None
+    digits = re.sub(r'[.,]', '', m.group(1))
+    return int(digits) if digits else None
+
+
+class GoldPriceStore:
+    """Every gold fetch as integer buy/sell prices per gold type (SQLite time series)"""
+
+    def __init__(self, db_file=GOLD_DB_FILE):
+        self.db_file = db_file
+        self.init_database()
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS gold_prices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                gold_type TEXT NOT NULL,
+                fetched_at INTEGER NOT NULL,
+                buy INTEGER NOT NULL,
+                sell INTEGER NOT NULL,
+                UNIQUE (gold_type, fetched_at)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_gold_prices_fetched_at ON gold_prices (fetched_at)')
+
+        conn.commit()
+        conn.close()
+
+    def record(self, rows, fetched_at=None):
+        """Store [type, buy, sell] display rows. Returns the number of rows inserted"""
+        fetched_at = int(fetched_at or time.time()) // SNAPSHOT_RESOLUTION * SNAPSHOT_RESOLUTION
+        values = []
+        for gold_type, buy_text, sell_text in rows:
+            buy, sell = parse_price(buy_text), parse_price(sell_text)
+            if buy is not None and sell is not None:
+                values.append((gold_type, fetched_at, buy, sell))
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        before = conn.total_changes
+        cursor.executemany('''
+            INSERT OR IGNORE INTO gold_prices (gold_type, fetched_at, buy, sell)
+            VALUES (?, ?, ?, ?)
+        ''', values)
+        inserted = conn.total_changes - before
+        conn.commit()
+        conn.close()
+        return inserted
+
+    def changes_since_previous(self):
+        """
+        Latest snapshot of every gold type against the one before it:
+        [(type, buy, sell, buy_change, sell_change)], changes are None for a first snapshot.
+        Types keep the order of the page.
+        """
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT gold_type, buy, sell, prev_buy, prev_sell FROM (
+                SELECT id, gold_type, buy, sell,
+                       LAG(buy) OVER w AS prev_buy, LAG(sell) OVER w AS prev_sell,
+                       ROW_NUMBER() OVER (PARTITION BY gold_type ORDER BY fetched_at DESC) AS rn
+                FROM gold_prices
+                WINDOW w AS (PARTITION BY gold_type ORDER BY fetched_at)
+            ) WHERE rn = 1 ORDER BY id
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        return [(gold_type, buy, sell,
+                 None if prev_buy is None else buy - prev_buy,
+                 None if prev_sell is None else sell - prev_sell)
+                for gold_type, buy, sell, prev_buy, prev_sell in rows]
+
+    def range_stats(self, days=7):
+        """
+        Per gold type over the last `days` days:
+        {type: {'min_buy', 'max_buy', 'min_sell', 'max_sell', 'first_buy', 'last_buy', 'last_sell', 'spread', 'samples'}}
+        """
+        since = int(time.time() - days * 86400)
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT gold_type, MIN(buy), MAX(buy), MIN(sell), MAX(sell), COUNT(*), MIN(fetched_at), MAX(fetched_at), MIN(id)
+            FROM gold_prices WHERE fetched_at >= ?
+            GROUP BY gold_type ORDER BY MIN(id)
+        ''', (since,))
+        groups = cursor.fetchall()
+
+        stats = {}
+        for gold_type, min_buy, max_buy, min_sell, max_sell, samples, first_at, last_at, _ in groups:
+            cursor.execute("SELECT buy FROM gold_prices WHERE gold_type = ? AND fetched_at = ?", (gold_type, first_at))
+            first_buy = cursor.fetchone()[0]
+            cursor.execute("SELECT buy, sell FROM gold_prices WHERE gold_type = ? AND fetched_at = ?", (gold_type, last_at))
+            last_buy, last_sell = cursor.fetchone()
+            stats[gold_type] = {
+                'min_buy': min_buy, 'max_buy': max_buy, 'min_sell': min_sell, 'max_sell': max_sell,
+                'first_buy': first_buy, 'last_buy': last_buy, 'last_sell': last_sell,
+                'spread': last_sell - last_buy, 'samples': samples,
+            }
+        conn.close()
+        return stats
+
+    def detect_trend(self):
+        """'increase' / 'decrease' from the first gold type's buy price vs the previous fetch, None if unchanged"""
+        changes = self.changes_since_previous()
+        if not changes or not changes[0][3]:
+            return None
+        return 'increase' if changes[0][3] > 0 else 'decrease'
+
+
+def format_gold_history(stats, days):
+    """Code block with N-day buy range, change and current spread per gold type"""
+    now = datetime.now(timezone.utc) + timedelta(hours=7)
+    line = "+------+-----------------+--------+-------+"
+    table = [
+        f"{now.strftime('%H:%M %d/%m/%Y')}: Giá vàng {days} ngày qua 📈",
+        "",
+        line,
+        f"| {'Loại':<4} | {'Mua thấp-cao':<15} | {'Δ mua':<6} | {'Chênh':<5} |",
+        line,
+    ]
+    for gold_type, s in stats.items():
+        buy_range = f"{s['min_buy']:,}-{s['max_buy']:,}"
+        change = s['last_buy'] - s['first_buy']
+        table.append(f"| {gold_type[:4]:<4} | {buy_range:<15} | {change:+6,} | {s['spread']:5,} |")
+    table.append(line)
+    return "```" + "\n".join(table) + "\n```"
+
+
+def get_gold_store():
+    """Shared GoldPriceStore (SQLite file is created on first use)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from config import get_settings
+                _store = GoldPriceStore(get_settings().gold_db)
+    return _store
@@ -10,25 +10,39 @@ class GoldPriceService(BaseService):
             keywords=["gold", "vàng", "giá vàng", "vang", "gia vang", "sjc", "doji"],
             emoji="🪙",
             category="finance",
-            requires_env=["BOT_TOKEN", "CHAT_ID"]
+            requires_env=["BOT_TOKEN", "CHAT_ID"],
+            expected_duration=5,
+            cache_ttl=900
         )
 
+    def fetch(self):
+        # Same shape as crawler_gold.cache_gold_prices stores; races sources on GitHub Actions
+        from crawler.crawler_gold import fetch_gold_snapshot
+        source, buy_trend, data = fetch_gold_snapshot()
+        return {'buy_trend': buy_trend, 'rows': data, 'source': source} if data else None
+
+    def render(self, data) -> bool:
+        from config import get_settings
+        from crawler.crawler_gold import format_as_code_block, send_to_telegram
+        from services.telegram_bot import message_batch
+
+        if not data:
+            send_to_telegram("❌ Không thể lấy dữ liệu giá vàng", parse_mode=None)
+            return False
+
+        with message_batch():
+            send_to_telegram(format_as_code_block(data['rows'], data.get('source') or "24h.com.vn"))
+            user_tag = get_settings().user_tag
+            if data['buy_trend'] == 'increase':
+                send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
+            elif data['buy_trend'] == 'decrease':
+                send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
+        return True
+
     def execute(self) -> bool:
         try:
-            import os
-
-            from crawler.crawler_gold import fetch_gold_prices, format_as_code_block, send_to_telegram
-            buy_trend, data = fetch_gold_prices()
-
-            if data:
-                send_to_telegram(format_as_code_block(data))
-                user_tag = os.getenv('USER_TAG', '')
-                if buy_trend == 'increase':
-                    send_to_telegram(f"Có nên mua vàng không má {user_tag} 🤔🤔🤔", parse_mode=None)
-                elif buy_trend == 'decrease':
-                    send_to_telegram(f"✅ Mua vàng đi má {user_tag} 🧀🧀🧀", parse_mode=None)
-                return True
-            return False
+            from services.result_cache import fetch_and_cache
+            return self.render(fetch_and_cache("gold_price", self.fetch))
 
         except Exception as e:
             print(f"Gold price service error: {e}")
@@ -0,0 +1,166 @@
+# services/hedged_fetch.py
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+SOURCE_HEALTH_FILE = "source_health.json"
+# Start the next source if the current ones have not answered within this many seconds
+HEDGE_DELAY = 3.0
+RACE_TIMEOUT = 45.0
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.3
+HEALTHY_SUCCESS_RATE = 0.5
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+class RaceCancelled(Exception):
+    """Raised inside an attempt that lost the race"""
+
+
+class SourceHealth:
+    """Moving-average latency and success rate per source, persisted as JSON between runs"""
+
+    def __init__(self, path=SOURCE_HEALTH_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            return stats if isinstance(stats, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as e:
+            print(f"⚠️ Could not read source health from {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Write to a temp file in the same directory, then rename over the old one"""
+        with self.lock:
+            snapshot = json.dumps(self.stats, indent=2, sort_keys=True)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".health-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save source health: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def record(self, name, latency, success):
+        """Fold one attempt into the averages (latency only counts for successes)"""
+        with self.lock:
+            entry = self.stats.setdefault(name, {'success_rate': 1.0, 'latency': None, 'attempts': 0})
+            entry['attempts'] += 1
+            entry['success_rate'] = (1 - EWMA_ALPHA) * entry['success_rate'] + EWMA_ALPHA * (1.0 if success else 0.0)
+            if success:
+                previous = entry['latency']
+                entry['latency'] = latency if previous is None else (1 - EWMA_ALPHA) * previous + EWMA_ALPHA * latency
+            entry['last_attempt'] = time.time()
+
+    def rank(self, names):
+        """Healthy sources fastest first, then sources without data in the given order, then unhealthy ones"""
+        def key(item):
+            index, name = item
+            entry = self.stats.get(name)
+            if entry is not None and entry['success_rate'] < HEALTHY_SUCCESS_RATE:
+                return (2, -entry['success_rate'], index)
+            if entry is None or entry.get('latency') is None:
+                return (1, 0, index)
+            return (0, entry['latency'], index)
+
+        return [name for _, name in sorted(enumerate(names), key=key)]
+
+
+def get_source_health(path=None):
+    """Shared SourceHealth per file (loaded on first use)"""
+    if path is None:
+        from config import get_settings
+        path = get_settings().source_health_file
+    with _health_lock:
+        if path not in _health:
+            _health[path] = SourceHealth(path)
+        return _health[path]
+
+
+def race(names, attempt, hedge_delay=HEDGE_DELAY, timeout=RACE_TIMEOUT, health=None):
+    """
+    Hedged race over sources in the given order. The first one starts at once; another is
+    started every hedge_delay seconds while none has succeeded, or right away when one fails.
+    attempt(name, cancelled) returns a result (None = failure) and should give up once the
+    cancelled event is set. Returns (name, result) of the first success, (None, None) otherwise.
+    """
+    if not names:
+        return None, None
+
+    cancelled = threading.Event()
+
+    def run(name):
+        if cancelled.is_set():
+            raise RaceCancelled()
+        started = time.monotonic()
+        try:
+            result = attempt(name, cancelled)
+        except RaceCancelled:
+            raise
+        except Exception as e:
+            if cancelled.is_set():
+                raise RaceCancelled()
+            print(f"❌ {name} failed: {e}")
+            result = None
+        if cancelled.is_set() and result is None:
+            raise RaceCancelled()
+        if health is not None:
+            health.record(name, time.monotonic() - started, result is not None)
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="hedge")
+    pending = {}
+    waiting = list(names)
+    deadline = time.monotonic() + timeout
+    winner = (None, None)
+    try:
+        while waiting or pending:
+            if waiting:
+                name = waiting.pop(0)
+                if pending:
+                    print(f"⏩ Hedging with {name}")
+                pending[executor.submit(run, name)] = name
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"⏰ No source answered within {timeout:.0f}s")
+                if health is not None:
+                    for name in pending.values():
+                        health.record(name, timeout, False)
+                break
+            done, _ = wait(pending, timeout=min(hedge_delay, remaining) if waiting else remaining,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except RaceCancelled:
+                    continue
+                if result is not None:
+                    winner = (name, result)
+                    break
+            if winner[0] is not None:
+                break
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if health is not None:
+            health.save()
+    return winner
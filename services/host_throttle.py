@@ -0,0 +1,102 @@
+# services/host_throttle.py
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from services.rate_limit import TokenBucket
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def host_of(url):
+    """Bucket key: hostname without a leading www."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_host_rates(spec):
+    """"bushikaku.net=0.2:1,24h.com.vn=0.5" -> {host: (rate, burst or None)}"""
+    rates = {}
+    for item in (spec or "").split(','):
+        host, _, value = item.strip().partition('=')
+        if not host or not value:
+            continue
+        rate, _, burst = value.partition(':')
+        try:
+            rates[host_of(f"//{host.strip()}")] = (float(rate), int(burst) if burst else None)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid crawl rate: {item.strip()}")
+    return rates
+
+
+class HostThrottle:
+    """
+    Per-host token buckets shared by every crawler request (requests sessions and Selenium).
+    A host that was not hit recently has a full bucket, so the first requests go out at once;
+    only bursts to the same host are spread out to `rate` requests per second.
+    """
+
+    def __init__(self, rate, burst, host_rates=None):
+        self.rate = rate
+        self.burst = burst
+        # host -> (rate, burst) overrides; burst None = default burst
+        self.host_rates = dict(host_rates or {})
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, url):
+        """Take a slot for url now and return how long the caller must wait before using it"""
+        host = host_of(url)
+        if not host:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                if rate <= 0:
+                    # Throttling disabled for this host
+                    return 0.0
+                bucket = self.buckets[host] = TokenBucket(rate, burst or self.burst)
+        return bucket.reserve(now)
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed. Returns the seconds waited"""
+        delay = self.reserve(url)
+        if delay > 0:
+            print(f"⏳ Waiting {delay:.1f}s before hitting {host_of(url)} again")
+            time.sleep(delay)
+        return delay
+
+
+class PoliteAdapter(HTTPAdapter):
+    """HTTPAdapter that passes every request through the shared HostThrottle first"""
+
+    def __init__(self, *args, throttle=None, **kwargs):
+        self.throttle = throttle
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        (self.throttle or get_host_throttle()).wait(request.url)
+        return super().send(request, **kwargs)
+
+
+def get_host_throttle():
+    """Shared HostThrottle (rates from CRAWL_HOST_RATE / CRAWL_HOST_BURST / CRAWL_HOST_RATES)"""
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                from config import get_settings
+                settings = get_settings()
+                _throttle = HostThrottle(settings.crawl_host_rate, settings.crawl_host_burst,
+                                         parse_host_rates(settings.crawl_host_rates))
+    return _throttle
+
+
+def wait_for_host(url):
+    """Call before a fetch that does not go through a requests session (e.g. driver.get)"""
+    return get_host_throttle().wait(url)
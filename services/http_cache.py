@@ -0,0 +1,369 @@
+# services/http_cache.py
+import json
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from services.host_throttle import PoliteAdapter, host_of
+
+HTTP_CACHE_DB = "http_cache.db"
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024
+# requests has already decoded the body, these no longer describe what is stored
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+# Bodies are stored decoded, so the variant chosen by Accept-Encoding does not matter
+_IGNORED_VARY = ('accept-encoding',)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def parse_cache_control(value):
+    """"max-age=60, no-cache" -> {'max-age': '60', 'no-cache': None}"""
+    directives = {}
+    for part in (value or "").split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def parse_host_ttls(spec):
+    """"24h.com.vn=600,cafef.vn=300" -> {host: seconds}"""
+    ttls = {}
+    for item in (spec or "").split(','):
+        host, _, value = item.strip().partition('=')
+        if not host or not value:
+            continue
+        try:
+            ttls[host_of(f"//{host.strip()}")] = int(value)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid cache TTL: {item.strip()}")
+    return ttls
+
+
+def freshness_lifetime(headers, now=None):
+    """
+    Seconds a response stays fresh from its Cache-Control / Expires headers:
+    None when it must not be stored, 0 when it has to be revalidated every time.
+    """
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+    if directives.get('max-age'):
+        try:
+            return max(0, int(directives['max-age']))
+        except ValueError:
+            return 0
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            date = parsedate_to_datetime(headers['Date']).timestamp() if headers.get('Date') else (now or time.time())
+            return max(0, int(parsedate_to_datetime(expires).timestamp() - date))
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def vary_values(response_headers, request_headers):
+    """
+    {header: request value} for the request headers the response varies on,
+    None when it varies on everything (Vary: *) and cannot be reused.
+    """
+    names = [name.strip().lower() for name in (response_headers.get('Vary') or "").split(',') if name.strip()]
+    if '*' in names:
+        return None
+    return {name: request_headers.get(name, "") for name in sorted(names) if name not in _IGNORED_VARY}
+
+
+def vary_matches(entry, request_headers):
+    return all(request_headers.get(name, "") == value for name, value in entry['vary'].items())
+
+
+class HttpCache:
+    """GET responses on disk (SQLite) with their validators, evicted least recently used first"""
+
+    def __init__(self, db_file=HTTP_CACHE_DB, max_bytes=HTTP_CACHE_MAX_BYTES, host_ttls=None):
+        self.db_file = db_file
+        self.max_bytes = max_bytes
+        # host -> seconds, replaces what the server's headers say
+        self.host_ttls = dict(host_ttls or {})
+        self.init_database()
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS http_responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                vary TEXT NOT NULL DEFAULT '{}'
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_http_responses_last_used ON http_responses (last_used)')
+        # Files created before responses were keyed by Vary
+        cursor.execute("PRAGMA table_info(http_responses)")
+        if 'vary' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE http_responses ADD COLUMN vary TEXT NOT NULL DEFAULT '{}'")
+
+        conn.commit()
+        conn.close()
+
+    def lifetime(self, url, headers):
+        host = host_of(url)
+        if host in self.host_ttls:
+            return self.host_ttls[host]
+        return freshness_lifetime(headers)
+
+    def get(self, url):
+        """{'status', 'headers', 'body', 'stored_at', 'expires_at', 'vary'} or None; marks the entry as recently used"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, headers, body, stored_at, expires_at, vary FROM http_responses WHERE url = ?",
+                       (url,))
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute("UPDATE http_responses SET last_used = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        conn.close()
+        if row is None:
+            return None
+        status, headers, body, stored_at, expires_at, vary = row
+        return {'status': status, 'headers': json.loads(headers), 'body': body,
+                'stored_at': stored_at, 'expires_at': expires_at, 'vary': json.loads(vary)}
+
+    def storable(self, url, headers):
+        """True if a response with these headers may be stored and could be reused later"""
+        ttl = self.lifetime(url, headers)
+        has_validator = bool(headers.get('ETag') or headers.get('Last-Modified'))
+        return ttl is not None and (ttl > 0 or has_validator) and vary_values(headers, {}) is not None
+
+    def put(self, url, status, headers, body, request_headers=None):
+        """
+        Store a response if its headers allow it and it can be reused. Returns True when stored.
+        request_headers are the ones sent for it, kept for the headers named in Vary.
+        """
+        if not self.storable(url, headers) or len(body) > self.max_bytes:
+            return False
+        ttl = self.lifetime(url, headers)
+        vary = vary_values(headers, request_headers or {})
+
+        kept = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO http_responses (url, status, headers, body, size, stored_at, expires_at, last_used, vary)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (url, status, json.dumps(kept), sqlite3.Binary(body), len(body), now, now + ttl, now, json.dumps(vary)))
+        conn.commit()
+        conn.close()
+        self.evict()
+        return True
+
+    def refresh(self, url, headers):
+        """A 304 confirmed the stored body: merge the new headers and restart its freshness"""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        merged = CaseInsensitiveDict(entry['headers'])
+        merged.update({k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS})
+        ttl = self.lifetime(url, merged) or 0
+        entry['headers'] = dict(merged)
+        entry['stored_at'] = time.time()
+        entry['expires_at'] = entry['stored_at'] + ttl
+
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE http_responses SET headers = ?, stored_at = ?, expires_at = ? WHERE url = ?",
+                       (json.dumps(entry['headers']), entry['stored_at'], entry['expires_at'], url))
+        conn.commit()
+        conn.close()
+        return entry
+
+    def evict(self):
+        """Drop least recently used responses until the cache fits in max_bytes. Returns the number dropped"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(SUM(size), 0) FROM http_responses")
+        total = cursor.fetchone()[0]
+        dropped = 0
+        if total > self.max_bytes:
+            cursor.execute("SELECT url, size FROM http_responses ORDER BY last_used")
+            victims = []
+            for url, size in cursor.fetchall():
+                if total <= self.max_bytes:
+                    break
+                victims.append((url,))
+                total -= size
+            cursor.executemany("DELETE FROM http_responses WHERE url = ?", victims)
+            dropped = len(victims)
+            conn.commit()
+        conn.close()
+        return dropped
+
+    def size(self):
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_responses")
+        count, total = cursor.fetchone()
+        conn.close()
+        return count, total
+
+
+class _TeeStream:
+    """
+    Wraps a urllib3 response: chunks read through stream() (what iter_content and .content use)
+    are kept, and the body is handed to on_complete once it was read to the end. A caller that
+    stops early (e.g. a cancelled race) downloads no more than it asked for and nothing is stored.
+    """
+
+    def __init__(self, raw, on_complete, max_bytes):
+        self._raw = raw
+        self._on_complete = on_complete
+        self._max_bytes = max_bytes
+        self._chunks = []
+        self._size = 0
+
+    def stream(self, amt=None, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            if self._chunks is not None:
+                self._size += len(chunk)
+                if self._size > self._max_bytes:
+                    self._chunks = None
+                else:
+                    self._chunks.append(chunk)
+            yield chunk
+        if self._chunks is not None:
+            body, self._chunks = b"".join(self._chunks), None
+            self._on_complete(body)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class CachingAdapter(PoliteAdapter):
+    """
+    PoliteAdapter with an HttpCache in front: fresh responses are served without touching the
+    network (or the host throttle), stale ones are revalidated with If-None-Match /
+    If-Modified-Since and a 304 is answered from disk. A request's own Cache-Control is
+    honoured (no-cache / max-age=0 always revalidate, no-store bypasses the cache), and so
+    is Vary; requests carrying Authorization bypass the cache.
+    """
+
+    def __init__(self, *args, cache=None, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def _cacheable(self, request):
+        headers = request.headers
+        # Authorized responses belong to one caller; keys are URLs, so they are never shared
+        return (request.method == 'GET' and 'Range' not in headers and 'Authorization' not in headers
+                and 'If-None-Match' not in headers and 'If-Modified-Since' not in headers
+                and 'no-store' not in parse_cache_control(headers.get('Cache-Control')))
+
+    def _usable_fresh(self, request, entry):
+        """True if entry may be returned without asking the server, as far as the request allows"""
+        now = time.time()
+        if entry['expires_at'] <= now:
+            return False
+        directives = parse_cache_control(request.headers.get('Cache-Control'))
+        if 'no-cache' in directives or 'no-cache' in (request.headers.get('Pragma') or "").lower():
+            return False
+        if 'max-age' in directives:
+            try:
+                return now - entry['stored_at'] <= int(directives['max-age'] or 0)
+            except ValueError:
+                return False
+        return True
+
+    def _cached_response(self, request, entry):
+        response = Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = BytesIO(entry['body'])
+        response._content = entry['body']
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def send(self, request, **kwargs):
+        cache = self.cache or get_http_cache()
+        if cache is None or not self._cacheable(request):
+            return super().send(request, **kwargs)
+
+        url = request.url
+        try:
+            entry = cache.get(url)
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache unavailable: {e}")
+            return super().send(request, **kwargs)
+
+        if entry is not None and not vary_matches(entry, request.headers):
+            # Stored for a different variant: its validators do not apply to this request
+            entry = None
+
+        if entry is not None:
+            if self._usable_fresh(request, entry):
+                return self._cached_response(request, entry)
+            headers = CaseInsensitiveDict(entry['headers'])
+            if headers.get('ETag'):
+                request.headers['If-None-Match'] = headers['ETag']
+            if headers.get('Last-Modified'):
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+
+        response = super().send(request, **kwargs)
+        try:
+            if response.status_code == 304 and entry is not None:
+                refreshed = cache.refresh(url, response.headers) or entry
+                response.close()
+                print(f"💾 Not modified, served from cache: {url}")
+                return self._cached_response(request, refreshed)
+            if response.status_code == 200 and cache.storable(url, response.headers) and response.raw is not None:
+                # Stored once the caller has read the whole body - streamed responses stay streamed
+                response.raw = _TeeStream(response.raw, lambda body: self._store(cache, url, response, body),
+                                          cache.max_bytes)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not update HTTP cache: {e}")
+        return response
+
+    def _store(self, cache, url, response, body):
+        try:
+            cache.put(url, response.status_code, response.headers, body, response.request.headers)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not update HTTP cache: {e}")
+
+
+def get_http_cache():
+    """Shared HttpCache, None when HTTP_CACHE_MAX_MB=0 disables it"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from config import get_settings
+                settings = get_settings()
+                if settings.http_cache_max_mb <= 0:
+                    return None
+                _cache = HttpCache(settings.http_cache_db, settings.http_cache_max_mb * 1024 * 1024,
+                                   parse_host_ttls(settings.http_cache_ttls))
+    return _cache
@@ -0,0 +1,57 @@
+# services/http_client.py
+import threading
+import requests
+from urllib3.util.retry import Retry
+from services.http_cache import CachingAdapter
+
+DEFAULT_TIMEOUT = 15
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_crawl_adapter(**kwargs):
+    """
+    HTTPAdapter for crawling sessions: GET responses go through the on-disk HttpCache,
+    and every request that reaches the network waits for its host's turn in the HostThrottle
+    """
+    return CachingAdapter(**kwargs)
+
+
+def create_http_session():
+    """Create pooled keep-alive session for crawling news / price pages"""
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT, 'Connection': 'keep-alive'})
+
+    # Retry connection errors and 5xx responses of idempotent requests
+    retry_strategy = Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        raise_on_status=False
+    )
+
+    adapter = create_crawl_adapter(pool_connections=16, pool_maxsize=16, max_retries=retry_strategy)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_http_session():
+    """Return the process-wide crawling session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_http_session()
+    return _session
+
+
+def fetch_bytes(url, timeout=DEFAULT_TIMEOUT):
+    """GET url on the shared session and return the body (raises on HTTP errors)"""
+    response = get_http_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
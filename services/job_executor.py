@@ -0,0 +1,286 @@
+# services/job_executor.py
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Lanes group jobs by the resource they hold: headless Chrome is memory heavy, HTTP jobs are not
+LANE_BROWSER = "browser"
+LANE_HTTP = "http"
+# Webhook updates being classified and answered - one at a time keeps a chat's messages in order
+LANE_UPDATES = "updates"
+
+DEFAULT_MAX_WORKERS = 5
+DEFAULT_MAX_QUEUE = 10
+DEFAULT_LANE_LIMITS = {LANE_BROWSER: 1, LANE_HTTP: 3, LANE_UPDATES: 1}
+
+
+class Job:
+    """One submitted unit of work"""
+
+    def __init__(self, name, fn, lane, seq):
+        self.name = name
+        self.fn = fn
+        self.lane = lane
+        self.seq = seq
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+
+
+class JobExecutor:
+    """
+    Fixed worker pool with a global concurrency cap, per-lane limits and a bounded queue.
+    Jobs start in submission order as soon as their lane has a free slot.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, lane_limits=None, max_queue=DEFAULT_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.lane_limits = dict(DEFAULT_LANE_LIMITS if lane_limits is None else lane_limits)
+        self.max_queue = max_queue
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = {}
+        self._active_names = {}
+        self._threads = []
+        self._stats = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                       'total_wait': 0.0, 'max_wait': 0.0}
+
+    # ---- public API ----
+
+    def submit(self, name, fn, lane=LANE_HTTP):
+        """
+        Queue fn() on a lane. Returns its Future, or None when the queue is full
+        (the caller should tell the user to retry later).
+        """
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._stats['rejected'] += 1
+                print(f"⚠️ Job queue full ({len(self._queue)}), rejected '{name}'")
+                return None
+            job = Job(name, fn, lane, next(self._seq))
+            self._queue.append(job)
+            self._active_names[name] = self._active_names.get(name, 0) + 1
+            self._stats['submitted'] += 1
+            self._ensure_started()
+            self._cond.notify_all()
+        return job.future
+
+    def position(self, future):
+        """1-based position of a queued job (0 once it started or if unknown)"""
+        with self._cond:
+            for idx, job in enumerate(self._queue):
+                if job.future is future:
+                    return idx + 1
+        return 0
+
+    def is_active(self, name):
+        """True if a job with this name is queued or running"""
+        with self._cond:
+            return self._active_names.get(name, 0) > 0
+
+    def is_busy(self, lane):
+        """True if a new job on this lane would have to wait"""
+        with self._cond:
+            return (self._running.get(lane, 0) >= self._lane_limit(lane)
+                    or sum(self._running.values()) >= self.max_workers
+                    or any(job.lane == lane for job in self._queue))
+
+    def stats(self):
+        """Snapshot of queue depth, running jobs and wait times"""
+        with self._cond:
+            started = self._stats['completed'] + self._stats['failed'] + sum(self._running.values())
+            now = time.monotonic()
+            return {
+                'queued': len(self._queue),
+                'queued_by_lane': {lane: sum(1 for job in self._queue if job.lane == lane)
+                                   for lane in self.lane_limits},
+                'running': dict(self._running),
+                'oldest_wait': max((now - job.submitted_at for job in self._queue), default=0.0),
+                'avg_wait': self._stats['total_wait'] / started if started else 0.0,
+                'max_wait': self._stats['max_wait'],
+                'submitted': self._stats['submitted'],
+                'rejected': self._stats['rejected'],
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+            }
+
+    def wait_idle(self, timeout=None):
+        """Block until nothing is queued or running. Returns True when idle"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or any(self._running.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ---- internals ----
+
+    def _lane_limit(self, lane):
+        return self.lane_limits.get(lane, self.max_workers)
+
+    def _ensure_started(self):
+        # Called with the lock held
+        if self._threads:
+            return
+        for idx in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"job-executor-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _take_ready(self):
+        """Pop the oldest job whose lane has a free slot (lock held)"""
+        for job in self._queue:
+            if self._running.get(job.lane, 0) < self._lane_limit(job.lane):
+                self._queue.remove(job)
+                self._running[job.lane] = self._running.get(job.lane, 0) + 1
+                job.started_at = time.monotonic()
+                wait = job.started_at - job.submitted_at
+                self._stats['total_wait'] += wait
+                self._stats['max_wait'] = max(self._stats['max_wait'], wait)
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._take_ready()
+                while job is None:
+                    self._cond.wait()
+                    job = self._take_ready()
+
+            if job.future.set_running_or_notify_cancel():
+                wait = job.started_at - job.submitted_at
+                if wait >= 1:
+                    print(f"⏱️ Job '{job.name}' started after waiting {wait:.1f}s")
+                try:
+                    job.future.set_result(job.fn())
+                    outcome = 'completed'
+                except Exception as e:
+                    print(f"❌ Job '{job.name}' failed: {e}")
+                    job.future.set_exception(e)
+                    outcome = 'failed'
+            else:
+                outcome = 'completed'
+
+            with self._cond:
+                self._running[job.lane] -= 1
+                self._active_names[job.name] -= 1
+                self._stats[outcome] += 1
+                self._cond.notify_all()
+
+
+@dataclass
+class JobResult:
+    """Outcome of one job run by run_with_deadlines"""
+    name: str
+    lane: str
+    status: str = "queued"  # then running -> ok / error / timeout, or skipped if it never started
+    value: Any = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    duration: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.status == "ok" and self.value is not False
+
+
+def run_with_deadlines(jobs, timeout, lane_limits=None):
+    """
+    Run (name, fn, lane) jobs concurrently, each lane capped by lane_limits.
+    Every job gets timeout seconds from the moment it starts; a job still running then is
+    reported as 'timeout' and abandoned (its daemon thread cannot be killed).
+    Returns {name: JobResult} in submission order, roughly as slow as the slowest lane.
+    """
+    limits = DEFAULT_LANE_LIMITS if lane_limits is None else lane_limits
+    semaphores = {lane: threading.Semaphore(limits.get(lane, len(jobs)))
+                  for lane in {lane for _, _, lane in jobs}}
+    cond = threading.Condition()
+    results = {name: JobResult(name, lane) for name, _, lane in jobs}
+
+    def run(result, fn):
+        with semaphores[result.lane]:
+            with cond:
+                if result.status != "queued":
+                    return
+                result.started_at = time.monotonic()
+                result.status = "running"
+            try:
+                value, status, error = fn(), "ok", None
+            except Exception as e:
+                value, status, error = None, "error", str(e)
+            with cond:
+                if result.status == "running":
+                    result.value, result.status, result.error = value, status, error
+                    result.duration = time.monotonic() - result.started_at
+                cond.notify_all()
+
+    for name, fn, lane in jobs:
+        threading.Thread(target=run, args=(results[name], fn), name=f"job-{name}", daemon=True).start()
+
+    # Queued jobs must still start before every lane could have drained at full timeouts
+    rounds = max((math.ceil(sum(1 for job in jobs if job[2] == lane) / max(limits.get(lane, len(jobs)), 1))
+                  for lane in semaphores), default=1)
+    give_up_at = time.monotonic() + timeout * rounds
+
+    with cond:
+        while True:
+            now = time.monotonic()
+            pending = [result for result in results.values() if result.status in ("running", "queued")]
+            if not pending:
+                break
+            next_deadline = None
+            for result in pending:
+                if result.status == "running":
+                    deadline = result.started_at + timeout
+                    if now >= deadline:
+                        result.status = "timeout"
+                        result.duration = now - result.started_at
+                        result.error = f"no result after {timeout}s"
+                        continue
+                elif now >= give_up_at:
+                    result.status = "skipped"
+                    result.error = "lane still busy at the deadline"
+                    continue
+                else:
+                    deadline = give_up_at
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+            if next_deadline is not None:
+                cond.wait(max(next_deadline - now, 0.01))
+
+    return results
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor():
+    """
+    Process-wide executor for chat commands. Sized by CHATBOT_MAX_WORKERS,
+    CHATBOT_BROWSER_JOBS, CHATBOT_HTTP_JOBS and CHATBOT_MAX_QUEUE.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from config import get_settings
+                settings = get_settings()
+                _executor = JobExecutor(
+                    max_workers=settings.chatbot_max_workers,
+                    lane_limits={
+                        LANE_BROWSER: settings.chatbot_browser_jobs,
+                        LANE_HTTP: settings.chatbot_http_jobs,
+                        LANE_UPDATES: DEFAULT_LANE_LIMITS[LANE_UPDATES],
+                    },
+                    max_queue=settings.chatbot_max_queue
+                )
+    return _executor
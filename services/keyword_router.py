@@ -0,0 +1,159 @@
+# services/keyword_router.py
+import unicodedata
+from collections import deque
+
+_VIETNAMESE_D = str.maketrans({'đ': 'd', 'Đ': 'd'})
+# Chat commands repeat a lot ("bus", "gold"), so recent results are memoized
+MATCH_CACHE_SIZE = 4096
+
+
+def normalize_text(text):
+    """
+    Lowercase and strip Latin diacritics ("giá vàng" -> "gia vang").
+    Only combining marks U+0300-U+036F are dropped, so Japanese dakuten stay intact.
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFD', text.translate(_VIETNAMESE_D))
+    stripped = ''.join(ch for ch in decomposed if not '\u0300' <= ch <= '\u036f')
+    return unicodedata.normalize('NFC', stripped)
+
+
+def _is_word_char(ch):
+    # CJK scripts have no spaces between words, so they never form a boundary
+    return ch.isalnum() and ord(ch) < 0x3000
+
+
+class KeywordRouter:
+    """
+    Keyword -> target index compiled once into an Aho-Corasick automaton.
+    Latin keywords only match on word boundaries ("ai" does not match "tại").
+    When several targets match, the lowest priority wins, then the longest keyword,
+    then the earliest position.
+    """
+
+    def __init__(self):
+        self._keywords = {}
+        self._order = 0
+        self._compiled = None
+        self._cache = {}
+
+    def add(self, keyword, target, priority=None):
+        """Register keyword for target (priority defaults to insertion order)"""
+        normalized = normalize_text(keyword).strip()
+        if not normalized:
+            return
+        if priority is None:
+            priority = self._order
+        self._order += 1
+        # First registration of a keyword wins, like the old first-match scan
+        self._keywords.setdefault(normalized, (target, priority))
+        self._compiled = None
+        self._cache = {}
+
+    def add_many(self, keywords, target, priority=None):
+        """Register several keywords sharing one priority"""
+        if priority is None:
+            priority = self._order
+        for keyword in keywords:
+            self.add(keyword, target, priority)
+
+    def clear(self):
+        self._keywords = {}
+        self._order = 0
+        self._compiled = None
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def build(self):
+        """Compile the automaton (done lazily on the first match)"""
+        goto = [{}]
+        outputs = [[]]
+        patterns = []
+
+        for keyword, (target, priority) in self._keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(len(patterns))
+            patterns.append((keyword, target, priority,
+                             _is_word_char(keyword[0]), _is_word_char(keyword[-1])))
+
+        fail = [0] * len(goto)
+        # Depth-1 states fail back to the root, deeper states are resolved breadth first
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(ch, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        # Fold failure links into a full transition table over the keyword alphabet,
+        # so matching is one dict lookup per character. Other characters go to the root.
+        delta = [None] * len(goto)
+        for state in self._bfs_order(goto):
+            row = dict(delta[fail[state]]) if state else {}
+            row.update(goto[state])
+            delta[state] = row
+
+        self._compiled = (delta, outputs, patterns)
+        return self
+
+    @staticmethod
+    def _bfs_order(goto):
+        order = [0]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            queue.extend(goto[state].values())
+        return order
+
+    def find_all(self, text):
+        """All boundary-respecting matches as (start, keyword, target, priority)"""
+        if self._compiled is None:
+            self.build()
+        delta, outputs, patterns = self._compiled
+
+        text = normalize_text(text)
+        matches = []
+        state = 0
+        for end, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+            for idx in outputs[state]:
+                keyword, target, priority, left_word, right_word = patterns[idx]
+                start = end - len(keyword) + 1
+                if left_word and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if right_word and end + 1 < len(text) and _is_word_char(text[end + 1]):
+                    continue
+                matches.append((start, keyword, target, priority))
+        return matches
+
+    def match(self, text, default=None):
+        """Best target for text, or default when nothing matches"""
+        cache = self._cache
+        if text in cache:
+            target = cache[text]
+        else:
+            matches = self.find_all(text)
+            target = min(matches, key=lambda m: (m[3], -len(m[1]), m[0]))[2] if matches else None
+            if len(cache) >= MATCH_CACHE_SIZE:
+                cache.clear()
+            cache[text] = target
+        return default if target is None else target
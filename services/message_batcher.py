@@ -0,0 +1,198 @@
+# services/message_batcher.py
+import html
+import re
+
+# Telegram hard limit for a text message (counted in UTF-16 code units)
+TELEGRAM_MAX_LENGTH = 4096
+
+CODE_FENCE = "```"
+MARKDOWN_SPECIAL = "_*`["
+MARKDOWN_V2_SPECIAL = "_*[]()~`>#+-=|{}.!\\"
+
+
+def telegram_length(text):
+    """Length as Telegram counts it (emoji and other astral chars count twice)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def escape_text(text, parse_mode):
+    """Escape plain text so it renders literally inside a message with parse_mode"""
+    if parse_mode == "Markdown":
+        return "".join(f"\\{ch}" if ch in MARKDOWN_SPECIAL else ch for ch in text)
+    if parse_mode == "MarkdownV2":
+        return "".join(f"\\{ch}" if ch in MARKDOWN_V2_SPECIAL else ch for ch in text)
+    if parse_mode == "HTML":
+        return html.escape(text, quote=False)
+    return text
+
+
+def _unescaped(text, marker):
+    """Count markers not preceded by a backslash"""
+    return len(re.findall(r'(?<!\\)' + re.escape(marker), text))
+
+
+def _is_balanced(text, parse_mode):
+    """True if cutting after text does not leave an inline entity open"""
+    if parse_mode in ("Markdown", "MarkdownV2"):
+        for marker in ("*", "_", "`"):
+            if _unescaped(text, marker) % 2:
+                return False
+        return _unescaped(text, "[") == _unescaped(text, ")")
+    if parse_mode == "HTML":
+        opened = len(re.findall(r'<[a-zA-Z][^>]*>', text))
+        closed = len(re.findall(r'</[a-zA-Z][^>]*>', text))
+        return opened == closed
+    return True
+
+
+def _cut_long_line(line, limit, parse_mode):
+    """Split a single line longer than limit without breaking inline entities"""
+    pieces = []
+    while telegram_length(line) > limit:
+        # Largest prefix that fits (character count is an upper bound for UTF-16 length)
+        end = min(len(line), limit)
+        while telegram_length(line[:end]) > limit:
+            end -= 1
+
+        cut = None
+        for pos in range(end, 0, -1):
+            if line[pos - 1].isspace() and _is_balanced(line[:pos], parse_mode):
+                cut = pos
+                break
+        if cut is None:
+            for pos in range(end, 0, -1):
+                if _is_balanced(line[:pos], parse_mode):
+                    cut = pos
+                    break
+        if cut is None:
+            cut = end
+
+        pieces.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    pieces.append(line)
+    return pieces
+
+
+def split_message(text, parse_mode=None, limit=TELEGRAM_MAX_LENGTH):
+    """
+    Split text into chunks that fit Telegram's limit.
+    Cuts on line boundaries and re-opens code blocks so Markdown entities stay valid.
+    """
+    if telegram_length(text) <= limit:
+        return [text]
+
+    fence_cost = telegram_length(CODE_FENCE) + 1
+    chunks = []
+    current = []
+    current_len = 0
+    in_code = False
+
+    def emit():
+        nonlocal current, current_len
+        carry = []
+        if not in_code and "" in current:
+            # Prefer cutting at the last paragraph break when it keeps the chunk reasonably full
+            split_at = len(current) - 1 - current[::-1].index("")
+            if telegram_length("\n".join(current[:split_at])) >= limit // 2:
+                carry = current[split_at + 1:]
+                current = current[:split_at]
+        body = "\n".join(current)
+        if in_code:
+            body += "\n" + CODE_FENCE
+        if body.strip():
+            chunks.append(body)
+        current = [CODE_FENCE] if in_code else carry
+        current_len = telegram_length("\n".join(current))
+
+    for raw_line in text.split("\n"):
+        budget = limit - (fence_cost if in_code or CODE_FENCE in raw_line else 0)
+        for line in _cut_long_line(raw_line, max(budget - 1, 1), None if in_code else parse_mode):
+            line_len = telegram_length(line) + (1 if current else 0)
+            reserve = fence_cost if in_code else 0
+            if current and current_len + line_len + reserve > limit:
+                emit()
+                line_len = telegram_length(line) + (1 if current else 0)
+            current.append(line)
+            current_len += line_len
+        if raw_line.count(CODE_FENCE) % 2:
+            in_code = not in_code
+
+    if current:
+        body = "\n".join(current)
+        if body.strip() and body.strip() != CODE_FENCE:
+            chunks.append(body)
+    return chunks
+
+
+class MessageBatcher:
+    """Collects messages of one run and merges consecutive ones to the same chat"""
+
+    def __init__(self, limit=TELEGRAM_MAX_LENGTH, separator="\n\n"):
+        self.limit = limit
+        self.separator = separator
+        self.items = []
+
+    def add(self, chat_id, text, parse_mode=None, disable_web_page_preview=True, priority=None):
+        if text:
+            self.items.append({
+                'chat_id': str(chat_id),
+                'text': text,
+                'parse_mode': parse_mode,
+                'disable_web_page_preview': disable_web_page_preview,
+                'priority': priority
+            })
+
+    def __len__(self):
+        return len(self.items)
+
+    @staticmethod
+    def _merge_mode(first, second):
+        """Resulting parse_mode when merging two messages, or False if they can't be merged"""
+        if first == second:
+            return first
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return False
+
+    def build(self, split=True):
+        """
+        Return merged messages as dicts ready to send, already split to fit the limit
+        (split=False keeps each merged message whole, for callers that split it themselves)
+        """
+        merged = []
+        for item in self.items:
+            last = merged[-1] if merged else None
+            mode = False
+            if (last and last['chat_id'] == item['chat_id'] and
+                    last['disable_web_page_preview'] == item['disable_web_page_preview']):
+                mode = self._merge_mode(last['parse_mode'], item['parse_mode'])
+
+            if mode is False:
+                merged.append(dict(item))
+                continue
+
+            previous_text = last['text'] if last['parse_mode'] == mode else escape_text(last['text'], mode)
+            next_text = item['text'] if item['parse_mode'] == mode else escape_text(item['text'], mode)
+            last['text'] = previous_text + self.separator + next_text
+            last['parse_mode'] = mode
+            last['priority'] = _min_priority(last['priority'], item['priority'])
+
+        self.items = []
+        if not split:
+            return merged
+
+        messages = []
+        for item in merged:
+            for chunk in split_message(item['text'], item['parse_mode'], self.limit):
+                messages.append(dict(item, text=chunk))
+        return messages
+
+
+def _min_priority(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first, second)
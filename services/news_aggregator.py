@@ -0,0 +1,264 @@
+# services/news_aggregator.py
+"""
+AI news from several outlets at once: CNBC's embedded page data plus RSS/Atom feeds,
+fetched concurrently (total latency ~ the slowest source) and merged so the same
+story reported by two outlets is sent once.
+
+    python -m services.news_aggregator                      # live
+    python -m services.news_aggregator --record fixtures/   # live, save every response
+    python -m services.news_aggregator --replay fixtures/   # offline from saved responses
+"""
+import asyncio
+import hashlib
+import html
+import os
+import random
+import re
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from services.cnbc_extractor import iter_news
+from services.http_client import fetch_bytes
+from services.keyword_router import normalize_text
+
+SOURCE_TIMEOUT = 15
+# Titles sharing at least this fraction of their content words are the same story
+SIMILARITY_THRESHOLD = 0.5
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+_STOPWORDS = frozenset(
+    "a an the and or of to in on for with by at from as is are be its it this that new how why what "
+    "says said after over into about up out than more will can".split()
+)
+# Fixed seed so signatures are comparable across runs
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+
+
+@dataclass
+class NewsSource:
+    name: str
+    url: str
+    # 'cnbc' = page with embedded window.__s_data, 'feed' = RSS or Atom
+    kind: str = "feed"
+
+
+DEFAULT_SOURCES = [
+    NewsSource("cnbc", "https://www.cnbc.com/ai-artificial-intelligence/", "cnbc"),
+    NewsSource("techcrunch", "https://techcrunch.com/category/artificial-intelligence/feed/"),
+    NewsSource("theverge", "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml"),
+    NewsSource("venturebeat", "https://venturebeat.com/category/ai/feed/"),
+]
+
+
+def load_sources():
+    """
+    Sources from AI_NEWS_SOURCES ("name=url,name=url"), defaults when unset.
+    A cnbc.com url is read as an embedded-JSON page, anything else as a feed.
+    """
+    from config import get_settings
+    raw = get_settings().ai_news_sources
+    if not raw:
+        return list(DEFAULT_SOURCES)
+
+    sources = []
+    for entry in raw.split(","):
+        name, sep, url = entry.strip().partition("=")
+        if not sep or not url.strip():
+            print(f"⚠️ Ignoring AI_NEWS_SOURCES entry {entry!r} (expected name=url)")
+            continue
+        url = url.strip()
+        sources.append(NewsSource(name.strip(), url, "cnbc" if "cnbc.com" in url else "feed"))
+    return sources
+
+
+def _clean(text, limit=300):
+    text = " ".join(_TAG_RE.sub(" ", html.unescape(text or "")).split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def _local(tag):
+    # "{http://www.w3.org/2005/Atom}entry" -> "entry"
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element, *names):
+    for child in element:
+        if _local(child.tag) in names and (child.text or "").strip():
+            return child.text.strip()
+    return ""
+
+
+def _atom_link(entry):
+    fallback = ""
+    for child in entry:
+        if _local(child.tag) != "link":
+            continue
+        href = child.get("href") or (child.text or "").strip()
+        if child.get("rel", "alternate") == "alternate" and href:
+            return href
+        fallback = fallback or href
+    return fallback
+
+
+def parse_feed(content, max_items=10):
+    """RSS 2.0 <item>s or Atom <entry>s -> news dicts"""
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        print(f"❌ Feed parse error: {e}")
+        return []
+
+    news = []
+    for element in root.iter():
+        kind = _local(element.tag)
+        if kind not in ("item", "entry"):
+            continue
+        link = _atom_link(element) if kind == "entry" else _child_text(element, "link")
+        title = _clean(_child_text(element, "title"))
+        if not title or not link:
+            continue
+        news.append({
+            "title": title,
+            "link": link,
+            "desc": _clean(_child_text(element, "description", "summary", "content", "encoded")),
+            "date": _child_text(element, "pubDate", "published", "updated", "date"),
+        })
+        if len(news) >= max_items:
+            break
+    return news
+
+
+def parse_source(source, content, max_items=10):
+    """Raw response of a source -> news dicts tagged with the source name"""
+    if source.kind == "cnbc":
+        items = [{k: n[k] for k in ("title", "link", "desc", "date")} for n in iter_news(content, max_items)]
+    else:
+        items = parse_feed(content, max_items)
+    for item in items:
+        item["source"] = source.name
+    return items
+
+
+def title_tokens(title):
+    """Content words of a title, lightly stemmed ("jumps" -> "jump")"""
+    words = _WORD_RE.findall(normalize_text(title))
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in _STOPWORDS}
+
+
+def minhash(tokens):
+    """MinHash signature (MINHASH_PERMUTATIONS values) of a token set"""
+    if not tokens:
+        return ()
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") % _MERSENNE_PRIME
+              for t in tokens]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the token sets behind two signatures"""
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def merge_near_duplicates(items, threshold=SIMILARITY_THRESHOLD):
+    """
+    Keep the first item of every story (earlier items win), dropping later ones with the
+    same link or a title whose estimated Jaccard similarity reaches threshold. Kept items
+    list every outlet that reported the story under 'sources'.
+    """
+    kept, signatures, links = [], [], set()
+    for item in items:
+        if item["link"] in links:
+            continue
+        links.add(item["link"])
+        signature = minhash(title_tokens(item["title"]))
+        for idx, other in enumerate(signatures):
+            if estimate_similarity(signature, other) >= threshold:
+                kept[idx]["sources"].append(item.get("source"))
+                break
+        else:
+            kept.append(dict(item, sources=[item.get("source")]))
+            signatures.append(signature)
+    return kept
+
+
+def _interleave(per_source):
+    """Round-robin over the sources so every outlet's top stories come first"""
+    merged = []
+    for rank in range(max((len(items) for items in per_source), default=0)):
+        merged.extend(items[rank] for items in per_source if rank < len(items))
+    return merged
+
+
+async def _fetch_source(source, fetch, max_items):
+    try:
+        content = await asyncio.wait_for(asyncio.to_thread(fetch, source.url), SOURCE_TIMEOUT + 5)
+        items = parse_source(source, content, max_items)
+        print(f"📰 {source.name}: {len(items)} tin")
+        return items
+    except Exception as e:
+        print(f"❌ {source.name} failed: {e}")
+        return []
+
+
+async def gather_news(sources, fetch=None, max_items=10):
+    """Fetch all sources concurrently, then interleave and merge near-duplicates"""
+    fetch = fetch or (lambda url: fetch_bytes(url, timeout=SOURCE_TIMEOUT))
+    per_source = await asyncio.gather(*(_fetch_source(source, fetch, max_items) for source in sources))
+    return merge_near_duplicates(_interleave(per_source))[:max_items]
+
+
+def fetch_all_news(max_items=10, sources=None, fetch=None):
+    """
+    Synchronous entry point. fetch(url) -> bytes can be swapped for a fixture
+    reader (see replay_fetcher) to run without network.
+    """
+    return asyncio.run(gather_news(sources or load_sources(), fetch, max_items))
+
+
+def fixture_path(directory, url):
+    """Where record_fetcher saves the response for url: "<host>-<url hash>.bin" """
+    host = urlsplit(url).hostname or "source"
+    return os.path.join(directory, f"{host}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]}.bin")
+
+
+def record_fetcher(directory, fetch=None):
+    """fetch(url) that also saves every response into directory"""
+    fetch = fetch or (lambda url: fetch_bytes(url, timeout=SOURCE_TIMEOUT))
+    os.makedirs(directory, exist_ok=True)
+
+    def recording(url):
+        content = fetch(url)
+        with open(fixture_path(directory, url), "wb") as f:
+            f.write(content)
+        return content
+    return recording
+
+
+def replay_fetcher(directory):
+    """fetch(url) answering from responses saved by record_fetcher (no network)"""
+    def replay(url):
+        with open(fixture_path(directory, url), "rb") as f:
+            return f.read()
+    return replay
+
+
+if __name__ == "__main__":
+    fetcher = None
+    if len(sys.argv) > 2 and sys.argv[1] == "--record":
+        fetcher = record_fetcher(sys.argv[2])
+    elif len(sys.argv) > 2 and sys.argv[1] == "--replay":
+        fetcher = replay_fetcher(sys.argv[2])
+
+    for n in fetch_all_news(15, fetch=fetcher):
+        print(f"[{', '.join(n['sources'])}] {n['title']}")
+        print(n["link"])
+        print("------")
@@ -0,0 +1,187 @@
+# services/news_enricher.py
+"""
+Optional enrichment of AI news before it is sent: fetch the article pages of the top items
+concurrently, summarize each one locally (TF-IDF sentence vectors + TextRank, NumPy) and fill
+in the 'summary' / 'time' fields format_ai_news renders. Summaries are cached by URL in the
+article store, so an article is fetched and summarized once.
+
+NumPy is optional: without it items keep their feed description as summary.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from bs4 import BeautifulSoup
+
+from services.article_store import get_article_store
+from services.http_client import fetch_bytes
+
+DEFAULT_TOP_N = 5
+SUMMARY_SENTENCES = 2
+MAX_SUMMARY_CHARS = 280
+ARTICLE_TIMEOUT = 15
+# Sentences taken from an article body; TextRank is quadratic in this
+MAX_SENTENCES = 60
+DAMPING = 0.85
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“])')
+_TOKEN_RE = re.compile(r"[a-z0-9']{2,}")
+_MARKDOWN_RE = re.compile(r'[*_`\[\]]')
+_STOPWORDS = frozenset(
+    "the and for that with this from are was were has have had but not you his her its they their "
+    "will would can could said says about into over than more also been which who what when where "
+    "how our out all one new just like after before there them some such only other".split()
+)
+
+
+def summaries_enabled():
+    """AI_NEWS_SUMMARIES=0 turns enrichment off; it is also off when NumPy is not installed"""
+    from config import get_settings
+    if not get_settings().ai_news_summaries:
+        return False
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def extract_article_text(content):
+    """Paragraph text of an article page (inside <article> when the page has one)"""
+    soup = BeautifulSoup(content, "html.parser")
+    for tag in soup(["script", "style", "noscript", "aside", "nav", "footer", "figure"]):
+        tag.decompose()
+    root = soup.find("article") or soup.body or soup
+    paragraphs = (" ".join(p.get_text(" ").split()) for p in root.find_all("p"))
+    # Bylines, captions and share buttons are short
+    return "\n".join(p for p in paragraphs if len(p) >= 60)
+
+
+def split_sentences(text):
+    sentences = []
+    for paragraph in text.split("\n"):
+        sentences.extend(s.strip() for s in _SENTENCE_RE.split(paragraph) if len(s.strip()) >= 30)
+    return sentences[:MAX_SENTENCES]
+
+
+def summarize(text, max_sentences=SUMMARY_SENTENCES):
+    """
+    Extractive summary: sentences as L2-normalized TF-IDF rows, cosine similarity graph,
+    PageRank by power iteration; the best sentences are returned in article order.
+    """
+    import numpy as np
+
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for idx, sentence in enumerate(sentences):
+        for token in _TOKEN_RE.findall(sentence.lower()):
+            if token in _STOPWORDS:
+                continue
+            rows.append(idx)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+            counts.append(1.0)
+    if not vocabulary:
+        return " ".join(sentences[:max_sentences])
+
+    tf = np.zeros((len(sentences), len(vocabulary)))
+    np.add.at(tf, (np.array(rows), np.array(cols)), np.array(counts))
+    df = np.count_nonzero(tf, axis=0)
+    tfidf = np.log1p(tf) * (np.log((1 + len(sentences)) / (1 + df)) + 1)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf /= np.where(norms == 0, 1, norms)
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with any other link to every sentence equally
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1, out_weight),
+                          1 / len(sentences))
+
+    scores = np.full(len(sentences), 1 / len(sentences))
+    for _ in range(50):
+        updated = (1 - DAMPING) / len(sentences) + DAMPING * transition.T @ scores
+        converged = np.abs(updated - scores).sum() < 1e-6
+        scores = updated
+        if converged:
+            break
+
+    best = sorted(np.argsort(-scores)[:max_sentences])
+    return " ".join(sentences[i] for i in best)
+
+
+def _shorten(text, limit=MAX_SUMMARY_CHARS):
+    # Summaries go out with parse_mode=Markdown, a stray * or _ would make Telegram reject the message
+    text = _MARKDOWN_RE.sub("", text)
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def format_published(date):
+    """RFC 822 / ISO 8601 publish date -> 'HH:MM dd/mm/YYYY' in Vietnam time ('' if unparseable)"""
+    if not date:
+        return ""
+    try:
+        published = parsedate_to_datetime(date)
+    except (TypeError, ValueError):
+        try:
+            published = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                published = datetime.strptime(date, "%Y-%m-%dT%H:%M:%S%z")
+            except ValueError:
+                return ""
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return (published.astimezone(timezone.utc) + timedelta(hours=7)).strftime("%H:%M %d/%m/%Y")
+
+
+async def _summarize_article(url, fetch):
+    try:
+        content = await asyncio.wait_for(asyncio.to_thread(fetch, url), ARTICLE_TIMEOUT + 5)
+        # Parsing and NumPy work also run off the event loop so pages are handled in parallel
+        return url, await asyncio.to_thread(lambda: _shorten(summarize(extract_article_text(content))))
+    except Exception as e:
+        print(f"⚠️ Could not summarize {url}: {e}")
+        return url, ""
+
+
+async def _summarize_all(urls, fetch):
+    return dict(await asyncio.gather(*(_summarize_article(url, fetch) for url in urls)))
+
+
+def enrich_news(news_items, top_n=DEFAULT_TOP_N, fetch=None):
+    """
+    Fill 'time' for every item and 'summary' for the first top_n (in place; returns the list).
+    Cached summaries are reused, only uncached articles are fetched.
+    """
+    for news in news_items:
+        if not news.get("time"):
+            news["time"] = format_published(news.get("date"))
+
+    top = [n for n in news_items[:top_n] if n.get("link")]
+    if not top:
+        return news_items
+    if not summaries_enabled():
+        for news in top:
+            news.setdefault("summary", _shorten(news.get("desc") or ""))
+        return news_items
+
+    store = get_article_store()
+    cached = store.get_summaries([n["link"] for n in top])
+    missing = [n["link"] for n in top if n["link"] not in cached]
+    if missing:
+        fetch = fetch or (lambda url: fetch_bytes(url, timeout=ARTICLE_TIMEOUT))
+        fresh = asyncio.run(_summarize_all(missing, fetch))
+        for url, summary in fresh.items():
+            if summary:
+                store.put_summary(url, summary)
+        cached.update(fresh)
+        print(f"📝 Summarized {sum(1 for s in fresh.values() if s)}/{len(missing)} articles")
+
+    for news in top:
+        news["summary"] = cached.get(news["link"]) or _shorten(news.get("desc") or "")
+    return news_items
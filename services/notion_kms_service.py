@@ -1,7 +1,6 @@
 # services/notion_kms_service.py
 import os
 from datetime import datetime
-from notion_client import Client
 from services.service_registry import BaseService, ServiceConfig
 from services.telegram_bot import send_to_telegram
 
@@ -29,6 +28,7 @@ class NotionKMSService(BaseService):
             self.db_id = os.getenv("NOTION_KNOWLEDGE_DB")
 
             if token and self.db_id:
+                from notion_client import Client
                 self.notion = Client(auth=token)
                 print("✅ Notion client initialized")
             else:
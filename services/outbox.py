@@ -0,0 +1,132 @@
+# services/outbox.py
+import sqlite3
+import time
+
+OUTBOX_DB_FILE = "telegram_outbox.db"
+MAX_ATTEMPTS = 5
+# A 'sending' row older than this belongs to a process that died mid-send
+CLAIM_LEASE_SECONDS = 600
+
+
+class Outbox:
+    """Write-ahead journal of outbound Telegram messages (SQLite)"""
+
+    def __init__(self, db_file=OUTBOX_DB_FILE, max_attempts=MAX_ATTEMPTS):
+        self.db_file = db_file
+        self.max_attempts = max_attempts
+        self.init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                parse_mode TEXT,
+                disable_web_page_preview INTEGER,
+                priority INTEGER NOT NULL DEFAULT 5,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                claimed_at REAL,
+                sent_at REAL
+            )
+        ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, created_at)')
+
+        conn.commit()
+        conn.close()
+
+    def record(self, chat_id, text, parse_mode=None, disable_web_page_preview=None, priority=5):
+        """Journal a message before sending. It is claimed by the caller right away"""
+        now = time.time()
+        preview = None if disable_web_page_preview is None else int(bool(disable_web_page_preview))
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO outbox (chat_id, text, parse_mode, disable_web_page_preview, priority,
+                                status, created_at, claimed_at)
+            VALUES (?, ?, ?, ?, ?, 'sending', ?, ?)
+        ''', (str(chat_id), text, parse_mode, preview, priority, now, now))
+        message_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return message_id
+
+    def claim_pending(self, limit=100):
+        """Atomically claim pending rows (and stale claims) for delivery"""
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            SELECT * FROM outbox
+            WHERE status = 'pending' OR (status = 'sending' AND claimed_at < ?)
+            ORDER BY priority, created_at
+            LIMIT ?
+        ''', (now - CLAIM_LEASE_SECONDS, limit))
+        rows = [dict(row) for row in cursor.fetchall()]
+
+        if rows:
+            cursor.executemany(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                [(now, row['id']) for row in rows]
+            )
+        conn.commit()
+        conn.close()
+        return rows
+
+    def mark_sent(self, message_ids):
+        """Mark delivered rows as done (bulk)"""
+        if not message_ids:
+            return
+        now = time.time()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.executemany(
+            "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+            [(now, message_id) for message_id in message_ids]
+        )
+        conn.commit()
+        conn.close()
+
+    def mark_failed(self, message_id, error, retryable=True):
+        """Release a row for a later retry, or give up after max_attempts / a permanent error"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE outbox
+            SET attempts = attempts + 1,
+                last_error = ?,
+                claimed_at = NULL,
+                status = CASE WHEN ? AND attempts + 1 < ? THEN 'pending' ELSE 'failed' END
+            WHERE id = ?
+        ''', (str(error)[:500], int(retryable), self.max_attempts, message_id))
+        conn.commit()
+        conn.close()
+
+    def purge_sent(self, days_to_keep=7):
+        """Delete delivered rows, and rows given up on, older than days_to_keep"""
+        cutoff = time.time() - days_to_keep * 86400
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            DELETE FROM outbox
+            WHERE (status = 'sent' AND sent_at < ?) OR (status = 'failed' AND created_at < ?)
+        ''', (cutoff, cutoff))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
@@ -0,0 +1,45 @@
+# services/rate_limit.py
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `capacity`. Thread safe"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        # Called with the lock held
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until one token is available"""
+        with self.lock:
+            self._refill(now)
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        with self.lock:
+            self._refill(now)
+            self.tokens -= 1
+
+    def reserve(self, now):
+        """
+        Take a token now, even if it is not there yet, and return the seconds to wait before
+        using it. Tokens may go negative, so later callers queue up behind this reservation.
+        """
+        with self.lock:
+            self._refill(now)
+            delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            self.tokens -= 1
+            return delay
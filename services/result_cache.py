@@ -0,0 +1,181 @@
+# services/result_cache.py
+import json
+import sqlite3
+import threading
+import time
+
+from services.job_executor import LANE_HTTP, get_job_executor
+from services.single_flight import SingleFlight
+
+RESULT_CACHE_DB = "service_cache.db"
+
+_cache = None
+_cache_lock = threading.Lock()
+# One fetch per service at a time, whether it was triggered in the foreground or by a refresh
+_fetch_flights = SingleFlight()
+# Makes "no refresh queued yet -> queue one" atomic
+_refresh_lock = threading.Lock()
+
+
+class ResultCache:
+    """Last fetched data of each service (SQLite, JSON payload) shared by cron runs and the chatbot"""
+
+    def __init__(self, db_file=RESULT_CACHE_DB):
+        self.db_file = db_file
+        self.init_database()
+
+    def init_database(self):
+        """Initialize SQLite database"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS service_results (
+                service_name TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def get(self, service_name):
+        """Return (data, fetched_at) or None"""
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute("SELECT payload, fetched_at FROM service_results WHERE service_name = ?", (service_name,))
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, service_name, data):
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO service_results (service_name, payload, fetched_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(service_name) DO UPDATE SET payload = excluded.payload, fetched_at = excluded.fetched_at
+        ''', (service_name, json.dumps(data, ensure_ascii=False), time.time()))
+        conn.commit()
+        conn.close()
+
+    def pop_field(self, service_name, field):
+        """Remove one key from a cached dict payload (fetched_at unchanged) and return its value"""
+        conn = sqlite3.connect(self.db_file, isolation_level=None)
+        cursor = conn.cursor()
+        try:
+            # Read and rewrite under one write lock so only one caller gets the value
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT payload FROM service_results WHERE service_name = ?", (service_name,))
+            row = cursor.fetchone()
+            payload = json.loads(row[0]) if row else None
+            if not isinstance(payload, dict) or field not in payload:
+                cursor.execute("COMMIT")
+                return None
+            value = payload.pop(field)
+            cursor.execute("UPDATE service_results SET payload = ? WHERE service_name = ?",
+                           (json.dumps(payload, ensure_ascii=False), service_name))
+            cursor.execute("COMMIT")
+            return value
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+def get_result_cache():
+    """Shared ResultCache (SQLite file is created on first use)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from config import get_settings
+                _cache = ResultCache(get_settings().service_cache_db)
+    return _cache
+
+
+def cached_age(service_name):
+    """Seconds since the cached result of a service was fetched (None if nothing cached)"""
+    try:
+        cached = get_result_cache().get(service_name)
+    except (sqlite3.Error, ValueError):
+        return None
+    return None if cached is None else time.time() - cached[1]
+
+
+def take_cached_field(service_name, field):
+    """
+    Take a one-shot value (e.g. price change alerts) out of the cached result: the first
+    caller gets it, later reads of the same cached result no longer see it. None if absent
+    """
+    try:
+        return get_result_cache().pop_field(service_name, field)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠️ Result cache update failed for {service_name}: {e}")
+        return None
+
+
+def fetch_and_cache(service_name, fetch):
+    """Fetch fresh data now and store it (empty results are not cached). Returns the data"""
+    def run():
+        data = fetch()
+        if data:
+            get_result_cache().put(service_name, data)
+        return data
+
+    data, shared = _fetch_flights.do(service_name, run)
+    return data
+
+
+def get_cached(service_name, fetch, ttl, stale_ttl, lane=LANE_HTTP):
+    """
+    Stale-while-revalidate read. Returns (data, fetched_at, state):
+    - 'fresh': cached data younger than ttl
+    - 'stale': older than ttl but within ttl + stale_ttl, one refresh is queued on lane
+    - 'fetched': nothing usable cached, fetched in the foreground (fetched_at is None)
+    """
+    try:
+        cached = get_result_cache().get(service_name)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠️ Result cache read failed for {service_name}: {e}")
+        cached = None
+
+    if cached is not None:
+        data, fetched_at = cached
+        age = time.time() - fetched_at
+        if age < ttl:
+            return data, fetched_at, 'fresh'
+        if age < ttl + stale_ttl:
+            refresh_in_background(service_name, fetch, lane)
+            return data, fetched_at, 'stale'
+
+    return fetch_and_cache(service_name, fetch), None, 'fetched'
+
+
+def refresh_in_background(service_name, fetch, lane=LANE_HTTP):
+    """
+    Queue a refresh on the shared job executor (so a browser crawl respects the browser
+    lane limit) unless one for this service is already queued or running
+    """
+    job_name = f"refresh-{service_name}"
+    executor = get_job_executor()
+
+    def run():
+        try:
+            fetch_and_cache(service_name, fetch)
+            print(f"♻️ Refreshed cached result of {service_name}")
+        except Exception as e:
+            print(f"❌ Background refresh of {service_name} failed: {e}")
+
+    with _refresh_lock:
+        if _fetch_flights.in_flight(service_name) or executor.is_active(job_name):
+            return None
+        future = executor.submit(job_name, run, lane)
+    if future is None:
+        print(f"⚠️ Skipped refresh of {service_name}, job queue is full")
+    return future
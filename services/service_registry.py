@@ -1,9 +1,28 @@
 # services/service_registry.py
 import os
+import hashlib
 import importlib
+import json
+import threading
+import time
 from typing import Dict, List, Callable, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
+from services.single_flight import SingleFlight, flight_key
+from services.keyword_router import KeywordRouter
+from services.job_executor import JobResult, LANE_BROWSER, LANE_HTTP, run_with_deadlines
+
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+# Default location; SERVICE_MANIFEST_FILE (Settings.service_manifest_file) overrides it
+MANIFEST_FILE = os.path.join(SERVICES_DIR, ".service_manifest.json")
+# Registered first so their keywords win ties in the router
+BUILTIN_SERVICES = ["ai_news", "gold_price", "bus_price", "notion_kms"]
+
+
+def file_digest(path: str) -> str:
+    """SHA-1 of a file's content"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
 
 
 @dataclass
@@ -16,6 +35,22 @@ class ServiceConfig:
     category: str
     enabled: bool = True
     requires_env: List[str] = None
+    # Resource hints used by executors and schedulers to place jobs
+    needs_browser: bool = False  # Selenium/Chrome - runs in the limited browser lane
+    expected_duration: float = 5.0  # Typical seconds per run
+    memory_class: str = "low"  # low / medium / high (headless Chrome is high)
+    idempotent: bool = True  # Safe to coalesce with, or retry, a run of the same service
+    cache_ttl: int = 0  # Seconds a fetched result is fresh for chat commands (0 = no cache)
+    stale_ttl: int = 86400  # How long after cache_ttl stale data is still served while refreshing
+
+    @property
+    def cacheable(self) -> bool:
+        return self.cache_ttl > 0
+
+    @property
+    def lane(self) -> str:
+        """Executor lane: browser-bound or memory heavy jobs are serialized in the browser lane"""
+        return LANE_BROWSER if self.needs_browser or self.memory_class == "high" else LANE_HTTP
 
 
 class BaseService(ABC):
@@ -31,12 +66,23 @@ class BaseService(ABC):
         """Execute the service. Return True if successful"""
         pass
 
+    def fetch(self) -> Any:
+        """Fetch stage: return JSON-serializable data (falsy on failure). Needed when cache_ttl is set"""
+        raise NotImplementedError
+
+    def render(self, data: Any) -> bool:
+        """Render/send stage for data returned by fetch(). Return True if successful"""
+        raise NotImplementedError
+
     def validate_environment(self) -> bool:
         """Validate required environment variables"""
         config = self.get_config()
         if not config.requires_env:
             return True
 
+        from config import get_settings
+        # Settings loads .env into the environment first
+        get_settings()
         missing = []
         for env_var in config.requires_env:
             if not os.getenv(env_var):
@@ -48,86 +94,179 @@ class BaseService(ABC):
         return True
 
 
+class LazyService(BaseService):
+    """Stand-in built from the manifest. The real service is imported and created on first use"""
+
+    def __init__(self, module_name: str, class_name: str, config: ServiceConfig):
+        self.module_name = module_name
+        self.class_name = class_name
+        self._config = config
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get_config(self) -> ServiceConfig:
+        return self._config
+
+    def load(self) -> BaseService:
+        """Import the module and instantiate the service (once)"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    module = importlib.import_module(f'services.{self.module_name}')
+                    self._instance = getattr(module, self.class_name)()
+        return self._instance
+
+    def execute(self) -> bool:
+        return self.load().execute()
+
+    def fetch(self) -> Any:
+        return self.load().fetch()
+
+    def render(self, data: Any) -> bool:
+        return self.load().render(data)
+
+    def __getattr__(self, name):
+        # Service specific methods (e.g. NotionKMSService.search_knowledge) load the real service
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
 class ServiceRegistry:
     """Registry for managing all bot services"""
 
-    def __init__(self):
+    def __init__(self, manifest_file: str = None):
         self.services: Dict[str, BaseService] = {}
+        self.configs: Dict[str, ServiceConfig] = {}
+        self.flights = SingleFlight()
+        if manifest_file is None:
+            from config import get_settings
+            manifest_file = get_settings().service_manifest_file or MANIFEST_FILE
+        self.manifest_file = manifest_file
+        self._router = None
         self.load_services()
 
     def load_services(self):
-        """Dynamically load all services from services directory"""
-        services_dir = os.path.dirname(__file__)
-
-        # Built-in services
-        self.register_builtin_services()
-
-        # Auto-discover services in services/ directory
-        for file in os.listdir(services_dir):
-            if file.endswith('_service.py') and not file.startswith('_'):
-                module_name = file[:-3]  # Remove .py
+        """
+        Register every service found in services/*_service.py without importing it.
+        Names, keywords and categories come from the manifest cache; only modules whose
+        file content changed since the manifest was written are imported to describe them
+        again. Content hashes (not mtimes) survive a fresh checkout or a Docker COPY.
+        """
+        manifest = self._read_manifest()
+        cached_modules = manifest.get('modules', {})
+        # ServiceConfig fields may have changed - rescan everything
+        if manifest.get('registry_digest') != file_digest(__file__):
+            cached_modules = {}
+
+        modules = {}
+        for file in sorted(os.listdir(SERVICES_DIR)):
+            if not file.endswith('_service.py') or file.startswith('_'):
+                continue
+            module_name = file[:-3]  # Remove .py
+            digest = file_digest(os.path.join(SERVICES_DIR, file))
+            entry = cached_modules.get(module_name)
+            if entry is None or entry.get('digest') != digest:
                 try:
-                    module = importlib.import_module(f'services.{module_name}')
-
-                    # Look for service classes
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if (isinstance(attr, type) and
-                                issubclass(attr, BaseService) and
-                                attr != BaseService):
-                            service_instance = attr()
-                            config = service_instance.get_config()
-                            self.services[config.name] = service_instance
-                            print(f"✅ Loaded service: {config.name}")
-
+                    entry = {'digest': digest, 'services': self._describe_module(module_name)}
                 except Exception as e:
                     print(f"❌ Failed to load {module_name}: {e}")
-
-    def register_builtin_services(self):
-        """Register built-in services"""
-        from services.ai_news_service import AINewsService
-        from services.gold_price_service import GoldPriceService
-        from services.bus_price_service import BusPriceService
-        from services.notion_kms_service import NotionKMSService
-
-        builtin_services = [
-            AINewsService(),
-            GoldPriceService(),
-            BusPriceService(),
-            NotionKMSService()
-        ]
-
-        for service in builtin_services:
-            config = service.get_config()
-            self.services[config.name] = service
+                    continue
+                for item in entry['services']:
+                    print(f"✅ Loaded service: {item['config']['name']}")
+            modules[module_name] = entry
+
+        if modules != cached_modules:
+            self._write_manifest(modules)
+
+        entries = [(module_name, item) for module_name, entry in modules.items() for item in entry['services']]
+        # Built-in services first, then the rest in file order
+        entries.sort(key=lambda e: BUILTIN_SERVICES.index(e[1]['config']['name'])
+                     if e[1]['config']['name'] in BUILTIN_SERVICES else len(BUILTIN_SERVICES))
+        for module_name, item in entries:
+            config = ServiceConfig(**item['config'])
+            self.register_service(LazyService(module_name, item['class_name'], config))
+
+    @staticmethod
+    def _describe_module(module_name: str) -> List[Dict[str, Any]]:
+        """Import a service module and read the config of each service class it defines"""
+        module = importlib.import_module(f'services.{module_name}')
+        described = []
+        for attr in vars(module).values():
+            if (isinstance(attr, type) and
+                    issubclass(attr, BaseService) and
+                    attr not in (BaseService, LazyService) and
+                    attr.__module__ == module.__name__):
+                # get_config() only returns constants - skip __init__ (it may open clients)
+                config = attr.__new__(attr).get_config()
+                described.append({'class_name': attr.__name__, 'config': asdict(config)})
+        return described
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, modules: Dict[str, Any]):
+        data = {'registry_digest': file_digest(__file__), 'modules': modules}
+        tmp_path = f"{self.manifest_file}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.manifest_file)
+        except OSError as e:
+            # Read-only deployments still work, they just rescan on every start
+            print(f"⚠️ Could not write service manifest: {e}")
+
+    def register_service(self, service: BaseService) -> ServiceConfig:
+        """Add (or replace) a service. Its config is read once and the keyword index is rebuilt"""
+        config = service.get_config()
+        self.services[config.name] = service
+        self.configs[config.name] = config
+        self._router = None
+        return config
+
+    def unregister_service(self, service_name: str):
+        """Remove a service and invalidate the keyword index"""
+        self.services.pop(service_name, None)
+        self.configs.pop(service_name, None)
+        self._router = None
+
+    def get_router(self) -> KeywordRouter:
+        """Keyword index over enabled services, compiled on first use after a change"""
+        router = self._router
+        if router is None:
+            router = KeywordRouter()
+            for name, config in self.configs.items():
+                if config.enabled:
+                    router.add_many(config.keywords, name)
+            router.build()
+            self._router = router
+        return router
 
     def get_service_by_keyword(self, text: str) -> BaseService:
         """Find service by keyword in user message"""
-        text_lower = text.lower().strip()
-
-        for service in self.services.values():
-            config = service.get_config()
-            if not config.enabled:
-                continue
-
-            for keyword in config.keywords:
-                if keyword.lower() in text_lower:
-                    return service
-
-        return None
+        service_name = self.get_router().match(text)
+        return self.services.get(service_name) if service_name else None
 
     def get_all_services(self) -> Dict[str, BaseService]:
         """Get all registered services"""
         return {name: service for name, service in self.services.items()
-                if service.get_config().enabled}
+                if self.configs[name].enabled}
 
     def get_services_by_category(self, category: str) -> Dict[str, BaseService]:
         """Get services by category"""
         return {name: service for name, service in self.services.items()
-                if service.get_config().category == category and service.get_config().enabled}
-
-    def execute_service(self, service_name: str) -> bool:
-        """Execute a service by name"""
+                if self.configs[name].category == category and self.configs[name].enabled}
+
+    def execute_service(self, service_name: str, use_cache: bool = False) -> bool:
+        """
+        Execute a service by name (concurrent calls for the same service share one run).
+        With use_cache, services that set cache_ttl answer from the result cache
+        (stale-while-revalidate) instead of fetching again.
+        """
         if service_name not in self.services:
             return False
 
@@ -135,14 +274,68 @@ class ServiceRegistry:
         if not service.validate_environment():
             return False
 
-        return service.execute()
+        config = self.configs[service_name]
+        if use_cache and config.cache_ttl > 0:
+            return self._execute_cached(service_name, service, config)
+
+        result, shared = self.flights.do(flight_key(service_name), service.execute)
+        if shared:
+            print(f"🔗 {service_name} joined an in-flight run")
+        return result
+
+    def execute_many(self, service_names: List[str] = None, timeout: float = 300,
+                     io_workers: int = 4, browser_slots: int = 1) -> Dict[str, JobResult]:
+        """
+        Run several services concurrently: HTTP services share io_workers slots,
+        browser services run browser_slots at a time. Each service gets timeout seconds.
+        Returns {name: JobResult} with status, success and duration per service.
+        """
+        if service_names is None:
+            service_names = list(self.get_all_services())
+
+        jobs = []
+        skipped = {}
+        for name in service_names:
+            if name not in self.services:
+                skipped[name] = JobResult(name, LANE_HTTP, status="skipped", error="unknown service")
+                continue
+            jobs.append((name, lambda name=name: self.execute_service(name), self.configs[name].lane))
+        # Longest jobs start first so a lane does not end on a slow straggler
+        jobs.sort(key=lambda job: self.configs[job[0]].expected_duration, reverse=True)
+
+        started = time.monotonic()
+        results = run_with_deadlines(jobs, timeout, {LANE_HTTP: io_workers, LANE_BROWSER: browser_slots})
+        results.update(skipped)
+
+        for name in service_names:
+            result = results[name]
+            icon = "✅" if result.success else "❌"
+            detail = f" ({result.error})" if result.error else ""
+            print(f"{icon} {name}: {result.status} in {result.duration:.1f}s{detail}")
+        print(f"⏱️ {len(service_names)} services finished in {time.monotonic() - started:.1f}s")
+        return {name: results[name] for name in service_names}
+
+    def _execute_cached(self, service_name: str, service: BaseService, config: ServiceConfig) -> bool:
+        from services.result_cache import get_cached
+        from services.telegram_bot import send_to_telegram
+
+        data, fetched_at, state = get_cached(service_name, service.fetch, config.cache_ttl, config.stale_ttl,
+                                             config.lane)
+        print(f"🗃️ {service_name}: {state} result")
+        success = service.render(data)
+        if fetched_at is not None:
+            cached_time = time.strftime("%H:%M %d/%m", time.localtime(fetched_at))
+            note = f"♻️ Dữ liệu lúc {cached_time}"
+            if state == 'stale':
+                note += ", đang cập nhật lại"
+            send_to_telegram(note, parse_mode=None)
+        return success
 
     def get_help_text(self) -> str:
         """Generate help text for all services"""
         categories = {}
 
-        for service in self.services.values():
-            config = service.get_config()
+        for config in self.configs.values():
             if not config.enabled:
                 continue
 
@@ -168,5 +361,22 @@ class ServiceRegistry:
         return help_text
 
 
-# Global registry instance
-registry = ServiceRegistry()
\ No newline at end of file
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ServiceRegistry:
+    """Global registry instance, built on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ServiceRegistry()
+    return _registry
+
+
+def __getattr__(name):
+    # Keeps `from services.service_registry import registry` working without building it at import
+    if name == 'registry':
+        return get_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,60 @@
+# services/single_flight.py
+import threading
+from concurrent.futures import Future
+
+
+def flight_key(name, *args, **kwargs):
+    """Key for a call: service name plus its arguments"""
+    if not args and not kwargs:
+        return name
+    parts = [repr(arg) for arg in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
+    return f"{name}({', '.join(parts)})"
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: the first caller for a key runs it,
+    callers arriving while it is in flight get the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def acquire(self, key):
+        """Return (future, leader). Only the leader runs the work and must call release()"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def release(self, key, future, result=None, error=None):
+        """Finish the leader's call and hand the outcome to every waiting caller"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        """Run fn() once per in-flight key. Returns (result, shared)"""
+        future, leader = self.acquire(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except Exception as e:
+            self.release(key, future, error=e)
+            raise
+        self.release(key, future, result)
+        return result, False
@@ -1,30 +1,357 @@
-import requests
-from config import TELEGRAM_URL, CHAT_ID, TIMEOUT
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from config import get_settings
+from services.dedup_cache import DedupCache
+from services.message_batcher import MessageBatcher, split_message
+from services.outbox import Outbox
+from services.telegram_dispatcher import get_dispatcher, PRIORITY_NORMAL
 
-def send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True):
+_local = threading.local()
+_dedup_cache = None
+_outbox = None
+_state_lock = threading.Lock()
+_drainer_thread = None
+
+
+def send_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True, priority=PRIORITY_NORMAL):
     """
     Gửi tin nhắn đến Telegram bằng Bot.
     - parse_mode: "Markdown", "MarkdownV2", "HTML", hoặc None
     - disable_web_page_preview: Ẩn/hiện preview link (nên dùng True với tin tức)
+    Tin nhắn đi qua dispatcher chung nên tự tuân thủ rate limit và retry khi bị 429.
+    Trong message_batch() tin nhắn được gom lại và gửi khi kết thúc block.
+    Tin nhắn trùng nội dung đã gửi trong khoảng TELEGRAM_DEDUP_WINDOW_HOURS sẽ bị bỏ qua.
     """
+    batcher = _current_batch()
+    if batcher is not None:
+        batcher.add(get_settings().chat_id, message, parse_mode, disable_web_page_preview, priority)
+        return True
+
     print("Sending message to Telegram...")
+    futures = _enqueue(get_settings().chat_id, message, parse_mode, disable_web_page_preview, priority)
+    return _wait_all(futures)
+
+
+def queue_to_telegram(message, parse_mode="Markdown", disable_web_page_preview=True, priority=PRIORITY_NORMAL):
+    """
+    Đưa tin nhắn vào hàng đợi gửi mà không chờ (non-blocking).
+    Trả về list Future (rỗng nếu đang gom trong message_batch);
+    gọi flush_telegram() trước khi thoát để chắc chắn đã gửi hết.
+    """
+    batcher = _current_batch()
+    if batcher is not None:
+        batcher.add(get_settings().chat_id, message, parse_mode, disable_web_page_preview, priority)
+        return []
+
+    futures = _enqueue(get_settings().chat_id, message, parse_mode, disable_web_page_preview, priority)
+    return [future for future in futures if future is not None]
+
+
+def flush_telegram(timeout=None):
+    """Chờ tới khi toàn bộ tin nhắn trong hàng đợi đã được gửi"""
+    return get_dispatcher(get_settings().bot_token).flush(timeout)
+
+
+class ProgressReply:
+    """Placeholder message that is edited in place (editMessageText) with progress and results"""
+
+    def __init__(self, chat_id, message_id, bot_token=None):
+        self.chat_id = str(chat_id)
+        self.message_id = message_id
+        self.dispatcher = get_dispatcher(bot_token or get_settings().bot_token)
+        self.last_text = None
+        self.finished = False
+
+    def update(self, text, parse_mode=None, disable_web_page_preview=True):
+        """Queue an edit without waiting (skipped if nothing changed)"""
+        if self.finished or text == self.last_text:
+            return None
+        self.last_text = text
+        return self.dispatcher.enqueue(self.chat_id, text, parse_mode, disable_web_page_preview,
+                                       PRIORITY_NORMAL, edit_message_id=self.message_id)
+
+    def finish(self, text, parse_mode=None, disable_web_page_preview=True):
+        """Replace the placeholder with the final text. Returns True if the edit succeeded"""
+        if self.finished:
+            return False
+        if text == self.last_text:
+            self.finished = True
+            return True
+        self.last_text = text
+        future = self.dispatcher.enqueue(self.chat_id, text, parse_mode, disable_web_page_preview,
+                                         PRIORITY_NORMAL, edit_message_id=self.message_id)
+        self.finished = _is_edited(_wait_response(future))
+        return self.finished
+
+
+def start_progress_reply(text, chat_id=None, bot_token=None):
+    """Send a placeholder message and return a ProgressReply for it (None if sending failed)"""
+    chat_id = chat_id or get_settings().chat_id
+    future = get_dispatcher(bot_token or get_settings().bot_token).enqueue(chat_id, text)
+    response = _wait_response(future)
+    if not _is_delivered(response):
+        return None
+    try:
+        message_id = response.json()['result']['message_id']
+    except (ValueError, KeyError):
+        return None
+    return ProgressReply(chat_id, message_id, bot_token)
+
+
+def report_progress(text):
+    """Cập nhật tin nhắn placeholder của lệnh chat đang chạy (không làm gì nếu không có)"""
+    reply = getattr(_local, 'progress_reply', None)
+    if reply is not None:
+        reply.update(text)
+
+
+@contextmanager
+def message_batch(reply=None):
+    """
+    Gom mọi tin nhắn gửi trong block (cùng thread) thành ít tin nhắn nhất có thể.
+    Tin nhắn liên tiếp tới cùng chat được nối lại và cắt theo giới hạn 4096 ký tự.
+    Nếu có reply (ProgressReply), tin đầu tiên thay thế placeholder thay vì gửi tin mới
+    và report_progress() trong block sẽ sửa placeholder.
+    """
+    batcher = _current_batch()
+    if batcher is not None:
+        # Nested batch joins the outer one
+        yield batcher
+        return
+
+    batcher = MessageBatcher()
+    _local.batcher = batcher
+    _local.progress_reply = reply
+    try:
+        yield batcher
+    finally:
+        _local.batcher = None
+        _local.progress_reply = None
+        # Merged messages stay whole until _enqueue so dedup sees each one as a unit
+        messages = batcher.build(split=False)
+        futures = []
+        if messages and reply is not None and reply.chat_id == messages[0]['chat_id']:
+            first = messages[0]
+            chunks = split_message(first['text'], first['parse_mode'])
+            if reply.finish(chunks[0], first['parse_mode'], first['disable_web_page_preview']):
+                # The user asked for this reply: the rest of it is sent without a dedup check
+                futures.extend(_enqueue_chunks(first['chat_id'], first['text'], chunks[1:], first['parse_mode'],
+                                               first['disable_web_page_preview'], first['priority'], delivered=1))
+                messages = messages[1:]
+        if messages:
+            print(f"Sending {len(messages)} batched message(s) to Telegram...")
+            for item in messages:
+                futures.extend(_enqueue(item['chat_id'], item['text'], item['parse_mode'],
+                                        item['disable_web_page_preview'], item['priority']))
+        if futures:
+            _wait_all(futures)
+
+
+@contextmanager
+def allow_repeats():
+    """Tắt dedup trong block (dùng cho lệnh chat người dùng chủ động yêu cầu)"""
+    previous = getattr(_local, 'allow_repeats', False)
+    _local.allow_repeats = True
+    try:
+        yield
+    finally:
+        _local.allow_repeats = previous
+
+
+def get_dedup_cache():
+    """Shared DedupCache (SQLite file is created on first use)"""
+    global _dedup_cache
+    if _dedup_cache is None:
+        with _state_lock:
+            if _dedup_cache is None:
+                settings = get_settings()
+                dedup_cache = DedupCache(settings.dedup_db, settings.dedup_window_hours)
+                # The file is kept between runs (e.g. the Actions cache): drop what can no longer match
+                purged = dedup_cache.purge_expired()
+                if purged:
+                    print(f"🧹 Purged {purged} expired dedup record(s)")
+                _dedup_cache = dedup_cache
+    return _dedup_cache
+
+
+def get_outbox():
+    """Shared Outbox journal (SQLite file is created on first use)"""
+    global _outbox
+    if _outbox is None:
+        with _state_lock:
+            if _outbox is None:
+                _outbox = Outbox(get_settings().outbox_db)
+    return _outbox
+
+
+def drain_outbox(timeout=120):
+    """
+    Gửi lại toàn bộ tin nhắn còn pending trong outbox (từ lần chạy trước bị lỗi/bị kill).
+    Trả về số tin nhắn đã gửi thành công.
+    """
+    outbox = get_outbox()
+    # The journal is kept between runs (e.g. the Actions cache): drop old delivered rows
+    purged = outbox.purge_sent()
+    if purged:
+        print(f"🧹 Purged {purged} old outbox row(s)")
+    delivered = 0
+    while True:
+        rows = outbox.claim_pending()
+        if not rows:
+            break
+
+        print(f"📤 Draining {len(rows)} pending message(s) from outbox...")
+        futures = [
+            _dispatch(row['chat_id'], row['text'], row['parse_mode'],
+                      None if row['disable_web_page_preview'] is None else bool(row['disable_web_page_preview']),
+                      row['priority'], row['id'])
+            for row in rows
+        ]
+        if not get_dispatcher(get_settings().bot_token).flush(timeout):
+            print("⚠️ Outbox drain timed out, remaining messages stay pending")
+            break
+
+        sent = sum(1 for future in futures if _is_delivered(future.result()))
+        delivered += sent
+        if sent < len(rows):
+            # Failed rows were released as pending again - retry on the next drain
+            break
+    return delivered
+
+
+def start_outbox_drainer(interval=60):
+    """Drain the outbox now and then every interval seconds in a background thread"""
+    global _drainer_thread
+    if _drainer_thread is not None and _drainer_thread.is_alive():
+        return _drainer_thread
+
+    def loop():
+        while True:
+            try:
+                drain_outbox()
+            except Exception as e:
+                print(f"❌ Outbox drainer error: {e}")
+            time.sleep(interval)
+
+    _drainer_thread = threading.Thread(target=loop, name="telegram-outbox-drainer", daemon=True)
+    _drainer_thread.start()
+    return _drainer_thread
+
+
+def _current_batch():
+    return getattr(_local, 'batcher', None)
+
+
+def _enqueue(chat_id, text, parse_mode, disable_web_page_preview, priority):
+    """
+    Queue one message on the dispatcher, split to fit Telegram's limit.
+    Dedup looks at the whole message, so its parts are sent or skipped together.
+    Returns the futures of its parts ([] if it was skipped as a duplicate)
+    """
+    dedup = get_dedup_cache()
+    if not getattr(_local, 'allow_repeats', False) and dedup.is_duplicate(chat_id, text):
+        print("⏭️ Skipped duplicate message (already sent recently)")
+        return []
+    return _enqueue_chunks(chat_id, text, split_message(text, parse_mode), parse_mode,
+                           disable_web_page_preview, priority)
+
+
+def _enqueue_chunks(chat_id, text, chunks, parse_mode, disable_web_page_preview, priority, delivered=0):
+    """
+    Journal and queue the parts of text. text is remembered for dedup once every part
+    is delivered (delivered = parts already sent another way, e.g. as a progress reply)
+    """
+    priority = PRIORITY_NORMAL if priority is None else priority
+    remaining = [len(chunks)]
+    lock = threading.Lock()
+
+    def on_delivered():
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            # Delivered content is remembered even for forced sends
+            get_dedup_cache().record(chat_id, text)
+
+    if not chunks and delivered:
+        get_dedup_cache().record(chat_id, text)
+
+    futures = []
+    for chunk in chunks:
+        # Journal first so the message survives a crash or a Telegram outage
+        outbox_id = get_outbox().record(chat_id, chunk, parse_mode, disable_web_page_preview, priority)
+        futures.append(_dispatch(chat_id, chunk, parse_mode, disable_web_page_preview, priority, outbox_id,
+                                 on_delivered))
+    return futures
+
+
+def _dispatch(chat_id, text, parse_mode, disable_web_page_preview, priority, outbox_id, on_delivered=None):
+    """
+    Queue a journaled message and update outbox/dedup state when it completes.
+    on_delivered() replaces recording text itself for dedup (parts of a longer message)
+    """
+    future = get_dispatcher(get_settings().bot_token).enqueue(
+        chat_id,
+        text,
+        parse_mode=parse_mode,
+        disable_web_page_preview=disable_web_page_preview,
+        priority=priority
+    )
+
+    def on_done(done):
+        response = done.result()
+        try:
+            if _is_delivered(response):
+                get_outbox().mark_sent([outbox_id])
+                if on_delivered is not None:
+                    on_delivered()
+                else:
+                    get_dedup_cache().record(chat_id, text)
+            elif response is None or response.status_code == 429 or response.status_code >= 500:
+                get_outbox().mark_failed(outbox_id, "network error" if response is None else response.text)
+            else:
+                # 4xx (e.g. bad Markdown) will never succeed on retry
+                get_outbox().mark_failed(outbox_id, response.text, retryable=False)
+        except Exception as e:
+            print(f"❌ Outbox update error: {e}")
+
+    future.add_done_callback(on_done)
+    return future
+
+
+def _is_delivered(response):
+    return response is not None and response.status_code == 200
+
+
+def _is_edited(response):
+    # Telegram answers 400 "message is not modified" when the text is identical
+    return _is_delivered(response) or (
+        response is not None and response.status_code == 400 and 'not modified' in response.text
+    )
+
+
+def _wait_response(future):
     try:
-        payload = {
-            'chat_id': CHAT_ID,
-            'text': message,
-            'disable_web_page_preview': disable_web_page_preview
-        }
-        if parse_mode:
-            payload['parse_mode'] = parse_mode
-
-        response = requests.post(
-            TELEGRAM_URL,
-            data=payload,
-            timeout=TIMEOUT
-        )
-        if response.status_code != 200:
+        return future.result(get_settings().timeout * 10)
+    except FutureTimeoutError:
+        print("Error sending message to Telegram: timed out waiting for dispatcher")
+        return None
+
+
+def _wait_all(futures):
+    """Wait for queued sends and report errors. Returns True if all were delivered"""
+    success = True
+    for future in futures:
+        if future is None:
+            continue
+        response = _wait_response(future)
+        if response is None:
+            success = False
+        elif response.status_code != 200:
             print(f"Error sending message: {response.status_code}, {response.text}")
+            success = False
         else:
             print("Message sent successfully.")
-    except requests.RequestException as e:
-        print(f"Error sending message to Telegram: {e}")
\ No newline at end of file
+    return success
@@ -0,0 +1,113 @@
+# services/telegram_client.py
+import threading
+import requests
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+
+from config import get_settings
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+DEFAULT_TIMEOUT = 15
+
+_session = None
+_session_lock = threading.Lock()
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def create_telegram_session():
+    """Create pooled keep-alive session for api.telegram.org"""
+    session = requests.Session()
+    session.headers.update({'Connection': 'keep-alive'})
+
+    # Only retry connection level errors here, 429 is handled by callers
+    retry_strategy = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=0,
+        backoff_factor=0.5,
+        allowed_methods=["GET", "POST"],
+        raise_on_status=False
+    )
+
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry_strategy)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_shared_session():
+    """Return the process-wide Telegram session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_telegram_session()
+    return _session
+
+
+class TelegramClient:
+    """Thin Bot API client that reuses one pooled session for every call"""
+
+    def __init__(self, bot_token, session=None):
+        self.bot_token = bot_token
+        self.session = session or get_shared_session()
+
+    def method_url(self, method):
+        """Build Bot API url for a method name"""
+        return f"{TELEGRAM_API_BASE}/bot{self.bot_token}/{method}"
+
+    def post(self, method, data=None, timeout=DEFAULT_TIMEOUT):
+        """POST a Bot API method. Raises requests.RequestException on network errors"""
+        return self.session.post(self.method_url(method), data=data, timeout=timeout)
+
+    def get(self, method, params=None, timeout=DEFAULT_TIMEOUT):
+        """GET a Bot API method. Raises requests.RequestException on network errors"""
+        return self.session.get(self.method_url(method), params=params, timeout=timeout)
+
+    def send_message(self, chat_id, text, parse_mode=None, disable_web_page_preview=None,
+                     timeout=DEFAULT_TIMEOUT):
+        """Send a text message and return the raw response"""
+        payload = {
+            'chat_id': chat_id,
+            'text': text
+        }
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+        if disable_web_page_preview is not None:
+            payload['disable_web_page_preview'] = disable_web_page_preview
+
+        return self.post("sendMessage", data=payload, timeout=timeout)
+
+    def edit_message_text(self, chat_id, message_id, text, parse_mode=None, disable_web_page_preview=None,
+                          timeout=DEFAULT_TIMEOUT):
+        """Replace the text of a message sent earlier and return the raw response"""
+        payload = {
+            'chat_id': chat_id,
+            'message_id': message_id,
+            'text': text
+        }
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+        if disable_web_page_preview is not None:
+            payload['disable_web_page_preview'] = disable_web_page_preview
+
+        return self.post("editMessageText", data=payload, timeout=timeout)
+
+    def get_me(self, timeout=DEFAULT_TIMEOUT):
+        """Call getMe and return the raw response"""
+        return self.get("getMe", timeout=timeout)
+
+
+def get_telegram_client(bot_token=None):
+    """Return the shared TelegramClient for a bot token (defaults to BOT_TOKEN)"""
+    token = bot_token or get_settings().bot_token
+    client = _clients.get(token)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(token)
+            if client is None:
+                client = TelegramClient(token, session=get_shared_session())
+                _clients[token] = client
+    return client
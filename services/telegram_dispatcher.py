@@ -0,0 +1,259 @@
+# services/telegram_dispatcher.py
+import atexit
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from services.rate_limit import TokenBucket
+from services.telegram_client import get_telegram_client
+
+# Priority lanes - lower value is sent first
+PRIORITY_ALERT = 0
+PRIORITY_NORMAL = 5
+PRIORITY_DIGEST = 10
+
+# Telegram limits: ~30 msg/s per bot, ~1 msg/s per chat, 20 msg/min per group
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+GROUP_RATE = 20.0 / 60.0
+CHAT_BURST = 3
+
+MAX_RATE_LIMIT_RETRIES = 5
+MAX_NETWORK_RETRIES = 3
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+class OutboundMessage:
+    """One queued sendMessage (or editMessageText when edit_message_id is set) call"""
+
+    def __init__(self, chat_id, text, parse_mode=None, disable_web_page_preview=None, priority=PRIORITY_NORMAL,
+                 edit_message_id=None):
+        self.chat_id = str(chat_id)
+        self.edit_message_id = edit_message_id
+        self.text = text
+        self.parse_mode = parse_mode
+        self.disable_web_page_preview = disable_web_page_preview
+        self.priority = priority
+        self.future = Future()
+        self.rate_limit_retries = 0
+        self.network_retries = 0
+
+
+class TelegramDispatcher:
+    """Background queue that sends messages at the highest rate Telegram accepts"""
+
+    def __init__(self, client, workers=4, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE, group_rate=GROUP_RATE):
+        self.client = client
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._chat_blocked_until = {}
+        self._inflight_chats = set()
+        self._inflight = 0
+        self._threads = []
+        self._running = False
+
+    # ---- public API ----
+
+    def enqueue(self, chat_id, text, parse_mode=None, disable_web_page_preview=None, priority=PRIORITY_NORMAL,
+                edit_message_id=None):
+        """
+        Queue a message without blocking. Returns a Future resolving to the response (or None).
+        With edit_message_id the existing message is edited in place instead.
+        """
+        message = OutboundMessage(chat_id, text, parse_mode, disable_web_page_preview, priority, edit_message_id)
+        self._push(message, next(self._seq))
+        self._ensure_started()
+        return message.future
+
+    def send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None, priority=PRIORITY_NORMAL,
+             timeout=None, edit_message_id=None):
+        """Queue a message and wait for the final response"""
+        future = self.enqueue(chat_id, text, parse_mode, disable_web_page_preview, priority, edit_message_id)
+        return future.result(timeout)
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._heap) + self._inflight
+
+    def flush(self, timeout=None):
+        """Block until every queued message is delivered or dropped. Returns True when drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=10):
+        """Flush pending messages and stop worker threads"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    # ---- internals ----
+
+    def _push(self, message, seq):
+        with self._cond:
+            heapq.heappush(self._heap, (message.priority, seq, message))
+            self._cond.notify_all()
+
+    def _ensure_started(self):
+        if self._running:
+            return
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._threads = []
+            for idx in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"telegram-dispatcher-{idx}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if chat_id.startswith('-') else self.chat_rate
+            bucket = TokenBucket(rate, CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _take_ready(self):
+        """Pop the highest priority message that may be sent now, else return wait seconds"""
+        now = time.monotonic()
+        global_wait = self._global_bucket.wait_time(now)
+        if global_wait > 0:
+            return None, global_wait
+
+        min_wait = None
+        seen_chats = set()
+        for entry in sorted(self._heap):
+            message = entry[2]
+            chat_id = message.chat_id
+            # Keep per-chat ordering: only the first queued message of a chat is a candidate
+            if chat_id in seen_chats:
+                continue
+            seen_chats.add(chat_id)
+            if chat_id in self._inflight_chats:
+                continue
+
+            wait = max(self._chat_blocked_until.get(chat_id, 0) - now,
+                       self._chat_bucket(chat_id).wait_time(now))
+            if wait <= 0:
+                self._heap.remove(entry)
+                heapq.heapify(self._heap)
+                self._global_bucket.consume(now)
+                self._chat_bucket(chat_id).consume(now)
+                self._inflight_chats.add(chat_id)
+                self._inflight += 1
+                return entry, 0
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+
+        return None, min_wait
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                entry = None
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    entry, wait = self._take_ready()
+                    if entry:
+                        break
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+
+            priority, seq, message = entry
+            requeue = self._deliver(message)
+
+            with self._cond:
+                self._inflight -= 1
+                self._inflight_chats.discard(message.chat_id)
+                if requeue:
+                    # Same sequence number keeps the message at its original position
+                    heapq.heappush(self._heap, (priority, seq, message))
+                self._cond.notify_all()
+
+    def _deliver(self, message):
+        """Send one message. Returns True if it must be queued again"""
+        try:
+            if message.edit_message_id is not None:
+                response = self.client.edit_message_text(
+                    message.chat_id,
+                    message.edit_message_id,
+                    message.text,
+                    parse_mode=message.parse_mode,
+                    disable_web_page_preview=message.disable_web_page_preview
+                )
+            else:
+                response = self.client.send_message(
+                    message.chat_id,
+                    message.text,
+                    parse_mode=message.parse_mode,
+                    disable_web_page_preview=message.disable_web_page_preview
+                )
+        except requests.RequestException as e:
+            message.network_retries += 1
+            if message.network_retries < MAX_NETWORK_RETRIES:
+                print(f"⚠️ Telegram send failed ({e}), retrying...")
+                self._block_chat(message.chat_id, 2 ** message.network_retries)
+                return True
+            print(f"Error sending message to Telegram: {e}")
+            message.future.set_result(None)
+            return False
+
+        if response.status_code == 429:
+            retry_after = get_retry_after(response)
+            message.rate_limit_retries += 1
+            if message.rate_limit_retries <= MAX_RATE_LIMIT_RETRIES:
+                print(f"⏳ Telegram rate limit, retrying in {retry_after}s...")
+                self._block_chat(message.chat_id, retry_after)
+                return True
+            print(f"❌ Giving up after {message.rate_limit_retries} rate limited attempts")
+
+        message.future.set_result(response)
+        return False
+
+    def _block_chat(self, chat_id, seconds):
+        with self._cond:
+            self._chat_blocked_until[chat_id] = time.monotonic() + seconds
+
+
+def get_retry_after(response, default=5):
+    """Read parameters.retry_after from a 429 response"""
+    try:
+        return int(response.json().get('parameters', {}).get('retry_after', default))
+    except (ValueError, AttributeError):
+        return default
+
+
+def get_dispatcher(bot_token=None):
+    """Return the process-wide dispatcher for a bot token (flushed at exit)"""
+    client = get_telegram_client(bot_token)
+    dispatcher = _dispatchers.get(client.bot_token)
+    if dispatcher is None:
+        with _dispatchers_lock:
+            dispatcher = _dispatchers.get(client.bot_token)
+            if dispatcher is None:
+                dispatcher = TelegramDispatcher(client)
+                _dispatchers[client.bot_token] = dispatcher
+                atexit.register(dispatcher.flush, 60)
+    return dispatcher
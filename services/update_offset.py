@@ -0,0 +1,66 @@
+# services/update_offset.py
+import json
+import os
+import tempfile
+from collections import deque
+
+OFFSET_FILE = "telegram_offset.json"
+# Webhook update ids remembered for dedup
+RECENT_UPDATE_WINDOW = 1000
+
+
+class UpdateOffsetStore:
+    """Last handled getUpdates update_id, persisted atomically so restarts resume where they left off"""
+
+    def __init__(self, path=OFFSET_FILE):
+        self.path = path
+
+    def load(self):
+        """Return the saved update_id (0 if none or unreadable)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('last_update_id', 0))
+        except FileNotFoundError:
+            return 0
+        except (ValueError, TypeError, AttributeError, OSError) as e:
+            print(f"⚠️ Could not read update offset from {self.path}: {e}")
+            return 0
+
+    def save(self, update_id):
+        """Write to a temp file in the same directory, then rename over the old one"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".offset-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'last_update_id': update_id}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save update offset: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class RecentUpdateIds:
+    """
+    The last `size` update ids seen, for webhook mode where updates may arrive concurrently
+    and out of order. Not thread safe - guarded by the bot's update lock.
+    """
+
+    def __init__(self, size=RECENT_UPDATE_WINDOW):
+        self.order = deque()
+        self.ids = set()
+        self.size = size
+
+    def add(self, update_id):
+        """Remember update_id. Returns False if it was already seen"""
+        if update_id in self.ids:
+            return False
+        self.ids.add(update_id)
+        self.order.append(update_id)
+        if len(self.order) > self.size:
+            self.ids.discard(self.order.popleft())
+        return True
@@ -1,26 +1,51 @@
 # telegram_chatbot.py
-import os
+import re
 import time
 import threading
 from datetime import datetime
-import requests
 import json
-from dotenv import load_dotenv
-
-# Load environment
-load_dotenv()
-
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-CHAT_ID = os.getenv('CHAT_ID')
-USER_TAG = os.getenv('USER_TAG', '')
+from config import get_settings
+from services.telegram_client import get_telegram_client
+from services.telegram_dispatcher import get_dispatcher, PRIORITY_NORMAL
+from services.telegram_bot import allow_repeats, start_outbox_drainer, start_progress_reply, message_batch
+from services.update_offset import RecentUpdateIds, UpdateOffsetStore
+from services.job_executor import get_job_executor, LANE_HTTP, LANE_UPDATES
+from services.single_flight import SingleFlight
+from services.keyword_router import KeywordRouter
+
+MAX_POLL_BACKOFF = 60
+# "ai latest 10" / "tin ai mới nhất 3" - answered from the article store, no fetch
+AI_LATEST_RE = re.compile(r'\b(?:latest|mới nhất|moi nhat)\b(?:\s+(\d+))?')
+DEFAULT_LATEST_AI_NEWS = 5
+MAX_LATEST_AI_NEWS = 20
+# "gold 7d" / "vàng 30 ngày" - answered from the local price history
+GOLD_HISTORY_RE = re.compile(r'\b(\d{1,3})\s*(?:d|ngày|ngay)\b')
+MAX_GOLD_HISTORY_DAYS = 365
 
 
 class TelegramChatBot:
     def __init__(self):
-        self.bot_token = BOT_TOKEN
-        self.chat_id = CHAT_ID
-        self.last_update_id = 0
+        self.settings = get_settings()
+        self.bot_token = self.settings.bot_token
+        self.chat_id = self.settings.chat_id
+        # Seconds Telegram holds a getUpdates request open while waiting for new updates
+        self.poll_timeout = self.settings.poll_timeout
+        self.client = get_telegram_client(self.bot_token)
+        self.dispatcher = get_dispatcher(self.bot_token)
+        # Bounded pool for crawls - at most one headless Chrome at a time by default
+        self.executor = get_job_executor()
+        # Identical commands sent while one is running share its crawl and results
+        self.flights = SingleFlight()
+        self.offset_store = UpdateOffsetStore(self.settings.offset_file)
+        self.last_update_id = self.offset_store.load()
+        # Webhook updates can arrive concurrently and out of order: dedup by id, not by offset.
+        # Ids up to the offset saved before this start were handled by the previous run.
+        self.update_lock = threading.Lock()
+        self.recent_update_ids = RecentUpdateIds()
+        self.startup_update_id = self.last_update_id
         self.running = False
+        # Only update types handle_message understands
+        self.allowed_updates = ['message']
 
         # Bot commands and keywords
         # Bot commands and keywords
@@ -48,35 +73,38 @@ class TelegramChatBot:
             'all': ['all', 'tất cả', 'all bots', 'run all', 'chạy tất cả']
         }
 
+        # Compiled once - categories earlier in self.commands win ties
+        self.router = KeywordRouter()
+        for category, keywords in self.commands.items():
+            self.router.add_many(keywords, category)
+
     def send_message(self, text, parse_mode=None):
         """Send message to Telegram"""
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            data = {
-                'chat_id': self.chat_id,
-                'text': text
-            }
-            if parse_mode:
-                data['parse_mode'] = parse_mode
-
-            response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
+            response = self.queue_message(text, parse_mode=parse_mode).result(60)
+            return response is not None and response.status_code == 200
         except Exception as e:
             print(f"Error sending message: {e}")
             return False
 
+    def queue_message(self, text, parse_mode=None, priority=PRIORITY_NORMAL):
+        """Queue message on the shared dispatcher without waiting"""
+        return self.dispatcher.enqueue(self.chat_id, text, parse_mode=parse_mode, priority=priority)
+
     def get_updates(self):
         """Get updates from Telegram"""
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
             params = {
                 'offset': self.last_update_id + 1,
-                'timeout': 10
+                'timeout': self.poll_timeout,
+                'allowed_updates': json.dumps(self.allowed_updates)
             }
 
-            response = requests.get(url, params=params, timeout=15)
+            # Client timeout must outlast the server-side long poll
+            response = self.client.get("getUpdates", params=params, timeout=self.poll_timeout + 10)
             if response.status_code == 200:
                 return response.json()
+            print(f"Error getting updates: {response.status_code}, {response.text}")
             return None
         except Exception as e:
             print(f"Error getting updates: {e}")
@@ -84,103 +112,157 @@ class TelegramChatBot:
 
     def classify_message(self, text):
         """Classify user message to determine which bot to run"""
-        text_lower = text.lower().strip()
-
-        # Check each command category
-        for category, keywords in self.commands.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return category
-
         # Default response for unrecognized messages
-        return 'help'
+        return self.router.match(text, default='help')
+
+    def run_interactive(self, job):
+        """Run a bot job for a user command - the user asked explicitly, so repeats are allowed"""
+        with allow_repeats():
+            job()
+
+    def service_lane(self, service_name):
+        """
+        Executor lane from the service's resource hints. A cacheable service with a fresh
+        cached result answers without a crawl, so it does not wait behind Chrome jobs.
+        A stale result stays on the service's lane: its refresh crawls.
+        """
+        from services.service_registry import get_registry
+        from services.result_cache import cached_age
+
+        config = get_registry().configs.get(service_name)
+        if config is None:
+            return LANE_HTTP
+        if config.cacheable:
+            age = cached_age(service_name)
+            if age is not None and age < config.cache_ttl:
+                return LANE_HTTP
+        return config.lane
+
+    def submit_command(self, name, job, lane=LANE_HTTP):
+        """
+        Run a command on the job executor, telling the user when it is queued or rejected.
+        A command already queued or running is not started again - the caller joins it.
+        """
+        flight, leader = self.flights.acquire(name)
+        if not leader:
+            print(f"🔗 '{name}' already in flight, joining it")
+            self.send_message(f"⏳ Lệnh '{name}' đang chạy rồi, kết quả sẽ gửi vào chat khi xong!")
+            return flight
+
+        busy = self.executor.is_busy(lane)
+        future = self.executor.submit(name, lambda: self.run_interactive(job), lane)
+        if future is None:
+            self.flights.release(name, flight)
+            self.send_message("⏳ Bot đang bận, hàng đợi đã đầy. Thử lại sau ít phút nhé!")
+            return None
 
-    def run_bus_bot(self):
-        """Run bus price bot"""
-        try:
-            self.send_message("🚌 Đang kiểm tra giá xe bus... Vui lòng đợi!")
+        def on_done(done):
+            self.flights.release(name, flight, error=done.exception())
+
+        future.add_done_callback(on_done)
 
-            from crawler.crawler_bus_price_complete import BusPriceTracker
-            tracker = BusPriceTracker()
-            tracker.run()
+        position = self.executor.position(future) if busy else 0
+        if position:
+            self.send_message(f"⏳ Đã xếp hàng lệnh '{name}' (vị trí {position}), sẽ chạy khi bot rảnh")
+        return flight
 
-            print("✅ Bus bot completed")
+    def run_with_progress(self, placeholder, job, bot_name):
+        """Send a placeholder, run the job and replace the placeholder in place with its results"""
+        reply = start_progress_reply(placeholder, chat_id=self.chat_id, bot_token=self.bot_token)
+        try:
+            # The first result message edits the placeholder, report_progress() updates it meanwhile
+            with message_batch(reply=reply):
+                job()
+            if reply and not reply.finished:
+                reply.finish(f"✅ {bot_name} đã chạy xong")
+            print(f"✅ {bot_name} completed")
         except Exception as e:
-            error_msg = f"❌ Lỗi khi chạy bus bot: {str(e)}"
-            self.send_message(error_msg)
+            error_msg = f"❌ Lỗi khi chạy {bot_name}: {str(e)}"
+            if not (reply and reply.finish(error_msg)):
+                self.send_message(error_msg)
             print(error_msg)
 
+    def run_cached_service(self, service_name):
+        """Run a registry service, serving its result cache (stale-while-revalidate) when possible"""
+        from services.service_registry import get_registry
+        if not get_registry().execute_service(service_name, use_cache=True):
+            print(f"⚠️ {service_name} finished without a result")
+
+    def run_bus_bot(self):
+        """Run bus price bot"""
+        def job():
+            # Answers from the result cache when a recent crawl exists (no Chrome)
+            self.run_cached_service("bus_price")
+
+        self.run_with_progress("🚌 Đang kiểm tra giá xe bus... Vui lòng đợi!", job, "bus bot")
+
     def run_event_bot(self):
         """Run event checker bot"""
-        try:
-            self.send_message("🎪 Đang kiểm tra sự kiện mới... Vui lòng đợi!")
-
+        def job():
             from services.event_checker_service import EventCheckerService
             event_service = EventCheckerService()
             event_service.execute()
 
-            print("✅ Event bot completed")
-        except Exception as e:
-            error_msg = f"❌ Lỗi khi chạy event bot: {str(e)}"
-            self.send_message(error_msg)
-            print(error_msg)
+        self.run_with_progress("🎪 Đang kiểm tra sự kiện mới... Vui lòng đợi!", job, "event bot")
 
     def run_gold_bot(self):
         """Run gold price bot"""
-        try:
-            self.send_message("🪙 Đang kiểm tra giá vàng... Vui lòng đợi!")
-
-            # Try enhanced version first for better reliability
-            try:
-                from crawler.crawler_gold_enhanced import main as enhanced_gold_main
-                enhanced_gold_main()
-            except ImportError:
-                # Fallback to standard version
-                from crawler.crawler_gold import fetch_gold_prices, format_as_code_block, send_to_telegram
-                buy_trend, data = fetch_gold_prices()
-                if data:
-                    send_to_telegram(format_as_code_block(data))
-                    if buy_trend == 'increase':
-                        send_to_telegram(f"Có nên mua vàng không má {USER_TAG} 🤔🤔🤔", parse_mode=None)
-                    elif buy_trend == 'decrease':
-                        send_to_telegram(f"✅ Mua vàng đi má {USER_TAG} 🧀🧀🧀", parse_mode=None)
-                else:
-                    self.send_message("❌ Không thể lấy dữ liệu giá vàng")
+        def job():
+            self.run_cached_service("gold_price")
 
-            print("✅ Gold bot completed")
-        except Exception as e:
-            error_msg = f"❌ Lỗi khi chạy gold bot: {str(e)}"
-            self.send_message(error_msg)
-            print(error_msg)
+        self.run_with_progress("🪙 Đang kiểm tra giá vàng... Vui lòng đợi!", job, "gold bot")
 
     def run_ai_bot(self):
         """Run AI news bot"""
-        try:
-            self.send_message("🤖 Đang lấy tin tức AI mới nhất... Vui lòng đợi!")
+        def job():
+            self.run_cached_service("ai_news")
 
-            from crawler.crawl_ai_news import run_ai_bot
-            run_ai_bot()
+        self.run_with_progress("🤖 Đang lấy tin tức AI mới nhất... Vui lòng đợi!", job, "AI news bot")
 
-            print("✅ AI news bot completed")
-        except Exception as e:
-            error_msg = f"❌ Lỗi khi chạy AI news bot: {str(e)}"
-            self.send_message(error_msg)
-            print(error_msg)
+    def parse_ai_latest(self, text):
+        """Number of articles asked for by an "ai latest [N]" message, None for a plain "ai" """
+        m = AI_LATEST_RE.search(text.lower())
+        if not m:
+            return None
+        count = int(m.group(1)) if m.group(1) else DEFAULT_LATEST_AI_NEWS
+        return max(1, min(count, MAX_LATEST_AI_NEWS))
+
+    def send_latest_ai_news(self, count):
+        """Answer from the article store. Returns False when it is still empty"""
+        from services.article_store import get_article_store
+        from services.formatter import format_ai_news
+
+        articles = get_article_store().latest(count)
+        if not articles:
+            return False
+        self.send_message(format_ai_news(articles, max_items=count), parse_mode="Markdown")
+        return True
+
+    def parse_gold_days(self, text):
+        """Days asked for by a "gold 7d" message, None for a plain "gold" """
+        m = GOLD_HISTORY_RE.search(text.lower())
+        if not m:
+            return None
+        return max(1, min(int(m.group(1)), MAX_GOLD_HISTORY_DAYS))
+
+    def send_gold_history(self, days):
+        """Answer from the gold price history. Returns False when it has nothing for the period"""
+        from services.gold_history import format_gold_history, get_gold_store
+
+        stats = get_gold_store().range_stats(days)
+        if not stats:
+            return False
+        self.send_message(format_gold_history(stats, days), parse_mode="MarkdownV2")
+        return True
 
     def run_kms_bot(self):
         """Run KMS bot"""
-        try:
-            self.send_message("🧠 Đang khởi động Notion KMS... Vui lòng đợi!")
-
-            from services.notion_kms_serivce import NotionKMSService
+        def job():
+            from services.notion_kms_service import NotionKMSService
             kms_service = NotionKMSService()
             kms_service.execute()
 
-            print("✅ KMS bot completed")
-        except Exception as e:
-            error_msg = f"❌ Lỗi khi chạy KMS bot: {str(e)}"
-            self.send_message(error_msg)
-            print(error_msg)
+        self.run_with_progress("🧠 Đang khởi động Notion KMS... Vui lòng đợi!", job, "KMS bot")
 
     def is_kms_command(self, text):
         """Check if message is a KMS command"""
@@ -197,19 +279,41 @@ class TelegramChatBot:
 
 
     def run_all_bots(self):
-        """Run all bots sequentially"""
+        """
+        Queue every bot as its own command on its service's lane, so HTTP bots do not wait
+        behind the bus crawl and other browser jobs are not blocked by one long 'all' job.
+        The summary is sent from completion callbacks - nothing holds a worker while waiting.
+        """
         try:
-            self.send_message("🚀 Chạy tất cả bots... Có thể mất vài phút!")
-
-            # Run each bot
-            self.run_ai_bot()
-            time.sleep(2)
-            self.run_gold_bot()
-            time.sleep(2)
-            self.run_bus_bot()
+            self.queue_message("🚀 Chạy tất cả bots... Có thể mất vài phút!")
+
+            flights = {}
+            for name, job, service_name in (('bus', self.run_bus_bot, 'bus_price'),
+                                            ('ai', self.run_ai_bot, 'ai_news'),
+                                            ('gold', self.run_gold_bot, 'gold_price')):
+                flight = self.submit_command(name, job, self.service_lane(service_name))
+                if flight is not None:
+                    flights[name] = flight
+
+            pending = set(flights)
+            failed = []
+            lock = threading.Lock()
+
+            def on_done(name, flight):
+                with lock:
+                    if flight.exception() is not None:
+                        failed.append(name)
+                    pending.discard(name)
+                    if pending:
+                        return
+                if failed:
+                    self.queue_message(f"⚠️ Đã chạy xong, lỗi: {', '.join(failed)}")
+                else:
+                    self.queue_message("✅ Đã chạy xong tất cả bots!")
+                print("✅ All bots completed")
 
-            self.send_message("✅ Đã chạy xong tất cả bots!")
-            print("✅ All bots completed")
+            for name, flight in flights.items():
+                flight.add_done_callback(lambda done, name=name: on_done(name, done))
         except Exception as e:
             error_msg = f"❌ Lỗi khi chạy all bots: {str(e)}"
             self.send_message(error_msg)
@@ -226,10 +330,12 @@ class TelegramChatBot:
     🪙 **Gold Commands:**  
     • "gold" / "vàng" / "giá vàng"
     → Kiểm tra giá vàng hôm nay
+    • "gold 7d" / "vàng 30 ngày" → Thấp/cao, thay đổi và chênh lệch mua-bán
 
     🤖 **AI News Commands:**
     • "ai" / "news" / "tin ai" / "tin tức"  
-    → Tin tức AI mới nhất từ CNBC
+    → Tin tức AI mới nhất (CNBC, TechCrunch, The Verge, VentureBeat)
+    • "ai latest [N]" → N tin đã lưu gần nhất (không cần tải lại)
 
     🧠 **Knowledge Management:**
     • "kms" / "knowledge" / "notion"
@@ -257,12 +363,15 @@ class TelegramChatBot:
     def show_status(self):
         """Show bot status"""
         current_time = datetime.now().strftime("%H:%M:%S %d/%m/%Y")
+        jobs = self.executor.stats()
+        running = sum(jobs['running'].values())
         status_text = f"""🟢 Bot đang hoạt động!
 
 ⏰ Thời gian: {current_time}
 🤖 Chatbot: Online
 📱 Telegram: Connected
-{USER_TAG} Status: Active
+⚙️ Jobs: {running} đang chạy, {jobs['queued']} đang chờ (chờ lâu nhất {jobs['oldest_wait']:.0f}s, TB {jobs['avg_wait']:.0f}s)
+{self.settings.user_tag} Status: Active
 
 Nhắn "help" để xem commands!"""
 
@@ -285,23 +394,30 @@ Nhắn "help" để xem commands!"""
             command = self.classify_message(text)
 
             if command == 'bus':
-                # Run in background thread to avoid blocking
-                threading.Thread(target=self.run_bus_bot, daemon=True).start()
+                # Lanes follow the services' resource hints: Chrome jobs run one at a time
+                self.submit_command('bus', self.run_bus_bot, self.service_lane('bus_price'))
 
             elif command == 'gold':
-                threading.Thread(target=self.run_gold_bot, daemon=True).start()
+                days = self.parse_gold_days(text)
+                # No history yet -> fetch like a plain "gold"
+                if not (days and self.send_gold_history(days)):
+                    self.submit_command('gold', self.run_gold_bot, self.service_lane('gold_price'))
 
             elif command == 'ai':
-                threading.Thread(target=self.run_ai_bot, daemon=True).start()
+                count = self.parse_ai_latest(text)
+                # Nothing stored yet -> fetch like a plain "ai"
+                if not (count and self.send_latest_ai_news(count)):
+                    self.submit_command('ai', self.run_ai_bot, self.service_lane('ai_news'))
 
             elif command == 'events':
-                threading.Thread(target=self.run_event_bot, daemon=True).start()
+                self.submit_command('events', self.run_event_bot, self.service_lane('event_checker'))
             # ADD THIS BLOCK
             elif command == 'kms':
-                threading.Thread(target=self.run_kms_bot, daemon=True).start()
+                self.submit_command('kms', self.run_kms_bot, self.service_lane('notion_kms'))
 
             elif command == 'all':
-                threading.Thread(target=self.run_all_bots, daemon=True).start()
+                # Only queues the bots, each on its own lane
+                self.run_all_bots()
 
             elif command == 'status':
                 self.show_status()
@@ -321,22 +437,102 @@ Nhắn "help" để xem commands!"""
             print(f"Error handling message: {e}")
             self.send_message("❌ Có lỗi xảy ra khi xử lý tin nhắn")
 
-    def start_polling(self):
-        """Start bot polling loop"""
+    def accept_update(self, update, webhook=False):
+        """
+        Claim an update for handling. Returns False if it was already handled.
+        Polling: getUpdates returns updates in order, so the saved offset is enough.
+        Webhook: updates may arrive concurrently and out of order, so recently seen ids are checked.
+        """
+        update_id = update.get('update_id', 0)
+        if not update_id:
+            return True
+        with self.update_lock:
+            if webhook:
+                if update_id <= self.startup_update_id or not self.recent_update_ids.add(update_id):
+                    # Redelivery of an update that timed out, or one handled before the restart
+                    return False
+            elif update_id <= self.last_update_id:
+                return False
+            if update_id > self.last_update_id:
+                # Persist before handling: a crash mid-command must not replay it (and its crawl) on restart
+                self.last_update_id = update_id
+                self.offset_store.save(update_id)
+        return True
+
+    def handle_update(self, update):
+        if 'message' in update:
+            self.handle_message(update['message'])
+
+    def enqueue_update(self, update):
+        """
+        Webhook mode: claim the update and handle it on the job executor, so the webhook
+        request is answered at once instead of waiting for replies to be sent.
+        Returns False if the update was a duplicate or the queue is full.
+        """
+        if not self.accept_update(update, webhook=True):
+            return False
+        name = f"update-{update.get('update_id', 0)}"
+        if self.executor.submit(name, lambda: self.handle_update(update), LANE_UPDATES) is None:
+            self.queue_message("⏳ Bot đang bận, hàng đợi đã đầy. Thử lại sau ít phút nhé!")
+            return False
+        return True
+
+    def process_update(self, update, webhook=False):
+        """Handle one Telegram update - shared by polling and webhook mode"""
+        if not self.accept_update(update, webhook):
+            return False
+        self.handle_update(update)
+        return True
+
+    def prepare_start(self):
+        """Common startup for polling and webhook mode. Returns False if not configured"""
         print("🤖 Starting Telegram chatbot...")
         print(f"Bot token: {self.bot_token[:10]}..." if self.bot_token else "❌ No bot token")
         print(f"Chat ID: {self.chat_id}")
 
         if not self.bot_token or not self.chat_id:
             print("❌ Missing BOT_TOKEN or CHAT_ID")
-            return
+            return False
+
+        # Redeliver anything left in the outbox, then keep draining in the background
+        start_outbox_drainer()
 
         # Send startup message
-        self.send_message(f"🤖 Chatbot started! {USER_TAG}\n\nNhắn 'help' để xem commands.")
+        self.send_message(f"🤖 Chatbot started! {self.settings.user_tag}\n\nNhắn 'help' để xem commands.")
+        return True
+
+    def start_webhook(self, host="0.0.0.0", port=None, webhook_url=None, secret_token=None):
+        """Receive updates pushed by Telegram instead of polling (see telegram_webhook.py)"""
+        if not self.bot_token or not self.chat_id:
+            print("❌ Missing BOT_TOKEN or CHAT_ID")
+            return
+
+        # prepare_start runs in the serving process, see telegram_webhook.serve
+        from telegram_webhook import run_webhook
+        self.running = True
+        try:
+            run_webhook(self, host=host, port=port, webhook_url=webhook_url, secret_token=secret_token)
+        finally:
+            self.running = False
+
+    def start_polling(self):
+        """Start bot polling loop"""
+        if not self.prepare_start():
+            return
+
+        # getUpdates is rejected while a webhook is set
+        try:
+            self.client.post("deleteWebhook")
+        except Exception as e:
+            print(f"⚠️ Could not delete webhook: {e}")
+
+        if self.last_update_id:
+            print(f"↪️ Resuming after update {self.last_update_id}")
 
         self.running = True
         error_count = 0
         max_errors = 5
+        failed_polls = 0
 
         while self.running:
             try:
@@ -347,14 +543,17 @@ Nhắn "help" để xem commands!"""
                     updates = updates_data.get('result', [])
 
                     for update in updates:
-                        self.last_update_id = update['update_id']
+                        self.process_update(update)
 
-                        if 'message' in update:
-                            self.handle_message(update['message'])
+                    # Long poll already waits server-side - poll again right away
+                    failed_polls = 0
+                else:
+                    # Back off only while Telegram is unreachable or rejecting us
+                    failed_polls += 1
+                    time.sleep(min(2 ** failed_polls, MAX_POLL_BACKOFF))
 
                 # Reset error count on success
                 error_count = 0
-                time.sleep(1)  # Small delay to avoid rate limiting
 
             except KeyboardInterrupt:
                 print("\n🛑 Stopping chatbot...")
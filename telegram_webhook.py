@@ -0,0 +1,114 @@
+# telegram_webhook.py
+import hmac
+import json
+import secrets
+from urllib.parse import urlparse
+
+from config import get_settings
+
+DEFAULT_WEBHOOK_PATH = "/telegram-webhook"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Requests only enqueue updates, a few threads are plenty
+WEBHOOK_THREADS = 4
+
+
+def create_webhook_app(bot, secret_token, path=DEFAULT_WEBHOOK_PATH):
+    """
+    Build the Flask app receiving Telegram updates.
+    Every update is validated against secret_token and handed to bot.enqueue_update:
+    Telegram gets its 200 right away and the update is handled on the job executor.
+    Test locally with app.test_client().
+    """
+    from flask import Flask, request, jsonify
+
+    app = Flask(__name__)
+
+    @app.route("/", methods=["GET"])
+    def health():
+        return jsonify({"ok": True, "mode": "webhook"})
+
+    @app.route(path, methods=["POST"])
+    def telegram_webhook():
+        received = request.headers.get(SECRET_HEADER, "")
+        if not secret_token or not hmac.compare_digest(received, secret_token):
+            return jsonify({"ok": False, "error": "invalid secret token"}), 403
+
+        update = request.get_json(silent=True)
+        if not isinstance(update, dict):
+            return jsonify({"ok": False, "error": "invalid update"}), 400
+
+        try:
+            bot.enqueue_update(update)
+        except Exception as e:
+            # Always answer 200 so Telegram does not redeliver a poisoned update forever
+            print(f"❌ Error processing webhook update: {e}")
+        return jsonify({"ok": True})
+
+    return app
+
+
+def register_webhook(bot, webhook_url, secret_token, allowed_updates=None):
+    """Call setWebhook so Telegram pushes updates to webhook_url"""
+    data = {
+        'url': webhook_url,
+        'secret_token': secret_token,
+        'allowed_updates': json.dumps(allowed_updates or ["message"])
+    }
+    response = bot.client.post("setWebhook", data=data)
+    if response.status_code == 200 and response.json().get('ok'):
+        print(f"✅ Webhook registered: {webhook_url}")
+        return True
+    print(f"❌ Failed to register webhook: {response.status_code}, {response.text}")
+    return False
+
+
+def serve(load_app, host, port, threads=WEBHOOK_THREADS):
+    """
+    Serve the app with gunicorn: one worker process (the bot keeps its queues and dedup state
+    in memory) with a few threads. load_app runs inside the worker, after the fork, so the
+    bot's background threads are started in the process that serves requests.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn does not run on Windows
+        print("⚠️ gunicorn not installed, using the Flask development server")
+        load_app().run(host=host, port=port, threaded=True)
+        return
+
+    class WebhookServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', 1)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', threads)
+
+        def load(self):
+            return load_app()
+
+    WebhookServer().run()
+
+
+def run_webhook(bot, host="0.0.0.0", port=None, webhook_url=None, secret_token=None):
+    """Register the webhook with Telegram and serve updates (default port 8080, as exposed by Docker)"""
+    settings = get_settings()
+    port = int(port or settings.port)
+    webhook_url = webhook_url or settings.webhook_url
+    # A random secret still works because we register it ourselves on every start
+    secret_token = secret_token or settings.webhook_secret or secrets.token_urlsafe(32)
+
+    if not webhook_url:
+        print("❌ Missing WEBHOOK_URL (public https url Telegram can reach)")
+        return
+
+    path = urlparse(webhook_url).path or DEFAULT_WEBHOOK_PATH
+
+    def load_app():
+        if not bot.prepare_start():
+            raise SystemExit(1)
+        if not register_webhook(bot, webhook_url, secret_token, bot.allowed_updates):
+            raise SystemExit(1)
+        print(f"🌐 Listening for Telegram updates on {host}:{port}{path}")
+        return create_webhook_app(bot, secret_token, path)
+
+    serve(load_app, host, port)
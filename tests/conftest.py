@@ -0,0 +1,26 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def news_fixtures():
+    """Responses of the default AI news sources, saved by news_aggregator.record_fetcher"""
+    return os.path.join(FIXTURES_DIR, "news")
+
+
+@pytest.fixture
+def gold_page():
+    """24h.com.vn gold price page (raw bytes)"""
+    with open(os.path.join(FIXTURES_DIR, "gold", "24h_gold.html"), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def cafef_page():
+    """cafef.vn gold price page (raw bytes), the backup gold source"""
+    with open(os.path.join(FIXTURES_DIR, "gold", "cafef_gold.html"), "rb") as f:
+        return f.read()
@@ -0,0 +1,64 @@
+# tests/test_cnbc_extractor.py
+import json
+
+from services.cnbc_extractor import extract_s_data, iter_assets, iter_news
+from services.news_aggregator import DEFAULT_SOURCES, replay_fetcher
+
+CNBC_URL = next(s.url for s in DEFAULT_SOURCES if s.kind == "cnbc")
+
+
+def cnbc_page(news_fixtures):
+    return replay_fetcher(news_fixtures)(CNBC_URL)
+
+
+def test_extract_s_data_reads_embedded_object(news_fixtures):
+    data = extract_s_data(cnbc_page(news_fixtures))
+    assert len(data["page"]["page"]["layout"]) == 2
+
+
+def test_extract_s_data_accepts_text():
+    page = '<script>window.__s_data={"page": {"title": "Thị trường"}};</script>'
+    assert extract_s_data(page) == {"page": {"title": "Thị trường"}}
+
+
+def test_extract_s_data_script_end_inside_string(news_fixtures):
+    # The first description holds a literal "</script>"
+    data = extract_s_data(cnbc_page(news_fixtures))
+    first = next(iter_assets(data))
+    assert "</script>" in first["description"]
+
+
+def test_extract_s_data_without_marker():
+    assert extract_s_data(b"<html><body>No data</body></html>") is None
+    assert extract_s_data(b"<script>window.__s_data = {broken</script>") is None
+
+
+def test_iter_assets_skips_empty_modules():
+    data = {"page": {"page": {"layout": [{"columns": [{"modules": [{"data": None}, {}]}]}]}}}
+    assert list(iter_assets(data)) == []
+    assert list(iter_assets({"page": None})) == []
+
+
+def test_iter_news_unique_by_link(news_fixtures):
+    news = list(iter_news(cnbc_page(news_fixtures)))
+    assert [n["title"] for n in news] == [
+        "OpenAI unveils new reasoning model for developers",
+        "Nvidia shares climb as data center demand surges",
+        "Microsoft adds AI agents to Office apps",
+    ]
+    assert news[0]["img"] == "https://image.cnbcfm.com/api/v1/image/openai.jpg"
+    assert news[0]["date"] == "2026-10-15T13:02:11+0000"
+    assert news[1]["img"] == ""
+    assert news[2]["date"] == "2026-10-14T18:20:00+0000"
+
+
+def test_iter_news_stops_at_max_items(news_fixtures):
+    assert len(list(iter_news(cnbc_page(news_fixtures), max_items=2))) == 2
+
+
+def test_iter_news_headline_fallback():
+    asset = {"headline": "Chỉ có headline", "url": "https://www.cnbc.com/a.html"}
+    page = "<script>window.__s_data=" + json.dumps(
+        {"page": {"page": {"layout": [{"columns": [{"modules": [{"data": {"assets": [asset]}}]}]}]}}}
+    ) + "</script>"
+    assert [n["title"] for n in iter_news(page)] == ["Chỉ có headline"]
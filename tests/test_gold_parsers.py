@@ -0,0 +1,83 @@
+# tests/test_gold_parsers.py
+import dataclasses
+
+import pytest
+
+import config
+from crawler import gold_parsers
+from crawler.github_action_fetcher import GOLD_SOURCES, parse_generic_price_table
+from crawler.gold_parsers import BACKEND_ORDER, BACKENDS, parse_gold_table, slice_gold_block
+
+EXPECTED_ROWS = [
+    ['SJC', '148,300 ▼200', '150,300 ▼200'],
+    ['DOJI HN', '148,000 ▲500', '150,000 ▲300'],
+    # No change shown; the "Vàng nữ trang 9999" row has no buy price and is dropped
+    ['PNJ TP.HCM', '145,500', '148,500'],
+]
+
+
+@pytest.fixture(params=BACKEND_ORDER)
+def backend(request):
+    pytest.importorskip(BACKENDS[request.param][0])
+    return request.param
+
+
+def test_slice_gold_block(gold_page):
+    fragment = slice_gold_block(gold_page)
+    assert fragment.startswith(b'<div class="cate-24h-gold-pri-table">')
+    assert fragment.endswith(b'</table>')
+    assert b'gia-vang-the-gioi' not in fragment
+    assert slice_gold_block('<html><body>Không có bảng giá</body></html>') is None
+
+
+def test_parse_gold_table(gold_page, backend):
+    assert parse_gold_table(gold_page, backend) == ('decrease', EXPECTED_ROWS)
+
+
+def test_parse_gold_table_text(gold_page, backend):
+    assert parse_gold_table(gold_page.decode('utf-8'), backend) == ('decrease', EXPECTED_ROWS)
+
+
+def test_parse_gold_table_keeps_utf8(backend):
+    page = ('<div class="cate-24h-gold-pri-table"><table class="gia-vang-search-data-table">'
+            '<tr><td>Vàng nhẫn</td><td><span class="fixW">1</span><span class="colorGreen">2</span></td>'
+            '<td><span class="fixW">3</span></td></tr></table></div>').encode('utf-8')
+    assert parse_gold_table(page, backend) == ('increase', [['Vàng nhẫn', '1 ▲2', '3']])
+
+
+def test_parse_gold_table_without_block(backend):
+    # Block class renamed: the whole page is searched for the table
+    page = (b'<div class="new-layout"><table class="gia-vang-search-data-table">'
+            b'<tr><td>SJC</td><td><span class="fixW">1</span></td><td><span class="fixW">2</span></td></tr>'
+            b'</table></div>')
+    assert parse_gold_table(page, backend) == (None, [['SJC', '1', '2']])
+    assert parse_gold_table(b'<html><body></body></html>', backend) == (None, [])
+
+
+def test_get_backend_respects_gold_parser(monkeypatch):
+    settings = config.get_settings()
+    monkeypatch.setattr(gold_parsers, '_backend', None)
+    monkeypatch.setattr(config, '_settings', dataclasses.replace(settings, gold_parser='bs4'))
+    assert gold_parsers.get_backend() == 'bs4'
+
+    monkeypatch.setattr(gold_parsers, '_backend', None)
+    monkeypatch.setattr(config, '_settings', dataclasses.replace(settings, gold_parser='not-a-parser'))
+    assert gold_parsers.get_backend() == gold_parsers.available_backends()[0]
+
+
+def test_parse_cafef(cafef_page):
+    cafef = next(source for source in GOLD_SOURCES if source.name == "cafef")
+    # Index, stock, exchange rate and hotline rows also have two numbers >= 1000
+    assert cafef.parse(cafef_page) == (None, [
+        ['Vàng miếng SJC', '148,300', '150,300'],
+        ['Nhẫn trơn PNJ 999.9', '145,500', '148,500'],
+        ['DOJI HN', '148,000', '150,000'],
+        ['Vàng nữ trang 18K', '105,200', '108,100'],
+    ])
+
+
+def test_parse_generic_price_table_rejects_other_tables():
+    page = ('<table><tr><td>VNM</td><td>65,000</td><td>66,200</td></tr>'
+            '<tr><td>USD</td><td>25,120</td><td>25,480</td></tr>'
+            '<tr><td>Vàng SJC</td><td>12</td><td>13</td></tr></table>')
+    assert parse_generic_price_table(page) == (None, [])
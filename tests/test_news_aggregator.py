@@ -0,0 +1,115 @@
+# tests/test_news_aggregator.py
+from services.news_aggregator import (
+    DEFAULT_SOURCES,
+    NewsSource,
+    estimate_similarity,
+    fetch_all_news,
+    merge_near_duplicates,
+    minhash,
+    parse_feed,
+    record_fetcher,
+    replay_fetcher,
+    title_tokens,
+)
+
+SOURCES = {s.name: s for s in DEFAULT_SOURCES}
+
+
+def feed(news_fixtures, name):
+    return replay_fetcher(news_fixtures)(SOURCES[name].url)
+
+
+def test_parse_rss(news_fixtures):
+    news = parse_feed(feed(news_fixtures, "techcrunch"))
+    # The item without a title is skipped
+    assert [n["title"] for n in news] == [
+        "OpenAI unveils a new reasoning model for developers",
+        "Anthropic raises funding at higher valuation",
+    ]
+    assert news[0]["link"] == "https://techcrunch.com/2026/10/15/openai-unveils-a-new-reasoning-model-for-developers/"
+    assert news[0]["desc"] == "OpenAI released a model tuned for coding agents."
+    assert news[0]["date"] == "Wed, 15 Oct 2026 13:30:00 +0000"
+    assert news[1]["desc"] == "The round values the company at more than its last raise & adds new investors."
+
+
+def test_parse_rss_content_encoded(news_fixtures):
+    news = parse_feed(feed(news_fixtures, "venturebeat"))
+    assert news[0]["desc"] == "Gemini is rolling out inside Chrome on Android phones."
+
+
+def test_parse_atom(news_fixtures):
+    news = parse_feed(feed(news_fixtures, "theverge"))
+    assert [n["title"] for n in news] == [
+        "Google brings Gemini to Chrome on Android",
+        "Apple’s on-device model gets a speed boost",
+    ]
+    # rel="alternate" wins over the comments link listed first
+    assert news[0]["link"] == "https://www.theverge.com/2026/10/15/google-gemini-chrome-android"
+    assert news[0]["desc"] == "The assistant can now summarize pages in the mobile browser."
+    assert news[0]["date"] == "2026-10-15T09:00:00-04:00"
+
+
+def test_parse_feed_max_items_and_errors(news_fixtures):
+    assert len(parse_feed(feed(news_fixtures, "techcrunch"), max_items=1)) == 1
+    assert parse_feed(b"<rss><channel><item>") == []
+
+
+def test_title_tokens_drop_stopwords_and_plural():
+    assert title_tokens("OpenAI unveils a new reasoning model for developers") == {
+        "openai", "unveil", "reasoning", "model", "developer",
+    }
+
+
+def test_minhash_similarity():
+    a = minhash(title_tokens("Google brings Gemini to Chrome on Android"))
+    b = minhash(title_tokens("Google brings Gemini to Chrome for Android users"))
+    c = minhash(title_tokens("Meta releases open source Llama update"))
+    assert a == minhash(title_tokens("Google brings Gemini to Chrome on Android"))
+    assert estimate_similarity(a, a) == 1.0
+    assert estimate_similarity(a, b) >= 0.5
+    assert estimate_similarity(a, c) < 0.5
+    assert minhash(set()) == ()
+    assert estimate_similarity((), a) == 0.0
+
+
+def test_merge_near_duplicates():
+    items = [
+        {"title": "OpenAI unveils new reasoning model for developers", "link": "https://a/1", "source": "cnbc"},
+        {"title": "Nvidia shares climb as data center demand surges", "link": "https://a/2", "source": "cnbc"},
+        {"title": "OpenAI unveils a new reasoning model for developers", "link": "https://b/1", "source": "techcrunch"},
+        {"title": "Completely different story", "link": "https://a/2", "source": "theverge"},
+    ]
+    merged = merge_near_duplicates(items)
+    assert [(n["link"], n["sources"]) for n in merged] == [
+        ("https://a/1", ["cnbc", "techcrunch"]),
+        ("https://a/2", ["cnbc"]),
+    ]
+    # The input items are left untouched
+    assert "sources" not in items[0]
+
+
+def test_fetch_all_news_offline(news_fixtures):
+    news = fetch_all_news(10, sources=DEFAULT_SOURCES, fetch=replay_fetcher(news_fixtures))
+    assert [(n["title"], n["sources"]) for n in news] == [
+        ("OpenAI unveils new reasoning model for developers", ["cnbc", "techcrunch"]),
+        ("Google brings Gemini to Chrome on Android", ["theverge", "venturebeat"]),
+        ("Nvidia shares climb as data center demand surges", ["cnbc"]),
+        ("Anthropic raises funding at higher valuation", ["techcrunch"]),
+        ("Apple’s on-device model gets a speed boost", ["theverge"]),
+        ("Meta releases open source Llama update", ["venturebeat"]),
+        ("Microsoft adds AI agents to Office apps", ["cnbc"]),
+    ]
+    assert len(fetch_all_news(3, sources=DEFAULT_SOURCES, fetch=replay_fetcher(news_fixtures))) == 3
+
+
+def test_fetch_all_news_survives_missing_source(news_fixtures):
+    sources = [SOURCES["theverge"], NewsSource("offline", "https://example.com/feed.xml")]
+    news = fetch_all_news(10, sources=sources, fetch=replay_fetcher(news_fixtures))
+    assert [n["source"] for n in news] == ["theverge", "theverge"]
+
+
+def test_record_then_replay(tmp_path):
+    url = "https://example.com/feed.xml"
+    body = b"<rss><channel><item><title>T</title><link>https://example.com/t</link></item></channel></rss>"
+    assert record_fetcher(str(tmp_path), fetch=lambda u: body)(url) == body
+    assert replay_fetcher(str(tmp_path))(url) == body
@@ -0,0 +1,97 @@
+# tests/test_telegram_webhook.py
+import pytest
+
+import config
+from services.job_executor import LANE_UPDATES, JobExecutor
+from telegram_webhook import DEFAULT_WEBHOOK_PATH, SECRET_HEADER, create_webhook_app
+
+pytest.importorskip("flask")
+
+SECRET = "test-secret"
+
+
+def message_update(update_id, text="gold"):
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": 42}, "text": text}}
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_settings', config.Settings(
+        bot_token="123:test", chat_id="42", offset_file=str(tmp_path / "offset.json")))
+    from telegram_chatbot import TelegramChatBot
+
+    bot = TelegramChatBot()
+    # A private executor, and updates recorded instead of answered (no Telegram calls)
+    bot.executor = JobExecutor(max_workers=2, lane_limits={LANE_UPDATES: 1})
+    bot.handled = []
+    bot.handle_update = bot.handled.append
+    return bot
+
+
+@pytest.fixture
+def client(bot):
+    return create_webhook_app(bot, SECRET).test_client()
+
+
+def post(client, update, secret=SECRET):
+    headers = {} if secret is None else {SECRET_HEADER: secret}
+    return client.post(DEFAULT_WEBHOOK_PATH, json=update, headers=headers)
+
+
+def handled_ids(bot):
+    assert bot.executor.wait_idle(timeout=5)
+    return [update["update_id"] for update in bot.handled]
+
+
+@pytest.mark.parametrize("secret", [None, "", "wrong-secret"])
+def test_rejects_missing_or_wrong_secret(client, bot, secret):
+    response = post(client, message_update(1), secret=secret)
+    assert response.status_code == 403
+    assert response.get_json()["ok"] is False
+    assert handled_ids(bot) == []
+
+
+def test_rejects_invalid_body(client, bot):
+    response = client.post(DEFAULT_WEBHOOK_PATH, data="not json", headers={SECRET_HEADER: SECRET})
+    assert response.status_code == 400
+    assert handled_ids(bot) == []
+
+
+def test_accepts_valid_update(client, bot):
+    response = post(client, message_update(7))
+    assert response.status_code == 200
+    assert response.get_json() == {"ok": True}
+    assert handled_ids(bot) == [7]
+    # Handled updates are persisted so a restart does not replay them
+    assert bot.offset_store.load() == 7
+
+
+def test_repeated_update_is_acknowledged_once_handled(client, bot):
+    first = post(client, message_update(5))
+    repeat = post(client, message_update(5))
+    assert first.status_code == repeat.status_code == 200
+    assert handled_ids(bot) == [5]
+
+
+def test_out_of_order_updates_are_not_dropped(client, bot):
+    for update_id in (5, 3, 5, 4, 3):
+        assert post(client, message_update(update_id)).status_code == 200
+    assert handled_ids(bot) == [5, 3, 4]
+
+
+def test_updates_from_before_restart_are_skipped(tmp_path, bot):
+    bot.offset_store.save(10)
+    from telegram_chatbot import TelegramChatBot
+
+    restarted = TelegramChatBot()
+    restarted.executor = bot.executor
+    restarted.handled = bot.handled
+    restarted.handle_update = bot.handled.append
+    client = create_webhook_app(restarted, SECRET).test_client()
+    for update_id in (9, 10, 11):
+        assert post(client, message_update(update_id)).status_code == 200
+    assert handled_ids(bot) == [11]
+
+
+def test_health(client):
+    assert client.get("/").get_json() == {"ok": True, "mode": "webhook"}